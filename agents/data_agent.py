@@ -1,14 +1,18 @@
 import sys
 import os
 import json
-from agno.agent import Agent
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 # from agno.models.openrouter import OpenRouter
 # from agno_app.config import settings
 
 from dotenv import load_dotenv
-from agno.models.groq import Groq
+
+# agno and the data tools (pandas, numpy, pyarrow) are imported when the
+# agent is built, so importing this module stays cheap
+if TYPE_CHECKING:
+    from agno.agent import Agent
 
 # To load environment variables from env file
 load_dotenv()
@@ -22,27 +26,82 @@ AGENTS_DIR = THIS_FILE.parent
 # Project root = parent of "agents"
 PROJECT_ROOT = AGENTS_DIR.parent
 
-if str(PROJECT_ROOT) not in sys.path:
+# Only needed when run as a script; importers already have the project root
+if __name__ == "__main__" and str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from tools.data_tools import (
-    global_stats,
-    segment_stats,
-    top_customers_by_spend,
-)
-
 def get_tools_used(resp):
     return [t.tool_name for t in resp.tools]
 
 
-def create_data_agent(model) -> Agent:
+def create_data_agent(model, async_mode: bool = False) -> "Agent":
     """
     Create the Data Agent.
 
     - Use any model
-    - Has access to 3 tools over the marketing dataset.
+    - Has access to 9 tools over the marketing dataset, plus fetch_rows for
+      the next page of a large table result and list_datasets for the dataset
+      ids (snapshots) the tools accept.
     - Is instructed to NEVER guess numbers, only use tools.
+    - async_mode=True gives it the async tool variants: run it with
+      `await agent.arun(...)` and the tool calls of one model turn execute
+      concurrently on the tool thread pool.
     """
+    from agno.agent import Agent
+    from agno_app.instrumentation import InstrumentedAgent, is_enabled
+    from tools.data_tools import (
+        compare_segments,
+        compare_segments_async,
+        customer_profiles,
+        customer_profiles_async,
+        fetch_rows,
+        fetch_rows_async,
+        global_stats,
+        global_stats_async,
+        histogram,
+        histogram_async,
+        list_datasets,
+        list_datasets_async,
+        percentile_rank,
+        percentile_rank_async,
+        percentiles,
+        percentiles_async,
+        segment_stats,
+        segment_stats_async,
+        top_customers,
+        top_customers_async,
+        top_customers_by_spend,
+        top_customers_by_spend_async,
+    )
+
+    if async_mode:
+        tools = [
+            global_stats_async,
+            segment_stats_async,
+            compare_segments_async,
+            top_customers_async,
+            top_customers_by_spend_async,
+            percentiles_async,
+            percentile_rank_async,
+            histogram_async,
+            customer_profiles_async,
+            fetch_rows_async,
+            list_datasets_async,
+        ]
+    else:
+        tools = [
+            global_stats,
+            segment_stats,
+            compare_segments,
+            top_customers,
+            top_customers_by_spend,
+            percentiles,
+            percentile_rank,
+            histogram,
+            customer_profiles,
+            fetch_rows,
+            list_datasets,
+        ]
 
     agent = Agent(
         name="Data Agent",
@@ -53,15 +112,12 @@ def create_data_agent(model) -> Agent:
             "You are a precise data analytics agent over the marketing_campaign dataset. "
             "You NEVER guess numeric values. "
             "You must always call the available tools (global_stats, segment_stats, "
-            "top_customers_by_spend) to obtain statistics. "
+            "compare_segments, top_customers, top_customers_by_spend, percentiles, percentile_rank, "
+            "histogram, customer_profiles) to obtain statistics. "
             "Return your final answer as VALID JSON only, with numeric fields and short labels."
         ),
         model=model,
-        tools=[
-            global_stats,
-            segment_stats,
-            top_customers_by_spend,
-        ],
+        tools=tools,
 
         # These are additional instructions for the agent to perform better
         # Instructions = How you must behave while doing it.
@@ -71,6 +127,15 @@ def create_data_agent(model) -> Agent:
             "You are FORBIDDEN from guessing or inventing numeric values.",
             "If a tool fails or is unavailable, say you cannot answer instead of guessing.",
             "When calling a tool with no parameters, always use {} as the arguments object.",
+            "To compare several segments, make ONE compare_segments call instead of "
+            "several segment_stats calls.",
+            "Table results come as 'columns' (names once) and 'rows' (one value array per row). "
+            "If a result has a 'next_cursor', call fetch_rows with it only when you need more rows.",
+            "For percentiles, thresholds, 'what percentile is customer X in' or distributions, use "
+            "percentiles, percentile_rank or histogram instead of listing customers.",
+            "For details on specific customers (IDs), make ONE customer_profiles call with all the IDs.",
+            "Omit dataset_id unless the user names a dataset, region or month; then pass the "
+            "matching id from list_datasets to every tool call.",
             "If the user explicitly asks for a raw list, table, JSON array, or 'do not summarize', "
             "then return the tool's JSON output directly (possibly lightly reformatted) without aggregation.",
             "If the user asks for 'summary', 'stats', 'insights', or similar, you may compute aggregate "
@@ -84,10 +149,16 @@ def create_data_agent(model) -> Agent:
         ],
     )
 
+    # INSTRUMENTATION=true times every run (model calls, tools, dataset steps)
+    if is_enabled():
+        return InstrumentedAgent(agent)
     return agent
 
 if __name__ == "__main__":
 
+    from agno.models.groq import Groq
+    from agno_app.instrumentation import format_breakdown
+
     # Create Groq model
     api_key = os.getenv("GROQ_API_KEY")
     model_id = os.getenv("GROQ_MODEL_ID")
@@ -120,6 +191,9 @@ if __name__ == "__main__":
     print("\n--- Agent Output ---\n")
     print(resp1.content)
 
+    if getattr(agent, "last_trace", None) is not None:
+        print("\nLatency:", format_breakdown(agent.last_trace))
+
     # To view the tool calls made by the agent during this run
     # print("\n=== RAW TOOLS ===\n")
     # for t in resp1.tools:
@@ -1,14 +1,18 @@
 import sys
 import os
 import json
-from agno.agent import Agent
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 # from agno.models.openrouter import OpenRouter
-# from agno_app.config import settings
 
 from dotenv import load_dotenv
-from agno.models.groq import Groq
+
+# Fast start: agno, the Groq client and the data stack (pandas, numpy,
+# pyarrow) are imported when the agent is built, after the first query is
+# typed, not before the menu is shown
+if TYPE_CHECKING:
+    from agno.agent import Agent
 
 # To load environment variables from env file
 load_dotenv()
@@ -22,9 +26,12 @@ AGENTS_DIR = THIS_FILE.parent
 # Project root = parent of "agents"
 PROJECT_ROOT = AGENTS_DIR.parent
 
-if str(PROJECT_ROOT) not in sys.path:
+# Only needed when run as a script; importers already have the project root
+if __name__ == "__main__" and str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from agno_app.config import settings
+
 def get_user_query():
     print("""
     ------------------------------
@@ -35,7 +42,10 @@ def get_user_query():
           - Marital Status: Married/ Single/ Together/ Divorced/ Widow
           - Has Children or Not
           - High-Value Customers or Not
+          - Education: Graduate/ PhD/ Master/ Undergraduate/ Basic
+          - Campaign Acceptance, Complaints, Last Campaign Response
     3. Can Give You Stats of Top 'n' Spending Customers
+          (or top 'n' by Income, Recency, Purchases, any product spend)
           
     (e.g., "Show top 5 high-value customers with kids")
           
@@ -59,24 +69,78 @@ def get_user_query():
         return query
     
 
-from tools.data_tools import (
-    global_stats,
-    segment_stats,
-    top_customers_by_spend,
-)
-
 def get_tools_used(resp):
     return [t.tool_name for t in resp.tools]
 
 
-def create_data_agent(model) -> Agent:
+def create_data_agent(model, async_mode: bool = False) -> "Agent":
     """
     Create the Data Agent.
 
     - Use any model
-    - Has access to 3 tools over the marketing dataset.
+    - Has access to 9 tools over the marketing dataset, plus fetch_rows for
+      the next page of a large table result and list_datasets for the dataset
+      ids (snapshots) the tools accept.
     - Is instructed to NEVER guess numbers, only use tools.
+    - async_mode=True gives it the async tool variants: run it with
+      `await agent.arun(...)` and the tool calls of one model turn execute
+      concurrently on the tool thread pool.
     """
+    from agno.agent import Agent
+    from agno_app.instrumentation import InstrumentedAgent, is_enabled
+    from tools.data_tools import (
+        compare_segments,
+        compare_segments_async,
+        customer_profiles,
+        customer_profiles_async,
+        fetch_rows,
+        fetch_rows_async,
+        global_stats,
+        global_stats_async,
+        histogram,
+        histogram_async,
+        list_datasets,
+        list_datasets_async,
+        percentile_rank,
+        percentile_rank_async,
+        percentiles,
+        percentiles_async,
+        segment_stats,
+        segment_stats_async,
+        top_customers,
+        top_customers_async,
+        top_customers_by_spend,
+        top_customers_by_spend_async,
+    )
+
+    if async_mode:
+        tools = [
+            global_stats_async,
+            segment_stats_async,
+            compare_segments_async,
+            top_customers_async,
+            top_customers_by_spend_async,
+            percentiles_async,
+            percentile_rank_async,
+            histogram_async,
+            customer_profiles_async,
+            fetch_rows_async,
+            list_datasets_async,
+        ]
+    else:
+        tools = [
+            global_stats,
+            segment_stats,
+            compare_segments,
+            top_customers,
+            top_customers_by_spend,
+            percentiles,
+            percentile_rank,
+            histogram,
+            customer_profiles,
+            fetch_rows,
+            list_datasets,
+        ]
 
     agent = Agent(
         name="Data Agent",
@@ -87,15 +151,12 @@ def create_data_agent(model) -> Agent:
             "You are a precise data analytics agent over the marketing_campaign dataset. "
             "You NEVER guess numeric values. "
             "You must always call the available tools (global_stats, segment_stats, "
-            "top_customers_by_spend) to obtain statistics. "
+            "compare_segments, top_customers, top_customers_by_spend, percentiles, percentile_rank, "
+            "histogram, customer_profiles) to obtain statistics. "
             "Return your final answer as VALID JSON only, with numeric fields and short labels."
         ),
         model=model,
-        tools=[
-            global_stats,
-            segment_stats,
-            top_customers_by_spend,
-        ],
+        tools=tools,
 
         # These are additional instructions for the agent to perform better
         # Instructions = How you must behave while doing it.
@@ -105,6 +166,15 @@ def create_data_agent(model) -> Agent:
             "You are FORBIDDEN from guessing or inventing numeric values.",
             "If a tool fails or is unavailable, say you cannot answer instead of guessing.",
             "When calling a tool with no parameters, always use {} as the arguments object.",
+            "To compare several segments, make ONE compare_segments call instead of "
+            "several segment_stats calls.",
+            "Table results come as 'columns' (names once) and 'rows' (one value array per row). "
+            "If a result has a 'next_cursor', call fetch_rows with it only when you need more rows.",
+            "For percentiles, thresholds, 'what percentile is customer X in' or distributions, use "
+            "percentiles, percentile_rank or histogram instead of listing customers.",
+            "For details on specific customers (IDs), make ONE customer_profiles call with all the IDs.",
+            "Omit dataset_id unless the user names a dataset, region or month; then pass the "
+            "matching id from list_datasets to every tool call.",
             "If the user explicitly asks for a raw list, table, JSON array, or 'do not summarize', "
             "then return the tool's JSON output directly (possibly lightly reformatted) without aggregation.",
             "If the user asks for 'summary', 'stats', 'insights', or similar, you may compute aggregate "
@@ -118,43 +188,123 @@ def create_data_agent(model) -> Agent:
         ],
     )
 
+    # INSTRUMENTATION=true times every run (model calls, tools, dataset steps)
+    if is_enabled():
+        return InstrumentedAgent(agent)
     return agent
 
-if __name__ == "__main__":
+def create_model():
+    from agno.models.groq import Groq
 
     # Create Groq model
     api_key = os.getenv("GROQ_API_KEY")
     model_id = os.getenv("GROQ_MODEL_ID")
 
-    model = Groq(
+    return Groq(
         api_key=api_key,
         id=model_id,
         temperature=0.1,)
 
+def build_cli_agent(model=None):
+    """
+    Data Agent (+ response cache) for the interactive loop.
+
+    Returns (agent, cache); cache is None unless RESPONSE_CACHE is on.
+    """
+    from agno_app.instrumentation import is_enabled, start_metrics_server
+
+    if model is None:
+        model = create_model()
+
+    # AGENT_ASYNC=true runs the tool calls of one model turn concurrently
+    agent = create_data_agent(model, async_mode=settings.agent_async)
+
+    # RESPONSE_CACHE=true answers repeated questions from a local cache
+    cache = None
+    if settings.response_cache:
+        from agno_app.response_cache import CachedAgent, ResponseCache
+
+        cache = ResponseCache.from_settings()
+        agent = CachedAgent(agent, cache)
+
+    # INTENT_ROUTER=true answers simple, well-formed queries without the model
+    if settings.intent_router:
+        from tools.intent_router import RoutedAgent
+
+        agent = RoutedAgent(agent)
+
+    # METRICS_PORT serves the Prometheus metrics while the session is open
+    if is_enabled():
+        start_metrics_server()
+
+    return agent, cache
+
+if __name__ == "__main__":
 
     # Quick manual test
-    agent = create_data_agent(model)
+    agent = cache = None
+
+    # PREWARM=true creates the model client and the agent, and loads the
+    # dataset with its indexes, on background threads while the user types
+    prewarmer = None
+    if settings.prewarm:
+        from agno_app.prewarm import Prewarmer, prewarm_dataset, prewarm_model_client
+
+        prewarmer = Prewarmer()
+        prewarmer.start("model_client", lambda: prewarm_model_client(create_model(), async_client=settings.agent_async))
+        prewarmer.start("agent", lambda: build_cli_agent(prewarmer.wait("model_client")))
+        prewarmer.start("dataset", prewarm_dataset)
+    report_prewarm = prewarmer is not None
+
+    # AGENT_ASYNC=true: every query runs on the same event loop, which the
+    # async model client's connection pool is bound to after its first use
+    runner = None
 
     while True:
         query = get_user_query()
         if query is None:
             break  # user quit
-        
+
+        # Built on the first query (or by the prewarm threads), so the menu
+        # shows up right away
+        if agent is None:
+            if prewarmer is not None:
+                pending = prewarmer.pending()
+                if pending:
+                    print(f"⏳ Still warming up: {', '.join(pending)}")
+                # The tools wait for the dataset themselves, only if it is not loaded yet
+                agent, cache = prewarmer.wait("agent")
+            else:
+                agent, cache = build_cli_agent()
+            from agno_app.instrumentation import format_breakdown, span
+
         # Send the user’s query to LLM / agents here
-        response = agent.run(query, stream=False)
+        if settings.agent_async:
+            if runner is None:
+                import asyncio
 
-        try:
-            data = json.loads(str(response.content))
-        except json.JSONDecodeError:
-            # Fallback: model didn’t return valid JSON
-            print("\nRaw response from agent:\n", response.content)
+                runner = asyncio.Runner()
+            response = runner.run(agent.arun(query, stream=False))
         else:
-            print("\nHere are your required statistics:\n")
-            print(json.dumps(data, indent=4))  # nicely formatted JSON
+            response = agent.run(query, stream=False)
+
+        with span("cli.render", kind="cli"):
+            try:
+                data = json.loads(str(response.content))
+            except json.JSONDecodeError:
+                # Fallback: model didn’t return valid JSON
+                print("\nRaw response from agent:\n", response.content)
+            else:
+                print("\nHere are your required statistics:\n")
+                print(json.dumps(data, indent=4))  # nicely formatted JSON
 
         #print("\n Here are your required statistics:", response.content)
 
-        if response.tools:
+        if getattr(response, "routed", False):
+            print("\n⚡ Answered locally by the intent router (no LLM call).\n")
+        elif getattr(response, "cached", False):
+            print("\n⚡ Served from the response cache.\n")
+        elif response.tools:
             print("\n✅ Tools were used in this run.\n")
         else:
             print("❌ No tools were used - answer likely hallucinated.")
@@ -162,9 +312,27 @@ if __name__ == "__main__":
     
         print('Tools used by the agent: ', get_tools_used(response))    
 
+        # The instrumented agent sits under the intent router / response cache, if any
+        inner, trace = agent, None
+        while inner is not None and trace is None:
+            trace = vars(inner).get("last_trace")
+            inner = vars(inner).get("agent")
+        if trace is not None and not getattr(response, "cached", False) and not getattr(response, "routed", False):
+            print("Latency:", format_breakdown(trace))
+
+        if report_prewarm:
+            print("Prewarm:\n" + prewarmer.format_report())
+            report_prewarm = False
+
     '''
     stream=False => Returns complete response at once.
     stream=True => Returns response in a stream of chunks (tokens)
     '''
 
-    
\ No newline at end of file
+    if runner is not None:
+        runner.close()
+
+    if cache is not None:
+        print("Response cache:", cache.stats())
+    if agent is not None and settings.intent_router:
+        print("Intent router:", agent.stats())
@@ -0,0 +1,72 @@
+import sys
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from agno.agent import Agent
+
+# To load environment variables from env file
+load_dotenv()
+
+# This file: .../Agno_Customer_Personality_Analysis_Agent/agents/insight_agent.py
+THIS_FILE = Path(__file__).resolve()
+
+# Project root = parent of "agents"
+PROJECT_ROOT = THIS_FILE.parent.parent
+
+# Only needed when run as a script; importers already have the project root
+if __name__ == "__main__" and str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def create_insight_agent(model) -> "Agent":
+    """
+    Create the Insight Agent.
+
+    - Input: one question and the JSON statistics the Data Agent returned for it
+    - Output: a few business insights, each backed by the numbers it uses
+    - Has no tools; it only interprets what it is given.
+    """
+    from agno.agent import Agent
+    from agno_app.instrumentation import InstrumentedAgent, is_enabled
+
+    agent = Agent(
+        name="Insight Agent",
+        role=(
+            "You are a customer analytics expert. You turn statistics about the customers of "
+            "a retail company into short, concrete business insights."
+        ),
+        model=model,
+        instructions=[
+            "Only use the numbers present in the statistics you are given. Never invent numbers.",
+            "Each insight must quote the figures it is based on (e.g. averages, shares, counts).",
+            "Point out differences between segments, unusual values and the share of high-value customers.",
+            "If the statistics contain an error or are empty, say that no insight can be drawn.",
+
+            # Style rules
+            "Return 3 to 5 bullet points, one sentence each, without markdown headings.",
+        ],
+    )
+
+    # INSTRUMENTATION=true times every run (see agno_app/instrumentation.py)
+    if is_enabled():
+        return InstrumentedAgent(agent)
+    return agent
+
+
+if __name__ == "__main__":
+
+    from agno.models.groq import Groq
+
+    model = Groq(api_key=os.getenv("GROQ_API_KEY"), id=os.getenv("GROQ_MODEL_ID"), temperature=0.1)
+    agent = create_insight_agent(model)
+
+    resp = agent.run(
+        "Question: How do married customers with children spend?\n"
+        'Statistics: {"n_customers": 600, "avg_total_spend": 410.5, "pct_high_value": 8.2}',
+        stream=False,
+    )
+    print(resp.content)
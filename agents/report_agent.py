@@ -0,0 +1,74 @@
+import sys
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from agno.agent import Agent
+
+# To load environment variables from env file
+load_dotenv()
+
+# This file: .../Agno_Customer_Personality_Analysis_Agent/agents/report_agent.py
+THIS_FILE = Path(__file__).resolve()
+
+# Project root = parent of "agents"
+PROJECT_ROOT = THIS_FILE.parent.parent
+
+# Only needed when run as a script; importers already have the project root
+if __name__ == "__main__" and str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def create_report_agent(model) -> "Agent":
+    """
+    Create the Report Agent.
+
+    - Input: the user question plus, per sub-question, the statistics,
+      insights and strategies produced by the other agents
+    - Output: an executive report in Markdown
+    - Has no tools.
+    """
+    from agno.agent import Agent
+    from agno_app.instrumentation import InstrumentedAgent, is_enabled
+
+    agent = Agent(
+        name="Report Agent",
+        role=(
+            "You write concise executive reports in Markdown for a marketing team, from "
+            "statistics, insights and recommended strategies that are given to you."
+        ),
+        model=model,
+        instructions=[
+            "Structure: a title, an 'Executive summary' (3 bullet points), 'Key figures', "
+            "'Insights', 'Recommended actions'.",
+            "Only use numbers present in the input. Never invent numbers.",
+            "Keep it under 400 words.",
+            "If some sections of the input are missing, write the report from the rest and "
+            "mention briefly what is missing.",
+        ],
+    )
+
+    # INSTRUMENTATION=true times every run (see agno_app/instrumentation.py)
+    if is_enabled():
+        return InstrumentedAgent(agent)
+    return agent
+
+
+if __name__ == "__main__":
+
+    from agno.models.groq import Groq
+
+    model = Groq(api_key=os.getenv("GROQ_API_KEY"), id=os.getenv("GROQ_MODEL_ID"), temperature=0.1)
+    agent = create_report_agent(model)
+
+    resp = agent.run(
+        "Question: Who are my high-value customers?\n"
+        'Statistics: {"n_customers": 2240, "pct_high_value": 10.0, "avg_income_high_value": 77500}\n'
+        "Insights:\n- 10% of customers are high-value, with an average income of 77,500.\n"
+        "Strategies:\n- Target high-income customers with premium wine bundles.",
+        stream=False,
+    )
+    print(resp.content)
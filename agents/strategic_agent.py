@@ -0,0 +1,72 @@
+import sys
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from agno.agent import Agent
+
+# To load environment variables from env file
+load_dotenv()
+
+# This file: .../Agno_Customer_Personality_Analysis_Agent/agents/strategic_agent.py
+THIS_FILE = Path(__file__).resolve()
+
+# Project root = parent of "agents"
+PROJECT_ROOT = THIS_FILE.parent.parent
+
+# Only needed when run as a script; importers already have the project root
+if __name__ == "__main__" and str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def create_strategy_agent(model) -> "Agent":
+    """
+    Create the Strategy Agent.
+
+    - Input: the insights drawn from one set of statistics
+    - Output: business actions (campaigns, channels, retention) that follow from them
+    - Has no tools; it only works from the insights it is given.
+    """
+    from agno.agent import Agent
+    from agno_app.instrumentation import InstrumentedAgent, is_enabled
+
+    agent = Agent(
+        name="Strategy Agent",
+        role=(
+            "You are a marketing strategist. You convert customer insights into specific, "
+            "actionable business recommendations."
+        ),
+        model=model,
+        instructions=[
+            "Base every recommendation on one of the insights you are given and say which one.",
+            "Name the target segment, the action (offer, channel, timing) and the expected effect.",
+            "Prefer actions on high-value customers and on the channels that perform best.",
+            "Do not invent statistics that are not in the insights.",
+
+            # Style rules
+            "Return 2 to 4 bullet points without markdown headings.",
+        ],
+    )
+
+    # INSTRUMENTATION=true times every run (see agno_app/instrumentation.py)
+    if is_enabled():
+        return InstrumentedAgent(agent)
+    return agent
+
+
+if __name__ == "__main__":
+
+    from agno.models.groq import Groq
+
+    model = Groq(api_key=os.getenv("GROQ_API_KEY"), id=os.getenv("GROQ_MODEL_ID"), temperature=0.1)
+    agent = create_strategy_agent(model)
+
+    resp = agent.run(
+        "- Married customers with children spend 410 on average, 40% less than those without.\n"
+        "- Only 8% of them are high-value customers.",
+        stream=False,
+    )
+    print(resp.content)
@@ -0,0 +1,194 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from agno_app.segment_cube import dimension_codes
+
+'''
+Bitmap index over the low-cardinality columns of the engineered dataset.
+
+For every (column, value) pair a packed bitset (1 bit per row) is built once
+per dataset version. Filters are evaluated with bitwise AND / OR / NOT on
+those bitsets and only the final selection is turned into row positions, so
+no intermediate DataFrame is materialised per predicate.
+
+Filter expressions are plain dicts, so they can come straight from a tool call:
+
+    {"column": "Education", "eq": "phd"}
+    {"column": "AcceptedCmp1", "in": [1]}
+    {"and": [expr, ...]}   {"or": [expr, ...]}   {"not": expr}
+'''
+
+INDEXED_COLUMNS: List[str] = [
+    "Marital_Status",
+    "Education",
+    "Kidhome",
+    "Teenhome",
+    "Total_Children",
+    "Complain",
+    "AcceptedCmp1",
+    "AcceptedCmp2",
+    "AcceptedCmp3",
+    "AcceptedCmp4",
+    "AcceptedCmp5",
+    "Response",
+    "IsHighValue",
+]
+
+
+class Bitmap:
+    """
+    A packed bitset over the rows of a frame.
+    """
+
+    __slots__ = ("bits", "n_rows")
+
+    def __init__(self, bits: np.ndarray, n_rows: int):
+        self.bits = bits
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> "Bitmap":
+        return cls(np.packbits(mask.astype(bool, copy=False)), len(mask))
+
+    @classmethod
+    def full(cls, n_rows: int) -> "Bitmap":
+        return cls.from_mask(np.ones(n_rows, dtype=bool))
+
+    @classmethod
+    def empty(cls, n_rows: int) -> "Bitmap":
+        return cls(np.zeros((n_rows + 7) // 8, dtype=np.uint8), n_rows)
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits & other.bits, self.n_rows)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits | other.bits, self.n_rows)
+
+    def __invert__(self) -> "Bitmap":
+        bits = ~self.bits
+        # Clear the padding bits of the last byte so they never count as rows
+        tail = self.n_rows % 8
+        if tail:
+            bits[-1] &= np.uint8((0xFF << (8 - tail)) & 0xFF)
+        return Bitmap(bits, self.n_rows)
+
+    def count(self) -> int:
+        return int(np.unpackbits(self.bits, count=self.n_rows).sum())
+
+    def positions(self) -> np.ndarray:
+        """
+        Row positions of the set bits, in ascending order.
+        """
+        return np.flatnonzero(np.unpackbits(self.bits, count=self.n_rows))
+
+
+def _normalize_value(value: Any) -> Any:
+    # Categorical strings are stored lower-cased by clean_data()
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    return value
+
+
+class BitmapIndex:
+    """
+    Bitsets for every value of the indexed columns of one dataset version.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Optional[Iterable[str]] = None):
+        # Kept so callers aggregate over the same version the bitmaps describe
+        self.df = df
+        self.n_rows = len(df)
+        self.bitmaps: Dict[str, Dict[Any, Bitmap]] = {}
+        self._group_codes: Dict[str, Tuple[np.ndarray, List[Any]]] = {}
+
+        for col in columns or INDEXED_COLUMNS:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+            self.bitmaps[col] = {
+                _normalize_value(value.item() if hasattr(value, "item") else value): Bitmap.from_mask(codes == code)
+                for code, value in enumerate(uniques)
+            }
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "BitmapIndex":
+        return cls(df)
+
+    def group_codes(self, dimension: str) -> Tuple[np.ndarray, List[Any]]:
+        """
+        Cached segment_cube.dimension_codes() for this version's frame.
+        """
+        codes = self._group_codes.get(dimension)
+        if codes is None:
+            codes = dimension_codes(self.df, dimension)
+            self._group_codes[dimension] = codes
+        return codes
+
+    def values(self, column: str) -> List[Any]:
+        return list(self.bitmaps[column])
+
+    def eq(self, column: str, value: Any) -> Bitmap:
+        if column not in self.bitmaps:
+            raise KeyError(f"Column '{column}' is not indexed")
+        bitmap = self.bitmaps[column].get(_normalize_value(value))
+        return bitmap if bitmap is not None else Bitmap.empty(self.n_rows)
+
+    def isin(self, column: str, values: Iterable[Any]) -> Bitmap:
+        result = Bitmap.empty(self.n_rows)
+        for value in values:
+            result = result | self.eq(column, value)
+        return result
+
+    def all(self) -> Bitmap:
+        return Bitmap.full(self.n_rows)
+
+    def evaluate(self, expr: Optional[Dict[str, Any]]) -> Bitmap:
+        """
+        Evaluate a filter expression (see module docstring); None selects all rows.
+        """
+        if not expr:
+            return self.all()
+
+        if "and" in expr:
+            result = self.all()
+            for sub in expr["and"]:
+                result = result & self.evaluate(sub)
+            return result
+
+        if "or" in expr:
+            result = Bitmap.empty(self.n_rows)
+            for sub in expr["or"]:
+                result = result | self.evaluate(sub)
+            return result
+
+        if "not" in expr:
+            return ~self.evaluate(expr["not"])
+
+        column = expr.get("column")
+        if column is None:
+            raise ValueError(f"Invalid filter expression: {expr!r}")
+        if "in" in expr:
+            return self.isin(column, expr["in"])
+        if "eq" in expr:
+            return self.eq(column, expr["eq"])
+        raise ValueError(f"Filter on '{column}' needs an 'eq' or 'in' value")
+
+
+def all_of(*exprs: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    AND together the non-empty expressions (None when there are none).
+    """
+    parts = [expr for expr in exprs if expr]
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else {"and": parts}
+
+
+def column_filter(column: str, value: Union[Any, List[Any]]) -> Dict[str, Any]:
+    if isinstance(value, (list, tuple, set)):
+        return {"column": column, "in": list(value)}
+    return {"column": column, "eq": value}
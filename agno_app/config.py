@@ -0,0 +1,145 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# Project root = parent of "agno_app"
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_path(name: str, default: Optional[str] = None) -> Optional[str]:
+    # Relative paths are taken from the project root, not the current directory
+    value = os.getenv(name) or default
+    if not value:
+        return None
+    path = Path(value).expanduser()
+    if not path.is_absolute():
+        path = PROJECT_ROOT / path
+    return str(path)
+
+
+def _env_optional_int(name: str, default: Optional[int]) -> Optional[int]:
+    # Unset: the default; set but empty (or "none"): None
+    value = os.getenv(name)
+    if value is None:
+        return default
+    if not value.strip() or value.strip().lower() == "none":
+        return None
+    return int(value)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Environment driven settings shared by the data pipeline and the agents.
+    """
+
+    # Dataset sources, tried in this order (see agno_app/data_interface.py)
+    data_path: Optional[str]              # DATA_PATH: a single local CSV file
+    data_snapshot_dir: Optional[str]      # DATA_SNAPSHOT_DIR: folder of versioned copies
+    data_snapshot_version: Optional[str]  # DATA_SNAPSHOT_VERSION: pin a snapshot (default: latest)
+    kaggle_dataset: str                   # KAGGLE_DATASET: dataset handle on Kaggle
+    kaggle_file: str                      # KAGGLE_FILE: file name inside the Kaggle dataset
+    kaggle_fallback: bool                 # KAGGLE_FALLBACK: download when nothing local exists
+
+    # Where the cleaned + engineered dataset is persisted (Arrow IPC files)
+    feature_store_dir: str
+
+    # SHARED_DATASET_DIR: attach this feature store artifact instead of building (set by service.py)
+    shared_dataset_dir: Optional[str]
+
+    # DATASET_MEMORY_BUDGET_MB: engineered frames and their indexes kept in memory across dataset ids (empty: no limit)
+    dataset_memory_budget_mb: Optional[int]
+
+    # HIGH_VALUE_QUANTILE: TotalSpend quantile from which customers are high-value
+    # (applied after loading, without rebuilding the stored dataset)
+    high_value_quantile: float
+
+    # COMPACT_SCHEMA: categorical strings and narrowest safe integer widths
+    compact_schema: bool
+
+    # STREAM_CHUNK_ROWS: build the dataset in chunks of this many rows (0: one read)
+    stream_chunk_rows: int
+
+    # PIPELINE_WORKERS: processes used to clean + engineer large frames (1: serial)
+    pipeline_workers: int
+
+    # Async tools / agent.arun (see tools/data_tools.py)
+    agent_async: bool                     # AGENT_ASYNC: run the Data Agent with agent.arun
+    tool_workers: int                     # TOOL_WORKERS: threads for async tool calls
+    prewarm: bool                         # PREWARM: load model client + dataset while the CLI waits for input
+    intent_router: bool                   # INTENT_ROUTER: answer simple queries without the model
+
+    # Approximate answers from stratified samples (see agno_app/stratified_sample.py)
+    approx_queries: bool                  # APPROX_QUERIES: global_stats / segment_stats may answer from the sample
+    approx_sample_rows: int               # APPROX_SAMPLE_ROWS: sample size per dataset version
+    approx_max_rel_error: float           # APPROX_MAX_REL_ERROR: default error target (95% interval half-width)
+
+    # Tool result format (see agno_app/tool_output.py)
+    tool_output: str                      # TOOL_OUTPUT: "compact" (columnar) or "records"
+    tool_page_rows: int                   # TOOL_PAGE_ROWS: rows per page of a table result
+    tool_round_digits: Optional[int]      # TOOL_ROUND_DIGITS: float rounding (unset: none)
+
+    # Agent pipeline (see orchestrator.py)
+    orchestrator_timeout_s: float         # ORCHESTRATOR_TIMEOUT_S: per-stage timeout (0: none)
+    orchestrator_concurrency: int         # ORCHESTRATOR_CONCURRENCY: concurrent stages of one kind
+
+    # Spans, traces and metrics (see agno_app/instrumentation.py)
+    instrumentation: bool                 # INSTRUMENTATION: opt-in
+    trace_path: Optional[str]             # TRACE_PATH: JSONL file, one line per agent run
+    metrics_path: Optional[str]           # METRICS_PATH: Prometheus text file, rewritten after each run
+    metrics_port: int                     # METRICS_PORT: serve /metrics over HTTP (0: off)
+
+    # Agent response cache (see agno_app/response_cache.py)
+    response_cache: bool                  # RESPONSE_CACHE: opt-in
+    response_cache_path: str              # RESPONSE_CACHE_PATH: SQLite file
+    response_cache_max_mb: float          # RESPONSE_CACHE_MAX_MB: size bound (LRU eviction)
+    response_cache_ttl_s: float           # RESPONSE_CACHE_TTL_S: entry lifetime
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            data_path=_env_path("DATA_PATH", "data/marketing_campaign.csv"),
+            data_snapshot_dir=_env_path("DATA_SNAPSHOT_DIR", "data/snapshots"),
+            data_snapshot_version=os.getenv("DATA_SNAPSHOT_VERSION") or None,
+            kaggle_dataset=os.getenv("KAGGLE_DATASET", "imakash3011/customer-personality-analysis"),
+            kaggle_file=os.getenv("KAGGLE_FILE", "marketing_campaign.csv"),
+            kaggle_fallback=_env_bool("KAGGLE_FALLBACK", True),
+            feature_store_dir=_env_path("FEATURE_STORE_DIR", "data/feature_store"),
+            shared_dataset_dir=_env_path("SHARED_DATASET_DIR"),
+            dataset_memory_budget_mb=_env_optional_int("DATASET_MEMORY_BUDGET_MB", 1024),
+            high_value_quantile=float(os.getenv("HIGH_VALUE_QUANTILE", "0.80")),
+            compact_schema=_env_bool("COMPACT_SCHEMA", False),
+            stream_chunk_rows=int(os.getenv("STREAM_CHUNK_ROWS", "0")),
+            pipeline_workers=int(os.getenv("PIPELINE_WORKERS", "1")),
+            agent_async=_env_bool("AGENT_ASYNC", False),
+            tool_workers=int(os.getenv("TOOL_WORKERS", "4")),
+            prewarm=_env_bool("PREWARM", True),
+            intent_router=_env_bool("INTENT_ROUTER", False),
+            approx_queries=_env_bool("APPROX_QUERIES", False),
+            approx_sample_rows=int(os.getenv("APPROX_SAMPLE_ROWS", "20000")),
+            approx_max_rel_error=float(os.getenv("APPROX_MAX_REL_ERROR", "0.05")),
+            tool_output=os.getenv("TOOL_OUTPUT", "compact").strip().lower(),
+            tool_page_rows=int(os.getenv("TOOL_PAGE_ROWS", "25")),
+            tool_round_digits=_env_optional_int("TOOL_ROUND_DIGITS", None),
+            orchestrator_timeout_s=float(os.getenv("ORCHESTRATOR_TIMEOUT_S", "90")),
+            orchestrator_concurrency=int(os.getenv("ORCHESTRATOR_CONCURRENCY", "4")),
+            instrumentation=_env_bool("INSTRUMENTATION", False),
+            trace_path=_env_path("TRACE_PATH", "data/traces.jsonl"),
+            metrics_path=_env_path("METRICS_PATH", "data/metrics.prom"),
+            metrics_port=int(os.getenv("METRICS_PORT", "0")),
+            response_cache=_env_bool("RESPONSE_CACHE", False),
+            response_cache_path=_env_path("RESPONSE_CACHE_PATH", "data/response_cache.sqlite3"),
+            response_cache_max_mb=float(os.getenv("RESPONSE_CACHE_MAX_MB", "64")),
+            response_cache_ttl_s=float(os.getenv("RESPONSE_CACHE_TTL_S", str(24 * 3600))),
+        )
+
+
+settings = Settings.from_env()
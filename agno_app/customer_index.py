@@ -0,0 +1,181 @@
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from agno_app.topn import RANKABLE_METRICS
+
+'''
+Customer ID index and full customer profiles.
+
+Built once per dataset version (a dataset artifact), it maps an ID to its
+row position without scanning the frame:
+
+- dense IDs (the span max - min is at most DENSE_SPAN_FACTOR x the row
+  count, as in the Kaggle export): a direct-address table, one array read
+  per ID
+- otherwise: the sorted IDs with their row positions, one binary search
+  per ID
+
+Both resolve a whole batch of IDs with vectorised numpy calls. If an ID
+appears more than once, its first row is used.
+
+Profiles are the engineered record of each customer plus channel mix and
+campaign features, built from column arrays in bulk for the batch.
+'''
+
+DENSE_SPAN_FACTOR = 4
+
+CAMPAIGNS = [1, 2, 3, 4, 5]
+CHANNEL_COLUMNS: Dict[str, str] = {
+    "web": "NumWebPurchases",
+    "catalog": "NumCatalogPurchases",
+    "store": "NumStorePurchases",
+}
+
+# Engineered column -> profile field, in output order (after customer_id)
+PROFILE_FIELDS: Dict[str, str] = {
+    "Year_Birth": "year_birth",
+    "Education": "education",
+    "Marital_Status": "marital_status",
+    "Income": "income",
+    "Kidhome": "kids_home",
+    "Teenhome": "teens_home",
+    "Total_Children": "total_children",
+    "CustomerTenureDays": "customer_tenure_days",
+    "Recency": "recency_days",
+    **{col: RANKABLE_METRICS[col] for col in RANKABLE_METRICS if col.startswith("Mnt")},
+    "TotalSpend": "total_spend",
+    "IsHighValue": "is_high_value",
+    "NumDealsPurchases": "num_deals_purchases",
+    "NumWebPurchases": "num_web_purchases",
+    "NumCatalogPurchases": "num_catalog_purchases",
+    "NumStorePurchases": "num_store_purchases",
+    "NumWebVisitsMonth": "num_web_visits_month",
+    "Total_Purchases": "total_purchases",
+    "Complain": "complained",
+    "Response": "responded",
+}
+
+
+class CustomerIndex:
+    """
+    ID -> row position for one dataset version.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        ids = df["ID"].to_numpy().astype(np.int64)
+        self.n_duplicates = 0
+
+        if len(ids) == 0:
+            self.dense = False
+            self._sorted_ids, self._sorted_positions = ids, ids
+            return
+
+        self._min = int(ids.min())
+        span = int(ids.max()) - self._min + 1
+        self.dense = span <= DENSE_SPAN_FACTOR * len(ids)
+
+        if self.dense:
+            # Filled in reverse so the first row of a repeated ID wins
+            table = np.full(span, -1, dtype=np.int64)
+            positions = np.arange(len(ids) - 1, -1, -1)
+            table[ids[positions] - self._min] = positions
+            self._table = table
+            self.n_duplicates = len(ids) - int((table >= 0).sum())
+        else:
+            order = np.argsort(ids, kind="stable")
+            sorted_ids = ids[order]
+            first = np.concatenate([[True], sorted_ids[1:] != sorted_ids[:-1]])
+            self._sorted_ids, self._sorted_positions = sorted_ids[first], order[first]
+            self.n_duplicates = len(ids) - int(first.sum())
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "CustomerIndex":
+        return cls(df)
+
+    def lookup(self, customer_ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Row positions of the IDs (in the given order), and a mask of the IDs found.
+        """
+        ids = np.asarray(list(customer_ids), dtype=np.int64)
+        positions = np.full(len(ids), -1, dtype=np.int64)
+
+        if self.dense:
+            offsets = ids - self._min
+            inside = (offsets >= 0) & (offsets < len(self._table))
+            positions[inside] = self._table[offsets[inside]]
+        elif len(self._sorted_ids):
+            slots = np.minimum(np.searchsorted(self._sorted_ids, ids), len(self._sorted_ids) - 1)
+            hit = self._sorted_ids[slots] == ids
+            positions[hit] = self._sorted_positions[slots[hit]]
+
+        found = positions >= 0
+        return positions[found], found
+
+
+def _plain(values: np.ndarray) -> List[Any]:
+    # JSON-ready values: missing floats become None
+    if values.dtype.kind == "f":
+        return [None if np.isnan(v) else v for v in values.tolist()]
+    if values.dtype.kind == "b":
+        return values.tolist()
+    if values.dtype.kind in "iu":
+        return values.astype(np.int64).tolist()
+    return [None if pd.isna(v) else str(v) for v in values]
+
+
+def build_customer_profiles(df: pd.DataFrame, positions: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Full profiles of the customers at the given row positions.
+    """
+    # The batch's rows first: to_numpy() of a whole string column converts every row
+    rows = df.take(positions)
+
+    def column(name: str) -> np.ndarray:
+        return rows[name].to_numpy()
+
+    fields: Dict[str, list] = {"customer_id": column("ID").astype(np.int64).tolist()}
+
+    if "Dt_Customer" in df.columns:
+        joined = pd.Series(column("Dt_Customer"))
+        fields["customer_since"] = [None if pd.isna(v) else v.strftime("%Y-%m-%d") for v in joined]
+
+    for name, field in PROFILE_FIELDS.items():
+        if name in df.columns:
+            fields[field] = _plain(column(name))
+
+    # Channel mix: share of web / catalog / store purchases
+    channels = {channel: column(col).astype(np.float64) for channel, col in CHANNEL_COLUMNS.items()}
+    purchases = sum(channels.values())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for channel, counts in channels.items():
+            fields[f"pct_{channel}_purchases"] = _plain(np.where(purchases > 0, 100.0 * counts / purchases, np.nan))
+        fields["spend_per_purchase"] = _plain(np.where(purchases > 0, column("TotalSpend") / purchases, np.nan))
+
+    # Campaign acceptances as campaign numbers, e.g. [1, 4]
+    accepted = np.column_stack([column(f"AcceptedCmp{i}").astype(bool) for i in CAMPAIGNS])
+    fields["accepted_campaigns"] = [[CAMPAIGNS[i] for i in np.flatnonzero(row)] for row in accepted]
+    fields["n_accepted_campaigns"] = accepted.sum(axis=1).astype(np.int64).tolist()
+
+    names = list(fields)
+    return [dict(zip(names, row)) for row in zip(*fields.values())]
+
+
+if __name__ == "__main__":
+
+    # Dense and sparse layouts agree with a boolean scan, duplicates included
+    rng = np.random.default_rng(0)
+    n = 50_000
+    for ids in (rng.permutation(n) + 1_000, rng.choice(10**9, n, replace=False)):
+        ids[10] = ids[20]                                   # one repeated ID
+        frame = pd.DataFrame({"ID": ids})
+        index = CustomerIndex.build(frame)
+
+        wanted = np.concatenate([rng.choice(ids, 100), [-5, 10**12]])
+        positions, found = index.lookup(wanted)
+        expected = [int(np.flatnonzero(ids == i)[0]) for i in wanted if (ids == i).any()]
+        assert positions.tolist() == expected and found.sum() == 100
+        assert index.lookup([ids[20]])[0][0] == 10 and index.n_duplicates == 1
+        print(f"{'dense' if index.dense else 'sparse'} index: {len(wanted)} IDs, {int(found.sum())} found")
@@ -0,0 +1,362 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from agno_app.config import settings
+
+'''
+Where the raw marketing_campaign.csv comes from.
+
+A DatasetSource knows how to find the file. `locate()` only looks at the
+local filesystem and returns None when there is nothing there; `resolve()`
+may do more work (e.g. download) and raises FileNotFoundError when the file
+cannot be obtained.
+
+The default chain, built from agno_app.config.settings, is:
+
+    1. DATA_PATH            - a single local file
+    2. DATA_SNAPSHOT_DIR    - a folder with versioned copies (latest or pinned)
+    3. Kaggle               - the local kagglehub cache first, and a download
+                              only if nothing local exists (KAGGLE_FALLBACK)
+
+The chain is resolved lazily, once per process (see resolve_dataset_path()),
+so there is no network I/O on the hot path.
+
+Other datasets (regional or monthly snapshots) are addressed by a dataset
+id: a version in DATA_SNAPSHOT_DIR, or an id registered with
+register_dataset(). No id (or "default") means the chain above.
+'''
+
+
+class DatasetSource:
+    """
+    Base class for dataset sources.
+    """
+
+    name = "source"
+
+    def locate(self) -> Optional[str]:
+        """
+        Return the path of a local copy, or None. Never touches the network.
+        """
+        raise NotImplementedError
+
+    def resolve(self) -> str:
+        """
+        Return the path of the dataset file, fetching it if this source can.
+        """
+        path = self.locate()
+        if path is None:
+            raise FileNotFoundError(f"{self.describe()}: dataset file not found")
+        return path
+
+    def describe(self) -> str:
+        return self.name
+
+
+class LocalFileSource(DatasetSource):
+    """
+    A single file on the local filesystem.
+    """
+
+    name = "local_file"
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def locate(self) -> Optional[str]:
+        return self.path if os.path.isfile(self.path) else None
+
+    def describe(self) -> str:
+        return f"{self.name}({self.path})"
+
+
+def _version_sort_key(version: str) -> Tuple:
+    # Natural ordering, so that "v10" sorts after "v9" and dates sort as expected
+    return tuple(
+        (0, int(part)) if part.isdigit() else (1, part)
+        for part in re.split(r"(\d+)", version)
+        if part
+    )
+
+
+class SnapshotDirectorySource(DatasetSource):
+    """
+    A folder holding versioned copies of the dataset, in either layout:
+
+        <directory>/<version>/marketing_campaign.csv
+        <directory>/marketing_campaign_<version>.csv
+
+    The latest version (natural sort order) is used unless one is pinned.
+    """
+
+    name = "snapshot_dir"
+
+    def __init__(self, directory: str, filename: str = "marketing_campaign.csv", version: Optional[str] = None):
+        self.directory = directory
+        self.filename = filename
+        self.version = version
+
+    def list_versions(self) -> List[Tuple[str, str]]:
+        """
+        Return (version, path) pairs, oldest first.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+
+        stem, suffix = os.path.splitext(self.filename)
+        versions = []
+
+        for entry in os.scandir(self.directory):
+            if entry.is_dir():
+                path = os.path.join(entry.path, self.filename)
+                if os.path.isfile(path):
+                    versions.append((entry.name, path))
+            elif entry.is_file() and entry.name.startswith(stem) and entry.name.endswith(suffix):
+                version = entry.name[len(stem):len(entry.name) - len(suffix)].lstrip("_-@")
+                if version:
+                    versions.append((version, entry.path))
+
+        versions.sort(key=lambda item: _version_sort_key(item[0]))
+        return versions
+
+    def locate(self) -> Optional[str]:
+        versions = self.list_versions()
+        if not versions:
+            return None
+
+        if self.version is None:
+            return versions[-1][1]
+
+        for version, path in versions:
+            if version == self.version:
+                return path
+        return None
+
+    def describe(self) -> str:
+        pinned = f", version={self.version}" if self.version else ""
+        return f"{self.name}({self.directory}{pinned})"
+
+
+class KaggleSource(DatasetSource):
+    """
+    The public Kaggle dataset, fetched through kagglehub.
+
+    `locate()` only inspects the kagglehub cache on disk; `resolve()` calls
+    kagglehub.dataset_download(), which may hit the network.
+    """
+
+    name = "kaggle"
+
+    def __init__(self, handle: str, filename: str = "marketing_campaign.csv", allow_download: bool = True):
+        self.handle = handle
+        self.filename = filename
+        self.allow_download = allow_download
+
+    def _cache_root(self) -> Path:
+        cache = os.getenv("KAGGLEHUB_CACHE") or os.path.join("~", ".cache", "kagglehub")
+        return Path(cache).expanduser() / "datasets" / self.handle / "versions"
+
+    def locate(self) -> Optional[str]:
+        root = self._cache_root()
+        if not root.is_dir():
+            return None
+
+        for version_dir in sorted(root.iterdir(), key=lambda p: _version_sort_key(p.name), reverse=True):
+            path = version_dir / self.filename
+            if path.is_file():
+                return str(path)
+        return None
+
+    def resolve(self) -> str:
+        path = self.locate()
+        if path is not None:
+            return path
+
+        if not self.allow_download:
+            raise FileNotFoundError(f"{self.describe()}: not in the local cache and downloads are disabled")
+
+        # Imported here so that offline setups never need kagglehub
+        import kagglehub
+
+        data_dir = kagglehub.dataset_download(self.handle)
+        return os.path.join(data_dir, self.filename)
+
+    def describe(self) -> str:
+        return f"{self.name}({self.handle})"
+
+
+class ChainedSource(DatasetSource):
+    """
+    Try several sources in order: any local copy wins before any fetch.
+    """
+
+    name = "chain"
+
+    def __init__(self, sources: List[DatasetSource]):
+        self.sources = sources
+
+    def locate(self) -> Optional[str]:
+        for source in self.sources:
+            path = source.locate()
+            if path is not None:
+                return path
+        return None
+
+    def resolve(self) -> str:
+        path = self.locate()
+        if path is not None:
+            return path
+
+        errors = []
+        for source in self.sources:
+            try:
+                return source.resolve()
+            except FileNotFoundError as e:
+                errors.append(str(e))
+
+        raise FileNotFoundError("No dataset source available: " + "; ".join(errors))
+
+    def describe(self) -> str:
+        return " -> ".join(source.describe() for source in self.sources)
+
+
+def build_default_source() -> DatasetSource:
+    """
+    Build the source chain described by the current settings.
+    """
+    sources: List[DatasetSource] = []
+
+    if settings.data_path:
+        sources.append(LocalFileSource(settings.data_path))
+
+    if settings.data_snapshot_dir:
+        sources.append(
+            SnapshotDirectorySource(
+                settings.data_snapshot_dir,
+                filename=settings.kaggle_file,
+                version=settings.data_snapshot_version,
+            )
+        )
+
+    sources.append(
+        KaggleSource(
+            settings.kaggle_dataset,
+            filename=settings.kaggle_file,
+            allow_download=settings.kaggle_fallback,
+        )
+    )
+
+    return ChainedSource(sources)
+
+
+# -------------------------------------------
+# Process-wide source, resolved once
+# -------------------------------------------
+
+_SOURCE: Optional[DatasetSource] = None
+_RESOLVED_PATH: Optional[str] = None
+_LOCK = threading.Lock()
+
+DEFAULT_DATASET_ID = "default"
+
+# Registered dataset ids and the paths resolved for them
+_DATASETS: Dict[str, DatasetSource] = {}
+_RESOLVED_IDS: Dict[str, str] = {}
+
+
+def set_dataset_source(source: DatasetSource) -> None:
+    """
+    Replace the process-wide source (e.g. to point tools at another file).
+    """
+    global _SOURCE, _RESOLVED_PATH
+
+    with _LOCK:
+        _SOURCE = source
+        _RESOLVED_PATH = None
+        _RESOLVED_IDS.clear()
+
+
+def get_dataset_source() -> DatasetSource:
+    global _SOURCE
+
+    if _SOURCE is None:
+        with _LOCK:
+            if _SOURCE is None:
+                _SOURCE = build_default_source()
+    return _SOURCE
+
+
+def resolve_dataset_path() -> str:
+    """
+    Return the dataset file path; the source chain is only walked once.
+    """
+    global _RESOLVED_PATH
+
+    if _RESOLVED_PATH is None:
+        source = get_dataset_source()
+        with _LOCK:
+            if _RESOLVED_PATH is None:
+                _RESOLVED_PATH = source.resolve()
+    return _RESOLVED_PATH
+
+
+# -------------------------------------------
+# Dataset ids
+# -------------------------------------------
+
+def register_dataset(dataset_id: str, source: Union[DatasetSource, str]) -> None:
+    """
+    Make a dataset addressable by id; `source` may be a plain file path.
+    """
+    if not dataset_id or dataset_id == DEFAULT_DATASET_ID:
+        raise ValueError(f"Invalid dataset id: {dataset_id!r}")
+
+    with _LOCK:
+        _DATASETS[dataset_id] = LocalFileSource(source) if isinstance(source, str) else source
+        _RESOLVED_IDS.pop(dataset_id, None)
+
+
+def _snapshot_source(version: Optional[str] = None) -> Optional[SnapshotDirectorySource]:
+    if not settings.data_snapshot_dir:
+        return None
+    return SnapshotDirectorySource(settings.data_snapshot_dir, filename=settings.kaggle_file, version=version)
+
+
+def list_dataset_ids() -> List[str]:
+    """
+    The default dataset, registered ids and snapshot versions.
+    """
+    snapshots = _snapshot_source()
+    versions = [version for version, _ in snapshots.list_versions()] if snapshots else []
+    ids = [DEFAULT_DATASET_ID] + sorted(_DATASETS)
+    return ids + [version for version in versions if version not in ids]
+
+
+def resolve_dataset_id_path(dataset_id: Optional[str] = None) -> str:
+    """
+    Return the file of a dataset id (resolved once per id).
+
+    Registered ids win over snapshot versions of the same name. Raises
+    ValueError for an id that names no dataset.
+    """
+    if dataset_id is None or dataset_id == DEFAULT_DATASET_ID:
+        return resolve_dataset_path()
+
+    path = _RESOLVED_IDS.get(dataset_id)
+    if path is not None:
+        return path
+
+    source = _DATASETS.get(dataset_id) or _snapshot_source(dataset_id)
+    try:
+        path = source.resolve() if source is not None else None
+    except FileNotFoundError:
+        path = None
+    if path is None:
+        raise ValueError(f"Unknown dataset id {dataset_id!r}. Available: {', '.join(list_dataset_ids())}")
+
+    with _LOCK:
+        _RESOLVED_IDS[dataset_id] = path
+    return path
@@ -1,50 +1,139 @@
 import os
-import kagglehub
+import copy
+import hashlib
+import threading
 import pandas as pd
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import numpy as np
-
-def load_raw_marketing_data() -> pd.DataFrame:
-
-    DATA_PATH = kagglehub.dataset_download("imakash3011/customer-personality-analysis")
-
-    # Adjust filename if needed based on actual listing above
-    csv_path = os.path.join(DATA_PATH, "marketing_campaign.csv")
+import pyarrow as pa
+
+from agno_app import data_interface, feature_store
+from agno_app.config import settings
+from agno_app.dataset_registry import DatasetRegistry, RegistryEntry, frame_nbytes
+from agno_app.instrumentation import REGISTRY, traced
+from agno_app.sketches import QuantileSketch
+
+# Copy-on-write makes the shallow copies handed out by get_final_dataset()
+# safe to modify without touching the cached frame (always on from pandas 3)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Parameters of the cleaning / feature engineering pipeline. They are recorded
+# in the feature store manifest, so changing any of them rebuilds the artifact.
+MARITAL_MAP = {
+    "Married": "Married",
+    "Together": "Together",
+    "Single": "Single",
+    "Divorced": "Divorced",
+    "Widow": "Widow",
+    "Alone": "Single",   # Usually means living alone
+    "Absurd": "Other",
+    "YOLO": "Other"
+}
+
+EDU_MAP = {
+    "Graduation": "Graduate",
+    "PhD": "PhD",
+    "Master": "Master",
+    "2n Cycle": "Undergraduate",
+    "Basic": "Basic"
+}
+
+CLIP_COLUMNS: List[str] = ["NumWebPurchases", "NumCatalogPurchases"]
+CLIP_QUANTILE = 0.99
+HIGH_VALUE_QUANTILE = 0.80
+
+PURCHASE_COLUMNS: List[str] = [
+    "NumWebPurchases",
+    "NumCatalogPurchases",
+    "NumStorePurchases",
+    "NumWebVisitsMonth"
+]
+
+SPEND_COLUMNS: List[str] = [
+    "MntWines",
+    "MntFruits",
+    "MntMeatProducts",
+    "MntFishProducts",
+    "MntSweetProducts",
+    "MntGoldProds",
+]
+
+PIPELINE_PARAMS = {
+    "pipeline_version": 1,
+    "marital_map": MARITAL_MAP,
+    "edu_map": EDU_MAP,
+    "clip_columns": CLIP_COLUMNS,
+    "clip_quantile": CLIP_QUANTILE,
+    "income_fill": "median",
+    "high_value_quantile": HIGH_VALUE_QUANTILE,
+}
+
+@dataclass
+class PipelineStats:
+    """
+    The dataset-wide statistics clean_data() and feature_engineering() need.
+
+    Without one, both functions compute them from the frame they are given.
+    Passing one (see collect_pipeline_stats()) makes every step row-local,
+    so the pipeline can be applied chunk by chunk.
+    """
+
+    clip_upper: Dict[str, int]          # rounded CLIP_QUANTILE of each CLIP_COLUMNS column
+    income_median: float                # fill value for missing Income
+    ref_date: Optional[pd.Timestamp]    # latest Dt_Customer (None when there are no dates)
+    high_value_threshold: float         # HIGH_VALUE_QUANTILE of TotalSpend
+
+def compute_pipeline_stats(df: pd.DataFrame) -> PipelineStats:
+    """
+    PipelineStats of a raw frame, equal to what the serial pipeline computes.
+    """
+    # Only distinct date strings are parsed: the max does not need every row
+    dates = pd.to_datetime(pd.Series(df["Dt_Customer"].unique()), format="%d-%m-%Y")
+
+    return PipelineStats(
+        clip_upper={col: round(df[col].quantile(CLIP_QUANTILE)) for col in CLIP_COLUMNS},
+        income_median=df["Income"].median(),
+        ref_date=dates.max() if dates.notna().any() else None,
+        high_value_threshold=df[SPEND_COLUMNS].sum(axis=1).quantile(HIGH_VALUE_QUANTILE),
+    )
+
+def resolve_csv_path(dataset_id: Optional[str] = None) -> str:
+    """
+    Return the local path of marketing_campaign.csv, or of another dataset id.
+
+    The configured dataset source (agno_app/data_interface.py) is resolved
+    once per process; Kaggle is only contacted when no local copy exists.
+    """
+    return data_interface.resolve_dataset_id_path(dataset_id)
+
+@traced("dataset.load_raw", kind="dataset")
+def load_raw_marketing_data(csv_path: Optional[str] = None) -> pd.DataFrame:
+
+    if csv_path is None:
+        csv_path = resolve_csv_path()
 
     df = pd.read_csv(csv_path, sep="\t", encoding="utf-8")
 
     return df
 
 
-def clean_data() -> pd.DataFrame:
+@traced("dataset.clean", kind="dataset")
+def clean_data(df: Optional[pd.DataFrame] = None, stats: Optional[PipelineStats] = None) -> pd.DataFrame:
 
-    df = load_raw_marketing_data()
+    if df is None:
+        df = load_raw_marketing_data()
 
     # 1. Clean 'Marital_Status' column
-    marital_map = {
-        "Married": "Married",
-        "Together": "Together",
-        "Single": "Single",
-        "Divorced": "Divorced",
-        "Widow": "Widow",
-        "Alone": "Single",   # Usually means living alone
-        "Absurd": "Other",
-        "YOLO": "Other"
-    }
-    df["Marital_Status"] = df["Marital_Status"].map(marital_map)
+    df["Marital_Status"] = df["Marital_Status"].map(MARITAL_MAP)
 
     # lowering the "Marital_Status" column values for comparison later on
     df["Marital_Status"] = df["Marital_Status"].str.strip().str.lower()
 
     # 2. Clean 'Education' column
-    edu_map = {
-        "Graduation": "Graduate",
-        "PhD": "PhD",
-        "Master": "Master",
-        "2n Cycle": "Undergraduate",
-        "Basic": "Basic"
-    }
-    df["Education"] = df["Education"].map(edu_map)
+    df["Education"] = df["Education"].map(EDU_MAP)
 
     # lowering the "Education" column values for comparison later on
     df["Education"] = df["Education"].str.strip().str.lower()
@@ -53,30 +142,62 @@ def clean_data() -> pd.DataFrame:
     df.drop(columns=["Z_CostContact", "Z_Revenue"], inplace=True)
 
     # 4. Capiing outliers
-    cols = ["NumWebPurchases", "NumCatalogPurchases"]
-    for col in cols:
-        df[col] = df[col].clip(upper=round(df[col].quantile(0.99)))
+    for col in CLIP_COLUMNS:
+        upper = stats.clip_upper[col] if stats else round(df[col].quantile(CLIP_QUANTILE))
+        df[col] = df[col].clip(upper=upper)
 
     # 5. Handling missing values in 'Income' by median imputation
-    df["Income"] = df["Income"].fillna(df["Income"].median())
+    income_median = stats.income_median if stats else df["Income"].median()
+    df["Income"] = df["Income"].fillna(income_median)
 
     # 6. Parsing 'Dt_Customer' to datetime (dataset uses day-first formats)
     df["Dt_Customer"] = pd.to_datetime(df["Dt_Customer"], format="%d-%m-%Y")
 
     return df
 
-def feature_engineering() -> pd.DataFrame:
+# -------------------------------------------
+# Compact schema
+# -------------------------------------------
+'''
+The engineered frame keeps Marital_Status / Education as Python strings and
+every count or flag column as int64. In compact mode the string columns
+become categoricals and integer columns are downcast to the narrowest width
+that holds their values. Float columns stay float64: pandas accumulates
+float32 means in float32, which would change the numbers the tools report.
+'''
+CATEGORICAL_COLUMNS: List[str] = ["Marital_Status", "Education"]
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return the frame with categorical strings and downcast integer columns.
+    """
+    df = df.copy(deep=False)
+
+    for col in df.columns:
+        if col in CATEGORICAL_COLUMNS:
+            df[col] = df[col].astype("category")
+        elif pd.api.types.is_integer_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+
+    return df
 
-    df = clean_data()
+def memory_footprint(df: pd.DataFrame) -> Dict[str, int]:
+    """
+    Bytes used by each column (strings included), plus a "total" entry.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    footprint = {col: int(nbytes) for col, nbytes in usage.items()}
+    footprint["total"] = int(usage.sum())
+    return footprint
+
+@traced("dataset.features", kind="dataset")
+def feature_engineering(df: Optional[pd.DataFrame] = None, stats: Optional[PipelineStats] = None) -> pd.DataFrame:
+
+    if df is None:
+        df = clean_data()
 
     # 1. Creating 'Total_Purchases' feature
-    purchase_cols = [
-        "NumWebPurchases",
-        "NumCatalogPurchases",
-        "NumStorePurchases",
-        "NumWebVisitsMonth"
-    ]
-    df["Total_Purchases"] = df[purchase_cols].sum(axis=1)
+    df["Total_Purchases"] = df[PURCHASE_COLUMNS].sum(axis=1)
 
     # 2. Creating 'Total_Children' feature
     df["Total_Children"] = df["Kidhome"] + df["Teenhome"]
@@ -84,8 +205,12 @@ def feature_engineering() -> pd.DataFrame:
     # 3. Creating 'Customer_Tenure' feature
 
     # CustomerTenureDays = latest Dt_Customer - Dt_Customer
-    if df["Dt_Customer"].notna().any():
-        ref_date = df["Dt_Customer"].max()
+    if stats:
+        ref_date = stats.ref_date
+    else:
+        ref_date = df["Dt_Customer"].max() if df["Dt_Customer"].notna().any() else None
+
+    if ref_date is not None:
         df["CustomerTenureDays"] = (ref_date - df["Dt_Customer"]).dt.days
     else:
         df["CustomerTenureDays"] = np.nan
@@ -93,27 +218,565 @@ def feature_engineering() -> pd.DataFrame:
     # 4. Creating 'TotalSpend' feature
 
     # TotalSpend = sum of all product spends
-    SPEND_COLUMNS: List[str] = [
-    "MntWines",
-    "MntFruits",
-    "MntMeatProducts",
-    "MntFishProducts",
-    "MntSweetProducts",
-    "MntGoldProds",
-    ]
-
     df["TotalSpend"] = df[SPEND_COLUMNS].sum(axis=1)
 
     # 5. Creating 'IsHighValue' feature
 
     # IsHighValue = top 20% by TotalSpend
-    high_value_threshold = df["TotalSpend"].quantile(0.80)
+    if stats:
+        high_value_threshold = stats.high_value_threshold
+    else:
+        high_value_threshold = df["TotalSpend"].quantile(HIGH_VALUE_QUANTILE)
     df["IsHighValue"] = df["TotalSpend"] >= high_value_threshold
 
     return df
 
-def get_final_dataset() -> pd.DataFrame:
-    return feature_engineering()
+# -------------------------------------------
+# Parallel pipeline
+# -------------------------------------------
+'''
+clean_data() and feature_engineering() are row-local once the global
+statistics are known, so a large raw frame can be split across a process
+pool: the statistics are computed once in the parent (cheap reductions),
+sent to every worker with its partition, and the engineered partitions are
+joined with a single concat. The result is identical to the serial path.
+'''
+# Below this many rows per worker the pickling overhead outweighs the gain
+MIN_PARTITION_ROWS = 50_000
+
+def _pipeline_partition(part: pd.DataFrame, stats: PipelineStats) -> pd.DataFrame:
+    # Runs in a worker process
+    return feature_engineering(clean_data(part, stats), stats)
+
+def parallel_feature_engineering(df: Optional[pd.DataFrame] = None, workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    clean_data() + feature_engineering() over `workers` processes.
+
+    Falls back to the serial path for one worker or small frames.
+    """
+    if df is None:
+        df = load_raw_marketing_data()
+    workers = workers or settings.pipeline_workers
+
+    n_parts = min(workers, len(df) // MIN_PARTITION_ROWS)
+    if n_parts <= 1:
+        return feature_engineering(clean_data(df))
+
+    stats = compute_pipeline_stats(df)
+    bounds = np.linspace(0, len(df), n_parts + 1).astype(int)
+
+    # Partitions are views on the raw frame; they are only copied when pickled
+    with ProcessPoolExecutor(max_workers=n_parts) as pool:
+        futures = [
+            pool.submit(_pipeline_partition, df.iloc[start:stop], stats)
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        parts = [future.result() for future in futures]
+
+    return pd.concat(parts, ignore_index=True)
+
+# -------------------------------------------
+# Chunked streaming ingestion
+# -------------------------------------------
+'''
+For sources that do not fit in memory the pipeline runs in two passes over
+the file, each reading STREAM_CHUNK_ROWS rows at a time:
+
+1. collect_pipeline_stats() folds every raw chunk into mergeable sketches
+   (agno_app/sketches.py) and derives the PipelineStats from them.
+2. stream_features() re-reads the file, applies clean_data() and
+   feature_engineering() to each chunk with those statistics and appends the
+   result to a feature store artifact, which is then memory-mapped.
+
+Peak memory is one chunk plus the sketches, and the artifact holds exactly
+the frame the in-memory pipeline would have built.
+'''
+DEFAULT_CHUNK_ROWS = 250_000
+
+@dataclass
+class PipelineSketches:
+    """
+    Mergeable summaries of the raw columns PipelineStats is derived from.
+    """
+
+    clip: Dict[str, QuantileSketch] = field(default_factory=lambda: {col: QuantileSketch() for col in CLIP_COLUMNS})
+    income: QuantileSketch = field(default_factory=QuantileSketch)
+    total_spend: QuantileSketch = field(default_factory=QuantileSketch)
+    max_date: Optional[pd.Timestamp] = None
+    n_rows: int = 0
+    n_missing_dates: int = 0
+    # Numeric dtype of every raw column over all chunks (None: not numeric)
+    dtypes: Dict[str, Optional[np.dtype]] = field(default_factory=dict)
+
+    def update(self, raw: pd.DataFrame) -> "PipelineSketches":
+        """
+        Fold one chunk of the raw file in.
+        """
+        other = PipelineSketches()
+        for col in CLIP_COLUMNS:
+            other.clip[col].update(raw[col].to_numpy())
+        other.income.update(raw["Income"].to_numpy())
+        other.total_spend.update(raw[SPEND_COLUMNS].sum(axis=1).to_numpy())
+
+        dates = pd.to_datetime(raw["Dt_Customer"], format="%d-%m-%Y")
+        other.max_date = dates.max() if dates.notna().any() else None
+        other.n_rows = len(raw)
+        other.n_missing_dates = int(dates.isna().sum())
+        other.dtypes = {col: dtype if dtype.kind in "iuf" else None for col, dtype in raw.dtypes.items()}
+
+        return self.merge(other)
+
+    def merge(self, other: "PipelineSketches") -> "PipelineSketches":
+        for col in CLIP_COLUMNS:
+            self.clip[col].merge(other.clip[col])
+        self.income.merge(other.income)
+        self.total_spend.merge(other.total_spend)
+
+        if other.max_date is not None and (self.max_date is None or other.max_date > self.max_date):
+            self.max_date = other.max_date
+        self.n_rows += other.n_rows
+        self.n_missing_dates += other.n_missing_dates
+
+        for col, dtype in other.dtypes.items():
+            if col not in self.dtypes:
+                self.dtypes[col] = dtype
+            elif self.dtypes[col] is not None and dtype is not None:
+                # Same promotion read_csv does when a column has ints and floats
+                self.dtypes[col] = np.result_type(self.dtypes[col], dtype)
+            else:
+                self.dtypes[col] = None
+
+        return self
+
+    def stats(self, high_value_quantile: float = HIGH_VALUE_QUANTILE) -> PipelineStats:
+        return PipelineStats(
+            clip_upper={col: round(sketch.quantile(CLIP_QUANTILE)) for col, sketch in self.clip.items()},
+            income_median=self.income.median(),
+            ref_date=self.max_date,
+            high_value_threshold=self.total_spend.quantile(high_value_quantile),
+        )
+
+def _read_chunks(csv_path: str, chunksize: int, dtype: Optional[Dict[str, np.dtype]] = None):
+    return pd.read_csv(csv_path, sep="\t", encoding="utf-8", chunksize=chunksize, dtype=dtype)
+
+def collect_pipeline_stats(csv_path: Optional[str] = None, chunksize: int = DEFAULT_CHUNK_ROWS) -> PipelineSketches:
+    """
+    First pass: sketch the raw file chunk by chunk.
+    """
+    if csv_path is None:
+        csv_path = resolve_csv_path()
+
+    sketches = PipelineSketches()
+    with _read_chunks(csv_path, chunksize) as reader:
+        for chunk in reader:
+            sketches.update(chunk)
+
+    return sketches
+
+def _stream_schema(df: pd.DataFrame, sketches: PipelineSketches) -> pa.Schema:
+    # The first chunk fixes the artifact schema, so widen what a single chunk
+    # can get wrong: all-missing string columns and tenure without gaps
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    string_type = pa.Array.from_pandas(pd.Series(["x"])).type
+
+    for i, f in enumerate(schema):
+        if f.name in CATEGORICAL_COLUMNS and not (pa.types.is_string(f.type) or pa.types.is_large_string(f.type)):
+            schema = schema.set(i, f.with_type(string_type))
+        elif f.name == "CustomerTenureDays" and sketches.n_missing_dates:
+            schema = schema.set(i, f.with_type(pa.float64()))
+
+    return schema
+
+def _streaming_params() -> Dict[str, Any]:
+    # Streamed artifacts are always full width; compact_dtypes() runs on load
+    return {**PIPELINE_PARAMS, "compact_schema": False}
+
+def stream_features(
+    csv_path: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    source_hash: Optional[str] = None,
+    store_dir: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Build the full-width feature store artifact chunk by chunk.
+
+    Returns the artifact folder, or None if the store is not writable.
+    """
+    if csv_path is None:
+        csv_path = resolve_csv_path()
+    source_hash = source_hash or feature_store.file_sha256(csv_path)
+
+    # 1. Global statistics
+    sketches = collect_pipeline_stats(csv_path, chunksize)
+    stats = sketches.stats()
+
+    # 2. Row-local cleaning + features, appended chunk by chunk. Numeric raw
+    # columns are read with their file-wide dtype, like a single read would
+    dtypes = {col: dtype for col, dtype in sketches.dtypes.items() if dtype is not None}
+    writer = feature_store.FeatureWriter(csv_path, source_hash, _streaming_params(), store_dir)
+
+    try:
+        with _read_chunks(csv_path, chunksize, dtypes) as reader:
+            for chunk in reader:
+                df = feature_engineering(clean_data(chunk, stats), stats)
+                if writer.schema is None:
+                    writer.schema = _stream_schema(df, sketches)
+                writer.write(df)
+        return writer.close()
+    except OSError:
+        writer.abort()
+        return None
+
+# -------------------------------------------
+# In-process dataset cache
+# -------------------------------------------
+'''
+The engineered frame is built once per version of the source file and shared
+by every tool call in the process. A version is identified by the file's
+(path, mtime, size), so replacing the CSV on disk is picked up automatically
+on the next call. Structures derived from the frame (indexes, aggregate
+cubes) are cached alongside it with get_dataset_artifact().
+
+On a cold start the frame is read from the on-disk feature store when an
+artifact for the same source content and pipeline parameters exists.
+
+Frames of several datasets (dataset ids, see agno_app/data_interface.py)
+are kept in a registry bounded by DATASET_MEMORY_BUDGET_MB: the least
+recently used ones are evicted and reloaded, from the feature store, on
+their next use (see agno_app/dataset_registry.py).
+'''
+DATASETS = DatasetRegistry(
+    None if settings.dataset_memory_budget_mb is None else settings.dataset_memory_budget_mb * 2**20
+)
+REGISTRY.add_collector(DATASETS.metric_lines)
+
+_ARTIFACT_LOCK = threading.Lock()
+
+def _source_identity(csv_path: str) -> Tuple[str, int, int]:
+    st = os.stat(csv_path)
+    return (os.path.abspath(csv_path), st.st_mtime_ns, st.st_size)
+
+def _store_params() -> Dict[str, Any]:
+    # Compact and full-width frames are stored as separate artifacts
+    return {**PIPELINE_PARAMS, "compact_schema": settings.compact_schema}
+
+@traced("dataset.build", kind="dataset")
+def _build_dataset(csv_path: str) -> Tuple[pd.DataFrame, str]:
+    """
+    Return the engineered frame and where it came from, fastest source first.
+    """
+    # Service workers map the artifact their parent process published
+    if settings.shared_dataset_dir:
+        df = feature_store.attach_features(settings.shared_dataset_dir, csv_path, _store_params())
+        if df is not None:
+            return df, "shared"
+
+    source_hash = feature_store.file_sha256(csv_path)
+    params = _store_params()
+
+    df = feature_store.load_features(source_hash, params)
+    if df is not None:
+        return df, "feature_store"
+
+    if settings.stream_chunk_rows > 0:
+        # Larger-than-memory sources: stream into a full-width artifact and
+        # memory-map it; compaction, if enabled, happens after loading
+        df = feature_store.load_features(source_hash, _streaming_params())
+        if df is None and stream_features(csv_path, settings.stream_chunk_rows, source_hash) is not None:
+            df = feature_store.load_features(source_hash, _streaming_params())
+        if df is not None:
+            return (compact_dtypes(df) if settings.compact_schema else df), "streamed"
+
+    df = parallel_feature_engineering(load_raw_marketing_data(csv_path))
+    if settings.compact_schema:
+        df = compact_dtypes(df)
+    feature_store.save_features(df, csv_path, source_hash, params)
+
+    return df, "csv"
+
+def with_high_value_quantile(df: pd.DataFrame, quantile: float) -> pd.DataFrame:
+    """
+    Return the frame with IsHighValue recomputed for another TotalSpend
+    quantile; no other column changes.
+    """
+    df = df.copy(deep=False)
+    df["IsHighValue"] = df["TotalSpend"] >= df["TotalSpend"].quantile(quantile)
+    return df
+
+def _load_dataset(csv_path: str) -> Tuple[pd.DataFrame, str]:
+    df, loaded_from = _build_dataset(csv_path)
+    # Stored artifacts are always built with the pipeline's HIGH_VALUE_QUANTILE:
+    # another setting recomputes one column instead of rebuilding the dataset
+    if settings.high_value_quantile != HIGH_VALUE_QUANTILE:
+        df = with_high_value_quantile(df, settings.high_value_quantile)
+    return df, loaded_from
+
+def _dataset_id(dataset_id: Optional[str]) -> str:
+    return dataset_id or data_interface.DEFAULT_DATASET_ID
+
+def _current_entry(dataset_id: Optional[str] = None) -> RegistryEntry:
+    csv_path = resolve_csv_path(dataset_id)
+    return DATASETS.get(_dataset_id(dataset_id), _source_identity(csv_path), lambda: _load_dataset(csv_path))
+
+def get_dataset_version(dataset_id: Optional[str] = None) -> str:
+    """
+    Return a short identifier of the current source file version.
+    """
+    key = _source_identity(resolve_csv_path(dataset_id))
+
+    # Appended batches make a new version of the same source file
+    entry = DATASETS.peek(_dataset_id(dataset_id))
+    if entry is not None and entry.key == key and entry.revision:
+        key = (*key, entry.revision)
+
+    # So is another high-value quantile (cached answers depend on IsHighValue)
+    if settings.high_value_quantile != HIGH_VALUE_QUANTILE:
+        key = (*key, ("high_value_quantile", settings.high_value_quantile))
+
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+
+def get_final_dataset(dataset_id: Optional[str] = None) -> pd.DataFrame:
+    """
+    Return the engineered dataset, building it only when the source changed.
+
+    The returned frame is a read-only view of the cached one: with
+    copy-on-write, any modification made by the caller stays local to it.
+    """
+    return _current_entry(dataset_id).df.copy(deep=False)
+
+def get_dataset_artifact(name: str, builder: Callable[[pd.DataFrame], Any], dataset_id: Optional[str] = None) -> Any:
+    """
+    Return `builder(df)` computed once per dataset version.
+
+    Used for indexes and pre-aggregations derived from the engineered frame;
+    they are dropped together with the frame when the source changes, and
+    count towards DATASET_MEMORY_BUDGET_MB with it. The builder receives
+    the cached frame itself and must not modify it.
+    """
+    entry = _current_entry(dataset_id)
+
+    artifact = entry.artifacts.get(name)
+    if artifact is None:
+        with _ARTIFACT_LOCK:
+            artifact = entry.artifacts.get(name)
+            if artifact is None:
+                artifact = builder(entry.df)
+                DATASETS.add_artifact(entry, name, artifact)
+
+    return artifact
+
+def invalidate(dataset_id: Optional[str] = None) -> None:
+    """
+    Drop one cached dataset, or all of them when no id is given; the next
+    get_final_dataset() call rebuilds it.
+
+    Rows added with append_customers() are dropped as well.
+    """
+    DATASETS.drop(dataset_id)
+
+def refresh(dataset_id: Optional[str] = None) -> pd.DataFrame:
+    """
+    Rebuild the cached dataset immediately and return it.
+    """
+    invalidate(_dataset_id(dataset_id))
+    return get_final_dataset(dataset_id)
+
+def registry_report() -> Dict[str, Any]:
+    """
+    Resident datasets, memory use and hit / miss / eviction counters.
+    """
+    return DATASETS.report()
+
+def publish_dataset(dataset_id: Optional[str] = None) -> str:
+    """
+    Make sure the current source version is in the feature store and return
+    its artifact folder, for other processes to attach (SHARED_DATASET_DIR).
+
+    Rows added with append_customers() are not part of the artifact.
+    """
+    csv_path = resolve_csv_path(dataset_id)
+    entry = _current_entry(dataset_id)
+
+    source_hash = feature_store.file_sha256(csv_path)
+    params = _store_params()
+    if feature_store.read_manifest(source_hash, params) is not None:
+        return feature_store.artifact_dir(source_hash, params)
+
+    if entry.revision:
+        raise ValueError("The cached dataset has appended rows; invalidate() it before publishing")
+
+    # Built in memory or from a streamed (full-width) artifact: store it as
+    # is, with IsHighValue back at the pipeline's quantile
+    df = entry.df
+    if settings.high_value_quantile != HIGH_VALUE_QUANTILE:
+        df = with_high_value_quantile(df, HIGH_VALUE_QUANTILE)
+    folder = feature_store.save_features(df, csv_path, source_hash, params)
+    if folder is None:
+        raise OSError(f"Feature store is not writable: {settings.feature_store_dir}")
+    return folder
+
+# -------------------------------------------
+# Incremental append
+# -------------------------------------------
+'''
+New customers can be added to the cached dataset without re-running the
+pipeline. The global statistics are kept as mergeable sketches, so a batch
+only has to be folded into them; existing rows are then touched only where
+a statistic they depend on moved:
+
+    clip bound of a CLIP_COLUMNS column -> that column and Total_Purchases
+    Income median                       -> rows whose Income was imputed
+    latest Dt_Customer                  -> CustomerTenureDays
+    TotalSpend threshold                -> IsHighValue
+
+To re-clip and re-impute, the unclipped values and the missing-Income mask
+of every row are kept next to the sketches. Appended rows live in memory
+(as a new dataset version) until the source file itself changes.
+'''
+
+@dataclass
+class _AppendState:
+    sketches: PipelineSketches
+    stats: PipelineStats
+    raw_clip: Dict[str, np.ndarray]   # unclipped CLIP_COLUMNS values, row-aligned with the frame
+    income_missing: np.ndarray        # rows whose Income was filled with the median
+
+@dataclass
+class AppendResult:
+    """
+    What append_customers() changed.
+    """
+
+    n_appended: int
+    n_rows: int
+    version: str
+    stats_before: PipelineStats
+    stats_after: PipelineStats
+    changed_columns: List[str]                                   # recomputed on existing rows
+    became_high_value: List[int] = field(default_factory=list)     # IDs of existing rows
+    no_longer_high_value: List[int] = field(default_factory=list)  # IDs of existing rows
+    n_reclipped: Dict[str, int] = field(default_factory=dict)
+    n_reimputed_income: int = 0
+
+def _build_append_state(csv_path: str) -> _AppendState:
+    # One chunked pass over the source, like collect_pipeline_stats()
+    sketches = PipelineSketches()
+    raw_clip: Dict[str, List[np.ndarray]] = {col: [] for col in CLIP_COLUMNS}
+    income_missing: List[np.ndarray] = []
+
+    with _read_chunks(csv_path, DEFAULT_CHUNK_ROWS) as reader:
+        for chunk in reader:
+            sketches.update(chunk)
+            for col in CLIP_COLUMNS:
+                raw_clip[col].append(chunk[col].to_numpy())
+            income_missing.append(chunk["Income"].isna().to_numpy())
+
+    return _AppendState(
+        sketches=sketches,
+        stats=sketches.stats(settings.high_value_quantile),
+        raw_clip={col: np.concatenate(parts) for col, parts in raw_clip.items()},
+        income_missing=np.concatenate(income_missing),
+    )
+
+_APPEND_LOCK = threading.Lock()
+
+def append_customers(new_rows: pd.DataFrame, dataset_id: Optional[str] = None) -> AppendResult:
+    """
+    Append raw customer rows (same columns as the source file) to the dataset.
+
+    Only the new rows go through clean_data() / feature_engineering(); the
+    result equals running the whole pipeline on the old rows followed by the
+    new ones. Cached indexes are rebuilt lazily for the new version. The
+    dataset stays resident (it is no longer evictable) from then on.
+    """
+    with _APPEND_LOCK:
+        entry = _current_entry(dataset_id)
+        key, df, artifacts, revision = entry.key, entry.df, entry.artifacts, entry.revision
+
+        state = artifacts.get("append_state")
+        if state is None:
+            state = _build_append_state(key[0])
+
+        # 1. Fold the batch into a copy of the sketches
+        sketches = copy.deepcopy(state.sketches)
+        sketches.update(new_rows)
+        before, after = state.stats, sketches.stats(settings.high_value_quantile)
+
+        # 2. Clean + engineer only the new rows, with the updated statistics
+        new_df = feature_engineering(clean_data(new_rows.copy(), after), after)
+
+        # 3. Recompute the derived columns whose statistic moved
+        df = df.copy(deep=False)
+        changed: List[str] = []
+        n_reclipped: Dict[str, int] = {}
+        n_reimputed_income = 0
+        became_high_value: List[int] = []
+        no_longer_high_value: List[int] = []
+
+        for col in CLIP_COLUMNS:
+            if after.clip_upper[col] != before.clip_upper[col]:
+                clipped = np.minimum(state.raw_clip[col], after.clip_upper[col])
+                n_reclipped[col] = int((clipped != df[col].to_numpy()).sum())
+                df[col] = clipped
+                changed.append(col)
+        if n_reclipped:
+            df["Total_Purchases"] = df[PURCHASE_COLUMNS].sum(axis=1)
+            changed.append("Total_Purchases")
+
+        if after.income_median != before.income_median and state.income_missing.any():
+            income = df["Income"].to_numpy().copy()
+            income[state.income_missing] = after.income_median
+            df["Income"] = income
+            n_reimputed_income = int(state.income_missing.sum())
+            changed.append("Income")
+
+        if after.ref_date is not None and after.ref_date != before.ref_date:
+            df["CustomerTenureDays"] = (after.ref_date - df["Dt_Customer"]).dt.days
+            changed.append("CustomerTenureDays")
+
+        if after.high_value_threshold != before.high_value_threshold:
+            was = df["IsHighValue"].to_numpy()
+            now = df["TotalSpend"].to_numpy() >= after.high_value_threshold
+            ids = df["ID"].to_numpy()
+            became_high_value = ids[now & ~was].tolist()
+            no_longer_high_value = ids[was & ~now].tolist()
+            df["IsHighValue"] = now
+            changed.append("IsHighValue")
+
+        # 4. Install the combined frame as a new version of the dataset
+        combined = pd.concat([df, new_df], ignore_index=True)
+        if settings.compact_schema:
+            combined = compact_dtypes(combined)
+
+        new_state = _AppendState(
+            sketches=sketches,
+            stats=after,
+            raw_clip={
+                col: np.concatenate([state.raw_clip[col], new_rows[col].to_numpy()])
+                for col in CLIP_COLUMNS
+            },
+            income_missing=np.concatenate([state.income_missing, new_rows["Income"].isna().to_numpy()]),
+        )
+        DATASETS.install(replace(
+            entry,
+            df=combined,
+            frame_bytes=frame_nbytes(combined),
+            artifacts={"append_state": new_state},
+            revision=revision + 1,
+        ))
+
+    return AppendResult(
+        n_appended=len(new_df),
+        n_rows=len(combined),
+        version=get_dataset_version(dataset_id),
+        stats_before=before,
+        stats_after=after,
+        changed_columns=changed,
+        became_high_value=became_high_value,
+        no_longer_high_value=no_longer_high_value,
+        n_reclipped=n_reclipped,
+        n_reimputed_income=n_reimputed_income,
+    )
 
 if __name__ == "__main__":
 
@@ -133,3 +796,46 @@ if __name__ == "__main__":
     print(fe_df.shape)
     print()
 
+    print("\nMemory footprint (bytes): standard vs compact")
+    standard = memory_footprint(fe_df)
+    compact = memory_footprint(compact_dtypes(fe_df))
+    for col in standard:
+        print(f"{col:<22} {standard[col]:>10} {compact[col]:>10}")
+    print()
+
+
+    print("\nParallel pipeline (2 workers) vs serial pipeline")
+    # Repeated so that both workers get at least MIN_PARTITION_ROWS rows
+    raw = load_raw_marketing_data()
+    raw = pd.concat([raw] * (2 * MIN_PARTITION_ROWS // len(raw) + 1), ignore_index=True)
+    parallel = parallel_feature_engineering(raw.copy(), workers=2)
+    serial = feature_engineering(clean_data(raw))
+    pd.testing.assert_frame_equal(serial, parallel, check_exact=True)
+    print(f"Identical ({len(parallel)} rows)")
+
+    print("\nStreaming pipeline (chunks of 500 rows) vs in-memory pipeline")
+    csv_path = resolve_csv_path()
+    folder = stream_features(csv_path, chunksize=500)
+    if folder is None:
+        print("Feature store is not writable, skipped.")
+    else:
+        streamed = feature_store.load_features(feature_store.file_sha256(csv_path), _streaming_params())
+        pd.testing.assert_frame_equal(fe_df, streamed, check_exact=True)
+        print(f"Identical ({len(streamed)} rows, artifact: {folder})")
+
+    print("\nIncremental append (last 10% of rows as one batch) vs full rebuild")
+    import tempfile
+
+    raw = load_raw_marketing_data(csv_path)
+    cut = int(len(raw) * 0.9)
+    with tempfile.TemporaryDirectory() as tmp:
+        base_path = os.path.join(tmp, "base.csv")
+        raw.iloc[:cut].to_csv(base_path, sep="\t", index=False)
+        data_interface.set_dataset_source(data_interface.LocalFileSource(base_path))
+        invalidate()
+
+        result = append_customers(raw.iloc[cut:].reset_index(drop=True))
+        expected = fe_df if not settings.compact_schema else compact_dtypes(fe_df)
+        pd.testing.assert_frame_equal(expected, get_final_dataset(), check_exact=True)
+        print(f"Identical; recomputed {result.changed_columns}, "
+              f"{len(result.became_high_value)} became / {len(result.no_longer_high_value)} stopped being high value")
@@ -0,0 +1,340 @@
+import time
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+'''
+Engineered frames of several datasets, kept in memory within a budget.
+
+Each dataset id (the default source, a snapshot version, a registered file;
+see agno_app/data_interface.py) has at most one entry: the frame, the
+indexes derived from it and their size in bytes. When the entries together
+exceed the memory budget, the least recently used ones are dropped; the
+next call for an evicted id loads it again, which after the first build is
+a memory-mapped read from the feature store.
+
+Frames with appended rows (append_customers()) exist only in memory and
+are never evicted. The frame being returned is never evicted either, so a
+single dataset larger than the budget still works.
+
+Hits, misses, reloads (misses for an evicted id) and evictions are counted
+and exported with the span metrics (agno_app/instrumentation.py).
+'''
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """
+    Bytes held by a frame, strings included.
+    """
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def artifact_nbytes(artifact: Any, frame: Optional[pd.DataFrame] = None) -> int:
+    """
+    Bytes held by an index or pre-aggregation: the numpy arrays and frames
+    reachable through its attributes and containers.
+
+    `frame`, the dataset it was built from and may keep a reference to, is
+    not counted; neither are plain Python scalars.
+    """
+    seen = {id(frame)}
+    pending = [artifact]
+    total = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        if isinstance(obj, np.ndarray):
+            total += obj.nbytes
+        elif isinstance(obj, pd.DataFrame):
+            total += frame_nbytes(obj)
+        elif isinstance(obj, pd.Series):
+            total += int(obj.memory_usage(deep=True, index=True))
+        elif isinstance(obj, dict):
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            pending.extend(obj)
+        else:
+            pending.extend(getattr(obj, "__dict__", {}).values())
+            pending.extend(getattr(obj, name, None) for name in getattr(type(obj), "__slots__", ()))
+    return total
+
+
+@dataclass
+class RegistryEntry:
+    dataset_id: str
+    key: Tuple                                   # source identity the frame was built from
+    df: pd.DataFrame
+    frame_bytes: int
+    loaded_from: str                             # "shared", "feature_store", "streamed" or "csv"
+    load_s: float
+    artifacts: Dict[str, Any] = field(default_factory=dict)
+    revision: int = 0                            # batches appended with append_customers()
+    last_used: int = 0
+    nbytes: int = 0                              # frame plus artifacts, see measure()
+
+    def measure(self) -> int:
+        # Measured again on every eviction pass: some indexes (top-N orders,
+        # distributions) add a column the first time it is queried
+        self.nbytes = self.frame_bytes + sum(
+            artifact_nbytes(artifact, self.df) for artifact in list(self.artifacts.values())
+        )
+        return self.nbytes
+
+    @property
+    def pinned(self) -> bool:
+        # Appended rows cannot be reloaded from any source
+        return self.revision > 0
+
+
+@dataclass
+class RegistryStats:
+    hits: int = 0
+    misses: int = 0
+    reloads: int = 0
+    evictions: int = 0
+    evicted_bytes: int = 0
+    loads_by_source: Dict[str, int] = field(default_factory=dict)
+    load_s_by_source: Dict[str, float] = field(default_factory=dict)
+
+
+class DatasetRegistry:
+    """
+    LRU map of dataset id -> RegistryEntry with a memory budget.
+
+    Lookups of a resident, up-to-date entry take no lock; loads, installs
+    and evictions are serialized.
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None):
+        self.budget_bytes = budget_bytes
+        self.stats = RegistryStats()
+        self._entries: Dict[str, RegistryEntry] = {}
+        self._evicted: set = set()
+        self._clock = itertools.count(1)
+        self._lock = threading.RLock()
+
+    def get(
+        self,
+        dataset_id: str,
+        key: Tuple,
+        load: Callable[[], Tuple[pd.DataFrame, str]],
+    ) -> RegistryEntry:
+        """
+        Return the entry for `dataset_id`, loading it when it is not resident
+        or was built from another version of the source (`key`).
+
+        `load` returns the frame and where it came from.
+        """
+        entry = self._entries.get(dataset_id)
+        if entry is None or entry.key != key:
+            with self._lock:
+                entry = self._entries.get(dataset_id)
+                if entry is None or entry.key != key:
+                    entry = self._load(dataset_id, key, load)
+                else:
+                    self.stats.hits += 1
+        else:
+            self.stats.hits += 1
+
+        entry.last_used = next(self._clock)
+        return entry
+
+    def _load(self, dataset_id: str, key: Tuple, load: Callable[[], Tuple[pd.DataFrame, str]]) -> RegistryEntry:
+        self.stats.misses += 1
+        if dataset_id in self._evicted:
+            self.stats.reloads += 1
+            self._evicted.discard(dataset_id)
+
+        started = time.perf_counter()
+        df, loaded_from = load()
+        load_s = time.perf_counter() - started
+
+        self.stats.loads_by_source[loaded_from] = self.stats.loads_by_source.get(loaded_from, 0) + 1
+        self.stats.load_s_by_source[loaded_from] = self.stats.load_s_by_source.get(loaded_from, 0.0) + load_s
+
+        entry = RegistryEntry(dataset_id, key, df, frame_nbytes(df), loaded_from, load_s)
+        self.install(entry)
+        return entry
+
+    def install(self, entry: RegistryEntry) -> None:
+        """
+        Add or replace the entry of its dataset id, then evict down to the budget.
+        """
+        with self._lock:
+            entry.last_used = next(self._clock)
+            entry.measure()
+            self._entries[entry.dataset_id] = entry
+            self._evict(keep=entry.dataset_id)
+
+    def add_artifact(self, entry: RegistryEntry, name: str, artifact: Any) -> None:
+        """
+        Attach an index built from the entry's frame, then evict down to the
+        budget again: indexes count towards it like the frames do.
+        """
+        with self._lock:
+            entry.artifacts[name] = artifact
+            entry.nbytes += artifact_nbytes(artifact, entry.df)
+            if self._entries.get(entry.dataset_id) is entry:
+                self._evict(keep=entry.dataset_id)
+
+    def _evict(self, keep: str) -> None:
+        if self.budget_bytes is None:
+            return
+
+        for entry in list(self._entries.values()):
+            entry.measure()
+
+        candidates = sorted(
+            (entry for entry in self._entries.values() if entry.dataset_id != keep and not entry.pinned),
+            key=lambda entry: entry.last_used,
+        )
+        for entry in candidates:
+            if self.resident_bytes() <= self.budget_bytes:
+                break
+            del self._entries[entry.dataset_id]
+            self._evicted.add(entry.dataset_id)
+            self.stats.evictions += 1
+            self.stats.evicted_bytes += entry.nbytes
+
+    def peek(self, dataset_id: str) -> Optional[RegistryEntry]:
+        """
+        The resident entry, without loading or counting a hit.
+        """
+        return self._entries.get(dataset_id)
+
+    def drop(self, dataset_id: Optional[str] = None) -> None:
+        """
+        Forget one dataset, or all of them (not counted as evictions).
+        """
+        with self._lock:
+            if dataset_id is None:
+                self._entries.clear()
+                self._evicted.clear()
+            else:
+                self._entries.pop(dataset_id, None)
+                self._evicted.discard(dataset_id)
+
+    def set_budget(self, budget_bytes: Optional[int]) -> None:
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            # No dataset is in use here: the most recent one is kept
+            if self._entries:
+                self._evict(keep=max(self._entries.values(), key=lambda entry: entry.last_used).dataset_id)
+
+    def resident_bytes(self) -> int:
+        return sum(entry.nbytes for entry in list(self._entries.values()))
+
+    def report(self) -> Dict[str, Any]:
+        entries = sorted(self._entries.values(), key=lambda entry: entry.last_used, reverse=True)
+        stats = self.stats
+        lookups = stats.hits + stats.misses
+        return {
+            "budget_mb": None if self.budget_bytes is None else round(self.budget_bytes / 2**20, 1),
+            "resident_mb": round(self.resident_bytes() / 2**20, 2),
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "hit_rate": round(stats.hits / lookups, 4) if lookups else 0.0,
+            "reloads": stats.reloads,
+            "evictions": stats.evictions,
+            "evicted_mb": round(stats.evicted_bytes / 2**20, 2),
+            "loads_by_source": dict(stats.loads_by_source),
+            "datasets": [
+                {
+                    "dataset_id": entry.dataset_id,
+                    "n_rows": int(len(entry.df)),
+                    "mb": round(entry.nbytes / 2**20, 2),
+                    "loaded_from": entry.loaded_from,
+                    "load_s": round(entry.load_s, 4),
+                    "pinned": entry.pinned,
+                }
+                for entry in entries
+            ],
+        }
+
+    def metric_lines(self) -> List[str]:
+        """
+        Prometheus text lines for the registry.
+        """
+        stats = self.stats
+        lines = [
+            "# HELP agno_dataset_registry_lookups_total Dataset lookups, by result.",
+            "# TYPE agno_dataset_registry_lookups_total counter",
+            f'agno_dataset_registry_lookups_total{{result="hit"}} {stats.hits}',
+            f'agno_dataset_registry_lookups_total{{result="miss"}} {stats.misses}',
+            "# HELP agno_dataset_registry_reloads_total Loads of a previously evicted dataset.",
+            "# TYPE agno_dataset_registry_reloads_total counter",
+            f"agno_dataset_registry_reloads_total {stats.reloads}",
+            "# HELP agno_dataset_registry_evictions_total Datasets evicted to stay within the memory budget.",
+            "# TYPE agno_dataset_registry_evictions_total counter",
+            f"agno_dataset_registry_evictions_total {stats.evictions}",
+            "# HELP agno_dataset_registry_load_seconds Time spent loading datasets, by source.",
+            "# TYPE agno_dataset_registry_load_seconds summary",
+        ]
+        for source in sorted(stats.loads_by_source):
+            lines.append(f'agno_dataset_registry_load_seconds_count{{source="{source}"}} {stats.loads_by_source[source]}')
+            lines.append(f'agno_dataset_registry_load_seconds_sum{{source="{source}"}} {stats.load_s_by_source[source]:.6f}')
+        lines += [
+            "# HELP agno_dataset_registry_resident_bytes Bytes held by the resident frames and their indexes.",
+            "# TYPE agno_dataset_registry_resident_bytes gauge",
+            f"agno_dataset_registry_resident_bytes {self.resident_bytes()}",
+            "# HELP agno_dataset_registry_datasets Resident datasets.",
+            "# TYPE agno_dataset_registry_datasets gauge",
+            f"agno_dataset_registry_datasets {len(self._entries)}",
+        ]
+        if self.budget_bytes is not None:
+            lines += [
+                "# HELP agno_dataset_registry_budget_bytes Memory budget of the registry.",
+                "# TYPE agno_dataset_registry_budget_bytes gauge",
+                f"agno_dataset_registry_budget_bytes {self.budget_bytes}",
+            ]
+        return lines
+
+
+if __name__ == "__main__":
+
+    # LRU order, the budget, pinning and counters with small synthetic frames
+    import numpy as np
+
+    def loader(n_rows: int) -> Callable[[], Tuple[pd.DataFrame, str]]:
+        return lambda: (pd.DataFrame({"x": np.zeros(n_rows)}), "csv")
+
+    one_mb = 2**20 // 8                          # float64 rows in 1 MB
+    registry = DatasetRegistry(budget_bytes=int(2.5 * 2**20))
+
+    registry.get("a", ("a", 1), loader(one_mb))
+    registry.get("b", ("b", 1), loader(one_mb))
+    registry.get("a", ("a", 1), loader(one_mb))   # hit: "b" becomes the least recently used
+    registry.get("c", ("c", 1), loader(one_mb))   # over budget: "b" goes
+    assert registry.peek("b") is None and registry.peek("a") is not None
+    assert registry.stats.evictions == 1 and registry.stats.hits == 1
+
+    registry.get("b", ("b", 1), loader(one_mb))   # reload; "a" is now the oldest
+    assert registry.stats.reloads == 1 and registry.peek("a") is None
+
+    # A pinned entry survives, and a changed source key reloads in place
+    registry.peek("c").revision = 1
+    registry.get("d", ("d", 1), loader(one_mb))
+    registry.get("e", ("e", 1), loader(one_mb))
+    assert registry.peek("c") is not None
+    registry.get("e", ("e", 2), loader(one_mb))
+    assert registry.stats.misses == 7
+
+    # A single frame larger than the budget is still returned
+    assert len(registry.get("big", ("big", 1), loader(4 * one_mb)).df) == 4 * one_mb
+
+    # Indexes count towards the budget: a 1 MB one pushes out the other datasets
+    small = DatasetRegistry(budget_bytes=int(2.5 * 2**20))
+    first = small.get("a", ("a", 1), loader(one_mb))
+    small.get("b", ("b", 1), loader(one_mb))
+    small.add_artifact(first, "index", {"order": np.arange(one_mb), "frame": first.df})
+    assert first.nbytes >= 2 * 2**20 and small.peek("b") is None
+
+    print(registry.report())
+    print("\n".join(registry.metric_lines()))
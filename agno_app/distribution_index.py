@@ -0,0 +1,170 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from agno_app.sketches import linear_quantile
+from agno_app.topn import resolve_metric
+
+'''
+Distribution index: sorted values and fixed-bin histograms per column.
+
+Built once per dataset version (a dataset artifact) for the rankable
+metrics: Income, TotalSpend, Recency, CustomerTenureDays, Total_Purchases,
+the Mnt* spend columns and the Num*Purchases columns. Each column is
+sorted on its first use (like the top-N orders) and missing values are
+left out. Then:
+
+- value at a percentile: O(1), interpolated like Series.quantile()
+- percentile / rank of a value: O(log n), two binary searches
+- histogram: the precomputed HISTOGRAM_BINS equal-width bins, or another
+  bin count / range with one binary search per bin edge
+- top or bottom share of customers (e.g. the top 5% by Income): a slice
+  of the sorted values
+
+so none of them scans or sorts the frame.
+'''
+
+HISTOGRAM_BINS = 20
+MAX_HISTOGRAM_BINS = 100
+
+
+class ColumnDistribution:
+    """
+    Sorted values of one column, with its default histogram.
+    """
+
+    def __init__(self, values: np.ndarray, n_missing: int):
+        self.values = values                    # sorted, missing values removed
+        self.n = len(values)
+        self.n_missing = n_missing
+        self.total = float(values.sum(dtype=np.float64))
+        # Integer columns interpolate in int64, like Series.quantile() does
+        self._scalar = np.int64 if values.dtype.kind in "iu" else np.float64
+        self.edges, self.counts = self._equal_width(HISTOGRAM_BINS)
+
+    @classmethod
+    def build(cls, column: pd.Series) -> "ColumnDistribution":
+        values = column.to_numpy()
+        if values.dtype.kind == "f":
+            missing = np.isnan(values)
+            return cls(np.sort(values[~missing]), int(missing.sum()))
+        return cls(np.sort(values), 0)
+
+    def quantile(self, q: float) -> float:
+        return linear_quantile(self.n, q, lambda i: self._scalar(self.values[i]))
+
+    def rank(self, value: float) -> Tuple[int, int, int]:
+        """
+        Number of values below, equal to and above `value`.
+        """
+        below = int(np.searchsorted(self.values, value, side="left"))
+        at_or_below = int(np.searchsorted(self.values, value, side="right"))
+        return below, at_or_below - below, self.n - at_or_below
+
+    def histogram(
+        self,
+        bins: Optional[int] = None,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bin edges and counts; without arguments, the precomputed histogram.
+        """
+        if bins is None and low is None and high is None:
+            return self.edges, self.counts
+        return self._equal_width(bins or HISTOGRAM_BINS, low, high)
+
+    def _equal_width(self, bins: int, low: Optional[float] = None, high: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if self.n == 0:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+
+        low = float(self.values[0]) if low is None else float(low)
+        high = float(self.values[-1]) if high is None else float(high)
+        if high < low:
+            raise ValueError(f"Histogram range is inverted: {low} > {high}")
+        if high == low:
+            # A single value: one unit-wide bin around it, as np.histogram does
+            low, high = low - 0.5, high + 0.5
+
+        # Bins are [left, right), the last one closed: the same counts as np.histogram
+        edges = np.linspace(low, high, bins + 1)
+        positions = np.searchsorted(self.values, edges, side="left")
+        positions[-1] = np.searchsorted(self.values, edges[-1], side="right")
+        return edges, np.diff(positions)
+
+    def tail(self, share: float, top: bool = True) -> np.ndarray:
+        """
+        Sorted values of the top (or bottom) `share` of the rows, at least one.
+        """
+        k = min(self.n, max(1, int(round(self.n * share))))
+        return self.values[self.n - k:] if top else self.values[:k]
+
+
+class DistributionIndex:
+    """
+    Column distributions of one dataset version, built on first use.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._columns: Dict[str, ColumnDistribution] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "DistributionIndex":
+        return cls(df)
+
+    def column(self, metric: str) -> ColumnDistribution:
+        column = resolve_metric(metric)
+        distribution = self._columns.get(column)
+        if distribution is None:
+            with self._lock:
+                distribution = self._columns.get(column)
+                if distribution is None:
+                    distribution = ColumnDistribution.build(self.df[column])
+                    self._columns[column] = distribution
+        return distribution
+
+
+if __name__ == "__main__":
+
+    # Index answers vs pandas / numpy on a synthetic frame with ties and missing values
+    rng = np.random.default_rng(0)
+    n = 100_000
+    income = rng.gamma(4.0, 13_000.0, n).round()
+    income[rng.random(n) < 0.01] = np.nan
+    frame = pd.DataFrame({"Income": income, "TotalSpend": rng.integers(0, 2_500, n)})
+    index = DistributionIndex.build(frame)
+
+    for column in frame.columns:
+        distribution = index.column(column)
+        series = frame[column]
+        for q in (0.0, 0.05, 0.5, 0.8, 0.95, 0.999, 1.0):
+            assert distribution.quantile(q) == series.quantile(q), (column, q)
+
+        value = float(series.median())
+        below, equal, above = distribution.rank(value)
+        assert below == (series < value).sum() and equal == (series == value).sum() and above == (series > value).sum()
+
+        edges, counts = distribution.histogram()
+        expected_counts, expected_edges = np.histogram(series.dropna(), bins=HISTOGRAM_BINS)
+        assert np.array_equal(counts, expected_counts) and np.allclose(edges, expected_edges)
+
+        edges, counts = distribution.histogram(bins=7, low=1_000, high=2_000)
+        expected_counts, _ = np.histogram(series.dropna(), bins=7, range=(1_000, 2_000))
+        assert np.array_equal(counts, expected_counts)
+
+    # An inverted range is rejected instead of giving negative counts
+    try:
+        index.column("TotalSpend").histogram(bins=4, low=2_000, high=1_000)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("inverted histogram range accepted")
+
+    income = index.column("income")
+    top = income.tail(0.05)
+    assert len(top) == round(0.05 * income.n) and top[0] >= frame["Income"].quantile(0.949)
+    print("Distribution index matches pandas / numpy:", {col: index.column(col).n for col in frame.columns})
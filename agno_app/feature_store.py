@@ -0,0 +1,250 @@
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from agno_app.config import settings
+
+'''
+On-disk store for the cleaned + engineered dataset.
+
+Each artifact lives in its own folder named after the source file hash and
+the pipeline parameters it was built with:
+
+    <feature_store_dir>/<source_sha256[:16]>-<params_sha256[:8]>/
+        features.arrow   # Arrow IPC file (uncompressed, so it can be memory-mapped)
+        manifest.json    # source hash, size and mtime, pipeline parameters and schema
+
+An artifact is only reused when both the source hash and the pipeline
+parameters recorded in its manifest match the current ones.
+'''
+
+FEATURES_FILE = "features.arrow"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Return the SHA-256 of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    # JSON round-trip so that tuples / numpy scalars compare equal to the manifest
+    return json.loads(json.dumps(params, sort_keys=True, default=str))
+
+
+def artifact_dir(source_hash: str, params: Dict[str, Any], store_dir: Optional[str] = None) -> str:
+    params_hash = hashlib.sha256(
+        json.dumps(_normalize_params(params), sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return os.path.join(store_dir or settings.feature_store_dir, f"{source_hash[:16]}-{params_hash[:8]}")
+
+
+def read_manifest(
+    source_hash: str,
+    params: Dict[str, Any],
+    store_dir: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    path = os.path.join(artifact_dir(source_hash, params, store_dir), MANIFEST_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_features(
+    source_hash: str,
+    params: Dict[str, Any],
+    store_dir: Optional[str] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Memory-map a stored artifact and return it as a DataFrame.
+
+    Returns None when there is no artifact for this source, or when it was
+    built with different pipeline parameters.
+    """
+    manifest = read_manifest(source_hash, params, store_dir)
+    if manifest is None:
+        return None
+
+    if (
+        manifest.get("manifest_version") != MANIFEST_VERSION
+        or manifest.get("source", {}).get("sha256") != source_hash
+        or manifest.get("params") != _normalize_params(params)
+    ):
+        return None
+
+    return _map_features(os.path.join(artifact_dir(source_hash, params, store_dir), FEATURES_FILE))
+
+
+def _map_features(path: str) -> Optional[pd.DataFrame]:
+    try:
+        # Numeric columns without nulls are zero-copy views on the mapped file
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    return table.to_pandas(split_blocks=True)
+
+
+def attach_features(folder: str, source_path: str, params: Dict[str, Any]) -> Optional[pd.DataFrame]:
+    """
+    Memory-map the artifact in `folder`, built by another process.
+
+    Unlike load_features() the source file is not hashed: the artifact is
+    accepted when its manifest names the same file with the same size and
+    modification time (taken when the artifact was built, so a file rewritten
+    in place since then is rejected) and the same pipeline parameters. Every
+    process attaching the same folder shares the mapped pages through the OS
+    page cache.
+    """
+    try:
+        with open(os.path.join(folder, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    source = manifest.get("source", {})
+    st = os.stat(source_path)
+    if (
+        manifest.get("manifest_version") != MANIFEST_VERSION
+        or source.get("path") != os.path.abspath(source_path)
+        or source.get("size") != st.st_size
+        or source.get("mtime_ns") != st.st_mtime_ns
+        or manifest.get("params") != _normalize_params(params)
+    ):
+        return None
+
+    return _map_features(os.path.join(folder, FEATURES_FILE))
+
+
+class FeatureWriter:
+    """
+    Write an artifact incrementally, one DataFrame chunk at a time.
+
+    Chunks are appended as record batches to a temporary Arrow file; close()
+    renames it into place and writes the manifest, so readers never see a
+    partial artifact. All chunks are cast to the schema of the first one
+    unless an explicit `schema` is given.
+    """
+
+    def __init__(
+        self,
+        source_path: str,
+        source_hash: str,
+        params: Dict[str, Any],
+        store_dir: Optional[str] = None,
+        schema: Optional[pa.Schema] = None,
+    ):
+        self.source_path = source_path
+        self.source_hash = source_hash
+        self.params = params
+        self.folder = artifact_dir(source_hash, params, store_dir)
+        self.schema = schema
+        self.n_rows = 0
+        # Taken up front, close to when the source was read: a file rewritten
+        # while the artifact is being written no longer matches its manifest
+        self._source_stat = os.stat(source_path)
+
+        self._features_path = os.path.join(self.folder, FEATURES_FILE)
+        self._tmp_path = f"{self._features_path}.{os.getpid()}.tmp"
+        self._sink: Optional[pa.OSFile] = None
+        self._writer: Optional[pa.ipc.RecordBatchFileWriter] = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+
+        if self._writer is None:
+            self.schema = table.schema
+            os.makedirs(self.folder, exist_ok=True)
+            self._sink = pa.OSFile(self._tmp_path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+        self._writer.write_table(table)
+        self.n_rows += table.num_rows
+
+    def close(self) -> str:
+        """
+        Publish the artifact and return its folder.
+        """
+        if self._writer is None:
+            raise ValueError("No data was written")
+
+        self._writer.close()
+        self._sink.close()
+        self._writer = None
+        os.replace(self._tmp_path, self._features_path)
+
+        # Dtypes as load_features() will return them
+        dtypes = self.schema.empty_table().to_pandas(split_blocks=True).dtypes
+        manifest = {
+            "manifest_version": MANIFEST_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "source": {
+                "path": os.path.abspath(self.source_path),
+                "sha256": self.source_hash,
+                "size": self._source_stat.st_size,
+                "mtime_ns": self._source_stat.st_mtime_ns,
+            },
+            "params": _normalize_params(self.params),
+            "n_rows": int(self.n_rows),
+            "schema": [
+                {"name": field.name, "arrow_type": str(field.type), "pandas_dtype": str(dtypes[field.name])}
+                for field in self.schema
+            ],
+        }
+
+        # The manifest goes last: its presence marks the artifact as complete
+        manifest_path = os.path.join(self.folder, MANIFEST_FILE)
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+        return self.folder
+
+    def abort(self) -> None:
+        """
+        Drop a partially written artifact.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            self._writer = None
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def save_features(
+    df: pd.DataFrame,
+    source_path: str,
+    source_hash: str,
+    params: Dict[str, Any],
+    store_dir: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Persist the engineered frame and its manifest.
+
+    Files are written to temporary names and renamed, so concurrent readers
+    never see a half-written artifact. Returns the artifact folder, or None if
+    the store is not writable (the store is only an optimisation).
+    """
+    writer = FeatureWriter(source_path, source_hash, params, store_dir)
+    try:
+        writer.write(df)
+        return writer.close()
+    except OSError:
+        writer.abort()
+        return None
@@ -0,0 +1,449 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from agno_app.config import settings
+
+'''
+Timed spans around the hot paths of an agent run.
+
+    dataset  -> building / loading the engineered dataset (and its steps)
+    tool     -> every tool invocation (tools/data_tools.py wrappers)
+    model    -> every model call of a run (from agno's per-message metrics)
+    run      -> one agent.run / agent.arun
+
+Spans opened while a run is active are attached to it (a context variable,
+so concurrent runs and async tool calls stay separate), and the run gets a
+latency breakdown when it ends. Every span also feeds process-wide
+aggregates exported in the Prometheus text format, to a file and/or a small
+HTTP endpoint, and finished runs are appended to a JSONL trace file.
+
+Everything is off unless INSTRUMENTATION is set (or enable() is called); a
+disabled span costs one flag check.
+'''
+
+_ENABLED = settings.instrumentation
+
+
+def enable(flag: bool = True) -> None:
+    global _ENABLED
+    _ENABLED = flag
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    start: float                      # epoch seconds
+    duration_ms: float = 0.0
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    parent_id: Optional[str] = None
+    error: Optional[str] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RunTrace:
+    """
+    All spans of one agent run.
+    """
+
+    agent: str
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    start: float = field(default_factory=time.time)
+    duration_ms: float = 0.0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    spans: List[Span] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Latency breakdown of the run (milliseconds) and token counts.
+
+        Tool spans of one model turn may overlap (async tools), so
+        "other_ms" (framework overhead, prompt building, JSON handling) is
+        clamped at zero.
+        """
+        by_id = {span.id: span for span in self.spans}
+
+        def top_level(span: Span) -> bool:
+            # Only count a span if no ancestor has the same kind (no double counting)
+            parent = by_id.get(span.parent_id)
+            while parent is not None:
+                if parent.kind == span.kind:
+                    return False
+                parent = by_id.get(parent.parent_id)
+            return True
+
+        totals: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        for span in self.spans:
+            if top_level(span):
+                totals[span.kind] = totals.get(span.kind, 0.0) + span.duration_ms
+                counts[span.kind] = counts.get(span.kind, 0) + 1
+
+        model = [span for span in self.spans if span.kind == "model"]
+        model_ms, tool_ms = totals.get("model", 0.0), totals.get("tool", 0.0)
+
+        return {
+            "total_ms": round(self.duration_ms, 3),
+            "model_ms": round(model_ms, 3),
+            "tool_ms": round(tool_ms, 3),
+            "dataset_ms": round(totals.get("dataset", 0.0), 3),
+            "other_ms": round(max(0.0, self.duration_ms - model_ms - tool_ms), 3),
+            "n_model_calls": counts.get("model", 0),
+            "n_tool_calls": counts.get("tool", 0),
+            "input_tokens": sum(span.attrs.get("input_tokens", 0) for span in model),
+            "output_tokens": sum(span.attrs.get("output_tokens", 0) for span in model),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": "run",
+            "agent": self.agent,
+            "run_id": self.run_id,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "attrs": self.attrs,
+            "summary": self.summary(),
+            "spans": [{**asdict(span), "duration_ms": round(span.duration_ms, 3)} for span in self.spans],
+        }
+
+
+_CURRENT_RUN: contextvars.ContextVar[Optional[RunTrace]] = contextvars.ContextVar("current_run", default=None)
+_CURRENT_SPAN: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_span", default=None)
+
+
+# -------------------------------------------
+# Aggregates and exporters
+# -------------------------------------------
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """
+    Process-wide span and run aggregates, rendered in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: Dict[Tuple[str, str], List[float]] = {}   # (kind, name) -> [count, sum_s, max_s]
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.runs: Dict[str, List[float]] = {}                 # agent -> [count, sum_s]
+        self.tokens: Dict[str, int] = {"input": 0, "output": 0}
+        self.collectors: List[Callable[[], List[str]]] = []   # extra exposition lines, e.g. the dataset registry
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        self.collectors.append(collector)
+
+    def observe_span(self, span: Span) -> None:
+        seconds = span.duration_ms / 1000.0
+        key = (span.kind, span.name)
+        with self._lock:
+            entry = self.spans.setdefault(key, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            if span.error:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            if span.kind == "model":
+                self.tokens["input"] += int(span.attrs.get("input_tokens", 0))
+                self.tokens["output"] += int(span.attrs.get("output_tokens", 0))
+
+    def observe_run(self, trace: RunTrace) -> None:
+        with self._lock:
+            entry = self.runs.setdefault(trace.agent, [0, 0.0])
+            entry[0] += 1
+            entry[1] += trace.duration_ms / 1000.0
+
+    def render(self) -> str:
+        def labels(**values: str) -> str:
+            return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in values.items()) + "}"
+
+        with self._lock:
+            lines = [
+                "# HELP agno_span_duration_seconds Time spent in instrumented spans.",
+                "# TYPE agno_span_duration_seconds summary",
+            ]
+            for (kind, name), (count, total, _) in sorted(self.spans.items()):
+                lines.append(f"agno_span_duration_seconds_count{labels(kind=kind, name=name)} {int(count)}")
+                lines.append(f"agno_span_duration_seconds_sum{labels(kind=kind, name=name)} {total:.6f}")
+
+            lines += ["# HELP agno_span_duration_seconds_max Slowest span so far.",
+                      "# TYPE agno_span_duration_seconds_max gauge"]
+            for (kind, name), (_, _, longest) in sorted(self.spans.items()):
+                lines.append(f"agno_span_duration_seconds_max{labels(kind=kind, name=name)} {longest:.6f}")
+
+            lines += ["# HELP agno_span_errors_total Spans that raised.", "# TYPE agno_span_errors_total counter"]
+            for (kind, name), count in sorted(self.errors.items()):
+                lines.append(f"agno_span_errors_total{labels(kind=kind, name=name)} {count}")
+
+            lines += ["# HELP agno_agent_run_duration_seconds Wall time of agent runs.",
+                      "# TYPE agno_agent_run_duration_seconds summary"]
+            for agent, (count, total) in sorted(self.runs.items()):
+                lines.append(f"agno_agent_run_duration_seconds_count{labels(agent=agent)} {int(count)}")
+                lines.append(f"agno_agent_run_duration_seconds_sum{labels(agent=agent)} {total:.6f}")
+
+            lines += ["# HELP agno_model_tokens_total Tokens reported by the model.",
+                      "# TYPE agno_model_tokens_total counter"]
+            for direction, count in sorted(self.tokens.items()):
+                lines.append(f"agno_model_tokens_total{labels(direction=direction)} {count}")
+
+        for collector in self.collectors:
+            lines += collector()
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+_TRACE_LOCK = threading.Lock()
+
+
+def _append_trace(record: Dict[str, Any]) -> None:
+    path = settings.trace_path
+    if not path:
+        return
+    try:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        line = json.dumps(record, default=str)
+        with _TRACE_LOCK, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError:
+        # Tracing must never break a run
+        pass
+
+
+def write_metrics(path: Optional[str] = None) -> Optional[str]:
+    """
+    Write the Prometheus text exposition to a file (atomically).
+    """
+    path = path or settings.metrics_path
+    if not path:
+        return None
+    try:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(REGISTRY.render())
+        os.replace(tmp_path, path)
+    except OSError:
+        return None
+    return path
+
+
+_SERVER: Optional[Any] = None
+
+
+def start_metrics_server(port: Optional[int] = None, host: str = "127.0.0.1") -> Optional[Any]:
+    """
+    Serve /metrics on a daemon thread (once per process). Port 0 / unset: off.
+    """
+    global _SERVER
+
+    port = settings.metrics_port if port is None else port
+    if not port or _SERVER is not None:
+        return _SERVER
+
+    # Imported here: http.server is only needed when METRICS_PORT is set
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            # Keep the interactive console quiet
+            pass
+
+    _SERVER = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=_SERVER.serve_forever, name="metrics-http", daemon=True).start()
+    return _SERVER
+
+
+# -------------------------------------------
+# Spans
+# -------------------------------------------
+
+def _finish(span: Span) -> None:
+    REGISTRY.observe_span(span)
+    trace = _CURRENT_RUN.get()
+    if trace is not None:
+        trace.spans.append(span)
+    elif span.parent_id is None:
+        # Spans outside any run (e.g. a dataset prewarm) are traced on their own
+        _append_trace({"type": "span", **asdict(span)})
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attrs: Any) -> Iterator[Optional[Span]]:
+    """
+    Time a block. Yields the Span (None when instrumentation is off), so
+    callers can add attributes, e.g. row counts.
+    """
+    if not _ENABLED:
+        yield None
+        return
+
+    current = Span(name=name, kind=kind, start=time.time(), parent_id=_CURRENT_SPAN.get(), attrs=attrs)
+    token = _CURRENT_SPAN.set(current.id)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = type(exc).__name__
+        raise
+    finally:
+        current.duration_ms = (time.perf_counter() - started) * 1000.0
+        _CURRENT_SPAN.reset(token)
+        _finish(current)
+
+
+def traced(name: str, kind: str = "internal") -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorator form of span(); works on plain functions and coroutines and
+    keeps the signature (agno builds tool schemas from it).
+    """
+    def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not _ENABLED:
+                    return await func(*args, **kwargs)
+                with span(name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _ENABLED:
+                return func(*args, **kwargs)
+            with span(name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+# -------------------------------------------
+# Agent runs
+# -------------------------------------------
+
+def _add_model_spans(trace: RunTrace, response: Any) -> None:
+    # agno times every model call itself; each assistant message of the run
+    # carries its duration and token counts
+    for message in getattr(response, "messages", None) or []:
+        metrics = getattr(message, "metrics", None)
+        if getattr(message, "role", None) != "assistant" or getattr(message, "from_history", False) or metrics is None:
+            continue
+        duration_s = float(getattr(metrics, "duration", None) or 0.0)
+        model_span = Span(
+            name=str(getattr(response, "model", None) or "model"),
+            kind="model",
+            start=float(getattr(message, "created_at", None) or trace.start),
+            duration_ms=duration_s * 1000.0,
+            attrs={
+                "input_tokens": int(getattr(metrics, "input_tokens", 0) or 0),
+                "output_tokens": int(getattr(metrics, "output_tokens", 0) or 0),
+                "time_to_first_token_s": getattr(metrics, "time_to_first_token", None),
+                "n_tool_calls": len(getattr(message, "tool_calls", None) or []),
+            },
+        )
+        REGISTRY.observe_span(model_span)
+        trace.spans.append(model_span)
+
+
+@contextmanager
+def run_trace(agent: str, **attrs: Any) -> Iterator[Optional[RunTrace]]:
+    """
+    Collect the spans of one agent run and export the run when it ends.
+    """
+    if not _ENABLED:
+        yield None
+        return
+
+    trace = RunTrace(agent=agent, attrs=attrs)
+    token = _CURRENT_RUN.set(trace)
+    started = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.duration_ms = (time.perf_counter() - started) * 1000.0
+        _CURRENT_RUN.reset(token)
+        REGISTRY.observe_run(trace)
+        _append_trace(trace.to_dict())
+        write_metrics()
+
+
+class InstrumentedAgent:
+    """
+    Wrap an agno Agent so every run/arun is traced.
+
+    Responses are returned unchanged; the trace of the latest run is kept in
+    `last_trace`. Streaming runs are passed through untraced. Other
+    attributes are forwarded to the wrapped agent.
+    """
+
+    def __init__(self, agent: Any):
+        self.agent = agent
+        self.last_trace: Optional[RunTrace] = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.agent, name)
+
+    def run(self, query: str, **kwargs: Any) -> Any:
+        if kwargs.get("stream") or not _ENABLED:
+            return self.agent.run(query, **kwargs)
+
+        with run_trace(str(self.agent.name), query=query) as trace:
+            response = self.agent.run(query, **kwargs)
+            _add_model_spans(trace, response)
+        self.last_trace = trace
+        return response
+
+    async def arun(self, query: str, **kwargs: Any) -> Any:
+        if kwargs.get("stream") or not _ENABLED:
+            return await self.agent.arun(query, **kwargs)
+
+        with run_trace(str(self.agent.name), query=query) as trace:
+            response = await self.agent.arun(query, **kwargs)
+            _add_model_spans(trace, response)
+        self.last_trace = trace
+        return response
+
+
+def format_breakdown(trace: RunTrace) -> str:
+    """
+    One-line latency breakdown for console output.
+    """
+    s = trace.summary()
+    return (
+        f"{s['total_ms'] / 1000:.2f}s total | model {s['model_ms'] / 1000:.2f}s ({s['n_model_calls']} calls, "
+        f"{s['input_tokens']}+{s['output_tokens']} tokens) | tools {s['tool_ms'] / 1000:.2f}s "
+        f"({s['n_tool_calls']} calls, dataset {s['dataset_ms'] / 1000:.2f}s) | other {s['other_ms'] / 1000:.2f}s"
+    )
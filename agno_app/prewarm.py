@@ -0,0 +1,187 @@
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+'''
+Background prewarming for the interactive CLI.
+
+While the user reads the menu and types the first question, the slow
+one-time work runs on daemon threads: importing agno and the data stack,
+creating the model client, and loading (or building) the engineered dataset
+with its indexes. Each task signals readiness through an Event; the first
+query waits only for the tasks it still needs, and every task records when
+it started, how long it took and how long the foreground waited for it.
+
+Waiting on the dataset is implicit: the tools go through
+get_final_dataset() / get_dataset_artifact(), whose locks make a tool call
+block until the prewarm thread has finished the same work, instead of
+doing it twice.
+'''
+
+
+@dataclass
+class PrewarmTask:
+    name: str
+    started: float                              # seconds since the prewarmer was created
+    done: threading.Event = field(default_factory=threading.Event)
+    finished: Optional[float] = None
+    result: Any = None
+    error: Optional[BaseException] = None
+    waited_s: float = 0.0                       # foreground time spent in wait()
+
+    @property
+    def duration_s(self) -> Optional[float]:
+        return None if self.finished is None else self.finished - self.started
+
+    @property
+    def status(self) -> str:
+        if not self.done.is_set():
+            return "running"
+        return "failed" if self.error is not None else "ready"
+
+
+class Prewarmer:
+    """
+    Named background tasks with readiness signalling and timings.
+    """
+
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self._tasks: Dict[str, PrewarmTask] = {}
+        self._lock = threading.Lock()
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def start(self, name: str, func: Callable[[], Any]) -> PrewarmTask:
+        """
+        Run `func` on a daemon thread (once per name).
+        """
+        with self._lock:
+            if name in self._tasks:
+                return self._tasks[name]
+            task = PrewarmTask(name=name, started=self._now())
+            self._tasks[name] = task
+
+        def run() -> None:
+            try:
+                task.result = func()
+            except BaseException as exc:
+                task.error = exc
+            finally:
+                task.finished = self._now()
+                task.done.set()
+
+        threading.Thread(target=run, name=f"prewarm-{name}", daemon=True).start()
+        return task
+
+    def is_ready(self, name: str) -> bool:
+        task = self._tasks.get(name)
+        return task is not None and task.done.is_set() and task.error is None
+
+    def pending(self) -> List[str]:
+        return [name for name, task in self._tasks.items() if not task.done.is_set()]
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> Any:
+        """
+        Block until the task is done and return its result.
+
+        A failed task re-raises its error in the caller, exactly as if the
+        work had been done in the foreground. Raises TimeoutError when the
+        task is still running after `timeout` seconds.
+        """
+        task = self._tasks[name]
+        started = time.perf_counter()
+        finished = task.done.wait(timeout)
+        task.waited_s += time.perf_counter() - started
+
+        if not finished:
+            raise TimeoutError(f"Prewarm task {name!r} still running after {timeout}s")
+        if task.error is not None:
+            raise task.error
+        return task.result
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "status": task.status,
+                "started_s": round(task.started, 3),
+                "duration_s": None if task.duration_s is None else round(task.duration_s, 3),
+                "waited_s": round(task.waited_s, 3),
+                **({"error": f"{type(task.error).__name__}: {task.error}"} if task.error is not None else {}),
+            }
+            for name, task in self._tasks.items()
+        }
+
+    def format_report(self) -> str:
+        """
+        One line per task, for console output.
+        """
+        lines = []
+        for name, entry in self.report().items():
+            took = "still running" if entry["duration_s"] is None else f"{entry['duration_s']:.2f}s"
+            line = f"  {name:<14} {entry['status']:<8} {took:>14}  (foreground waited {entry['waited_s']:.2f}s)"
+            if "error" in entry:
+                line += f"  {entry['error']}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+# -------------------------------------------
+# Prewarm steps
+# -------------------------------------------
+
+def prewarm_dataset(indexes: bool = True) -> Dict[str, Any]:
+    """
+    Load (or build) the engineered dataset and, optionally, the indexes the
+    Data Agent tools use. Returns the dataset version and its row count.
+    """
+    # Imported here: this is the heavy part (pandas, numpy, pyarrow)
+    from agno_app.data_load_and_clean import get_dataset_artifact, get_dataset_version, get_final_dataset
+
+    df = get_final_dataset()
+    if indexes:
+        from agno_app.bitmap_index import BitmapIndex
+        from agno_app.segment_cube import SegmentCube
+        from agno_app.topn import TopNEngine
+
+        get_dataset_artifact("segment_cube", SegmentCube.build)
+        get_dataset_artifact("bitmap_index", BitmapIndex.build)
+        get_dataset_artifact("topn_engine", TopNEngine.build)
+
+    return {"version": get_dataset_version(), "n_rows": int(len(df))}
+
+
+def prewarm_model_client(model: Any, async_client: bool = False) -> Any:
+    """
+    Create the model's HTTP client up front (agno models create it lazily on
+    the first request). Models without a client getter are returned as is.
+    """
+    getter = getattr(model, "get_async_client" if async_client else "get_client", None)
+    if callable(getter):
+        getter()
+    return model
+
+
+if __name__ == "__main__":
+
+    # Readiness and timings with sleeping tasks (no dataset or model needed)
+    prewarmer = Prewarmer()
+    prewarmer.start("slow", lambda: time.sleep(0.3) or "slow done")
+    prewarmer.start("fast", lambda: "fast done")
+    prewarmer.start("broken", lambda: 1 / 0)
+
+    assert prewarmer.wait("fast") == "fast done"
+    assert not prewarmer.is_ready("slow") and "slow" in prewarmer.pending()
+    assert prewarmer.wait("slow") == "slow done" and prewarmer.is_ready("slow")
+    try:
+        prewarmer.wait("broken")
+    except ZeroDivisionError:
+        pass
+    else:
+        raise AssertionError("the task error should be re-raised")
+
+    report = prewarmer.report()
+    assert report["slow"]["waited_s"] > 0.1 and report["broken"]["status"] == "failed"
+    print(prewarmer.format_report())
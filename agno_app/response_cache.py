@@ -0,0 +1,237 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from agno_app.config import settings
+
+'''
+Opt-in on-disk cache of Data Agent answers.
+
+Entries are keyed on the normalized query, the model id, the agent's tool
+names and the version of every registered dataset, so a new model, a new
+tool or a changed source file never serves a stale answer. The cache is a
+small SQLite file with a size bound (least recently used entries are
+evicted first), a TTL, and hit / miss / eviction counters that are
+persisted across runs.
+'''
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    query       TEXT NOT NULL,
+    content     TEXT NOT NULL,
+    tools       TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+COUNTER_NAMES = ("hits", "misses", "expired", "evictions", "stores")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Lower-case, collapse whitespace and drop trailing punctuation.
+    """
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.rstrip(" ?!.")
+
+
+def cache_key(query: str, model_id: str, tool_names: List[str], dataset_version: str) -> str:
+    payload = json.dumps(
+        [normalize_query(query), model_id, sorted(tool_names), dataset_version],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedToolCall:
+    tool_name: str
+
+
+@dataclass
+class CachedRunResponse:
+    """
+    The parts of an agno RunOutput the CLI uses, rebuilt from the cache.
+    """
+
+    content: str
+    tools: List[CachedToolCall] = field(default_factory=list)
+    cached: bool = True
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache with TTL, stored in a SQLite file.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_settings(cls) -> "ResponseCache":
+        return cls(
+            settings.response_cache_path,
+            max_bytes=int(settings.response_cache_max_mb * 1024 * 1024),
+            ttl_seconds=settings.response_cache_ttl_s,
+        )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # sqlite3's own context manager commits (or rolls back) but never closes
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _bump(self, conn: sqlite3.Connection, name: str, by: int = 1) -> None:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, by),
+        )
+
+    def get(self, key: str) -> Optional[CachedRunResponse]:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT content, tools, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and now - row[2] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bump(conn, "expired")
+                row = None
+
+            if row is None:
+                self._bump(conn, "misses")
+                return None
+
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._bump(conn, "hits")
+
+        tools = [CachedToolCall(name) for name in json.loads(row[1])]
+        return CachedRunResponse(content=row[0], tools=tools)
+
+    def put(self, key: str, query: str, content: str, tool_names: List[str]) -> None:
+        now = time.time()
+        tools = json.dumps(tool_names)
+        size = len(content.encode("utf-8")) + len(tools) + len(query)
+
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, query, content, tools, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, query, content, tools, size, now, now),
+            )
+            self._bump(conn, "stores")
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # Drop least recently used entries until the total size fits the budget
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._bump(conn, "evictions", evicted)
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock, self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+        result: Dict[str, Any] = {name: int(counters.get(name, 0)) for name in COUNTER_NAMES}
+        lookups = result["hits"] + result["misses"]
+        result["hit_rate"] = round(result["hits"] / lookups, 4) if lookups else 0.0
+        result["entries"] = int(entries)
+        result["size_bytes"] = int(total)
+        return result
+
+
+class CachedAgent:
+    """
+    Wrap an agno Agent so repeated questions are answered from the cache.
+
+    Only answers that actually used tools are stored, so a hallucinated
+    answer is never replayed.
+    """
+
+    def __init__(self, agent: Any, cache: ResponseCache):
+        self.agent = agent
+        self.cache = cache
+
+    def _key(self, query: str) -> str:
+        # Imported here: the dataset layer pulls in pandas
+        from agno_app.data_interface import list_dataset_ids
+        from agno_app.data_load_and_clean import get_dataset_version
+
+        model_id = str(getattr(self.agent.model, "id", ""))
+        tool_names = [getattr(t, "name", str(t)) for t in (self.agent.tools or [])]
+
+        # Tools take a dataset_id, so a change to any registered dataset
+        # invalidates the answers (the default one alone keeps its old key)
+        versions = [get_dataset_version()]
+        versions += [f"{dataset_id}={get_dataset_version(dataset_id)}" for dataset_id in list_dataset_ids()[1:]]
+        return cache_key(query, model_id, tool_names, ",".join(versions))
+
+    def _store(self, key: str, query: str, response: Any) -> None:
+        if response.tools and response.content is not None:
+            self.cache.put(key, query, str(response.content), [t.tool_name for t in response.tools])
+
+    def run(self, query: str, **kwargs: Any) -> Any:
+        key = self._key(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = self.agent.run(query, **kwargs)
+        self._store(key, query, response)
+        return response
+
+    async def arun(self, query: str, **kwargs: Any) -> Any:
+        key = self._key(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = await self.agent.arun(query, **kwargs)
+        self._store(key, query, response)
+        return response
@@ -0,0 +1,311 @@
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+'''
+Pre-aggregated segment statistics.
+
+segment_stats only filters on three dimensions:
+
+    marital_status   -> any / one of the (few) cleaned statuses
+    has_children     -> any / True / False
+    high_value_only  -> False / True
+
+so instead of masking the whole frame on every call, additive partials
+(row count, per-metric sums and non-null counts, high-value count) are
+computed once per dataset version for every combination, "any" rollups
+included. Answering a segment_stats call is then a dictionary lookup plus
+one division per metric.
+'''
+
+# Output name -> engineered column (averaged with skipna, like Series.mean())
+MEAN_METRICS: Dict[str, str] = {
+    "avg_income": "Income",
+    "avg_total_spend": "TotalSpend",
+    "avg_recency_days": "Recency",
+    "avg_customer_tenure_days": "CustomerTenureDays",
+}
+
+CubeKey = Tuple[Optional[str], Optional[bool], bool]
+
+
+@dataclass
+class SegmentPartials:
+    """
+    Additive aggregates of one segment.
+    """
+
+    n: int = 0
+    n_high_value: int = 0
+    sums: Dict[str, float] = field(default_factory=lambda: {m: 0 for m in MEAN_METRICS})
+    counts: Dict[str, int] = field(default_factory=lambda: {m: 0 for m in MEAN_METRICS})
+
+    @classmethod
+    def from_positions(cls, df: pd.DataFrame, positions: np.ndarray) -> "SegmentPartials":
+        """
+        Partials of an arbitrary row selection, without copying the frame.
+        """
+        partials = cls(n=int(len(positions)))
+        partials.n_high_value = int(df["IsHighValue"].to_numpy()[positions].sum())
+
+        for metric, col in MEAN_METRICS.items():
+            values = df[col].to_numpy()[positions]
+            if values.dtype.kind == "f":
+                # Same masking + pairwise sum as pandas' skipna mean
+                missing = np.isnan(values)
+                partials.sums[metric] = np.where(missing, 0.0, values).sum().item()
+                partials.counts[metric] = int(len(values) - missing.sum())
+            else:
+                partials.sums[metric] = values.sum(dtype=np.int64).item()
+                partials.counts[metric] = int(len(values))
+
+        return partials
+
+    def add(self, other: "SegmentPartials") -> None:
+        self.n += other.n
+        self.n_high_value += other.n_high_value
+        for metric in MEAN_METRICS:
+            self.sums[metric] += other.sums[metric]
+            self.counts[metric] += other.counts[metric]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Unrounded segment statistics, equal to the pandas means of the segment.
+        """
+        result: Dict[str, float] = {"n_customers": self.n}
+
+        for metric in MEAN_METRICS:
+            count = self.counts[metric]
+            # Same float64 division pandas does (sum / non-null count)
+            result[metric] = float(np.float64(self.sums[metric]) / count) if count else float("nan")
+
+        result["pct_high_value_customers"] = (
+            float(np.float64(self.n_high_value) / self.n * 100.0) if self.n else float("nan")
+        )
+        return result
+
+
+class SegmentCube:
+    """
+    Segment partials for every (marital_status, has_children, high_value_only)
+    combination, with None meaning "any" for the first two dimensions.
+    """
+
+    def __init__(self, cells: Dict[CubeKey, SegmentPartials]):
+        self.cells = cells
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "SegmentCube":
+        has_children = (df["Total_Children"] > 0).rename("has_children")
+        is_high_value = df["IsHighValue"].astype(bool).rename("is_high_value")
+
+        # 1. Base cells: one per observed (status, has_children, high value) triple
+        grouped = df.groupby(
+            [df["Marital_Status"], has_children, is_high_value],
+            dropna=False,
+            observed=True,
+            sort=False,
+        )
+        columns = list(MEAN_METRICS.values())
+        sizes = grouped.size()
+        # All three share the group order, so rows line up positionally
+        sums = grouped[columns].sum()
+        counts = grouped[columns].count()
+
+        base: List[Tuple[Optional[str], bool, bool, SegmentPartials]] = []
+        for i, ((status, kids, high_value), n) in enumerate(sizes.items()):
+            partials = SegmentPartials(n=int(n), n_high_value=int(n) if high_value else 0)
+            for metric, col in MEAN_METRICS.items():
+                partials.sums[metric] = sums[col].iat[i].item()
+                partials.counts[metric] = int(counts[col].iat[i])
+            # Missing statuses only ever show up in the "any" rollups
+            base.append((None if pd.isna(status) else str(status), bool(kids), bool(high_value), partials))
+
+        # 2. Rollups, including "any" on marital_status and has_children
+        statuses = sorted({status for status, _, _, _ in base if status is not None})
+        cells: Dict[CubeKey, SegmentPartials] = {}
+
+        for status, kids, high_value_only in product([None] + statuses, [None, True, False], [False, True]):
+            partials = SegmentPartials()
+            for b_status, b_kids, b_high_value, b_partials in base:
+                if status is not None and b_status != status:
+                    continue
+                if kids is not None and b_kids != kids:
+                    continue
+                if high_value_only and not b_high_value:
+                    continue
+                partials.add(b_partials)
+            cells[(status, kids, high_value_only)] = partials
+
+        return cls(cells)
+
+    def lookup(
+        self,
+        marital_status: Optional[str] = None,
+        has_children: Optional[bool] = None,
+        high_value_only: bool = False,
+    ) -> SegmentPartials:
+        """
+        Partials of a segment; unknown statuses give an empty segment.
+        """
+        if marital_status:
+            marital_status = marital_status.strip().lower()
+        else:
+            marital_status = None
+
+        key = (marital_status, None if has_children is None else bool(has_children), bool(high_value_only))
+        return self.cells.get(key, SegmentPartials())
+
+
+# -------------------------------------------
+# Group-by over arbitrary dimensions
+# -------------------------------------------
+
+# Dimensions accepted by group_partials()
+GROUP_DIMENSIONS = ("marital_status", "education", "has_children", "high_value")
+
+
+def dimension_codes(df: pd.DataFrame, dimension: str) -> Tuple[np.ndarray, List]:
+    """
+    Non-negative group codes of every row for one dimension, and their labels.
+    """
+    if dimension in ("marital_status", "education"):
+        column = "Marital_Status" if dimension == "marital_status" else "Education"
+        codes, uniques = pd.factorize(df[column], use_na_sentinel=True)
+        # Shift so that missing values get their own group (code 0)
+        return codes + 1, [None] + [str(value) for value in uniques]
+    if dimension == "has_children":
+        return (df["Total_Children"].to_numpy() > 0).astype(np.int64), [False, True]
+    if dimension == "high_value":
+        return df["IsHighValue"].to_numpy().astype(np.int64), [False, True]
+    raise ValueError(f"Unknown group_by dimension '{dimension}'. Choose from: {', '.join(GROUP_DIMENSIONS)}")
+
+
+def group_partials(
+    df: pd.DataFrame,
+    dimensions: List[str],
+    positions: Optional[np.ndarray] = None,
+    codes_for: Optional[Callable[[str], Tuple[np.ndarray, List]]] = None,
+) -> List[Tuple[Tuple, SegmentPartials]]:
+    """
+    Partials for every observed combination of `dimensions`, in one pass.
+
+    Rows are mapped to a single mixed-radix group code and every aggregate is
+    a np.bincount over it, so the number of groups does not add extra scans.
+    `positions` restricts the pass to a row selection, and `codes_for` can
+    supply cached dimension codes (see BitmapIndex.group_codes).
+    """
+    codes_for = codes_for or (lambda dimension: dimension_codes(df, dimension))
+
+    codes = np.zeros(len(df), dtype=np.int64)
+    all_labels = []
+    for dimension in dimensions:
+        dim_codes, labels = codes_for(dimension)
+        codes = codes * len(labels) + dim_codes
+        all_labels.append(labels)
+
+    if positions is not None:
+        codes = codes[positions]
+
+    n_groups = int(np.prod([len(labels) for labels in all_labels])) if all_labels else 1
+    sizes = np.bincount(codes, minlength=n_groups)
+
+    high_value = df["IsHighValue"].to_numpy().astype(np.float64)
+    if positions is not None:
+        high_value = high_value[positions]
+    n_high_value = np.bincount(codes, weights=high_value, minlength=n_groups)
+
+    sums, counts = {}, {}
+    for metric, col in MEAN_METRICS.items():
+        values = df[col].to_numpy().astype(np.float64)
+        if positions is not None:
+            values = values[positions]
+        present = ~np.isnan(values)
+        sums[metric] = np.bincount(codes, weights=np.where(present, values, 0.0), minlength=n_groups)
+        counts[metric] = np.bincount(codes, weights=present, minlength=n_groups)
+
+    results = []
+    for code in np.flatnonzero(sizes):
+        # Decode the mixed-radix group code back into one label per dimension
+        key, rest = [], int(code)
+        for labels in reversed(all_labels):
+            rest, digit = divmod(rest, len(labels))
+            key.append(labels[digit])
+
+        partials = SegmentPartials(n=int(sizes[code]), n_high_value=int(n_high_value[code]))
+        for metric in MEAN_METRICS:
+            partials.sums[metric] = float(sums[metric][code])
+            partials.counts[metric] = int(counts[metric][code])
+        results.append((tuple(reversed(key)), partials))
+
+    return results
+
+
+def scan_segment_stats(
+    df: pd.DataFrame,
+    marital_status: Optional[str] = None,
+    has_children: Optional[bool] = None,
+    high_value_only: bool = False,
+) -> Dict[str, float]:
+    """
+    Reference implementation: filter the frame and compute the means directly.
+    """
+    seg_df = df
+
+    if marital_status:
+        seg_df = seg_df[seg_df["Marital_Status"] == marital_status.strip().lower()]
+
+    if has_children is not None:
+        if has_children:
+            seg_df = seg_df[seg_df["Total_Children"] > 0]
+        else:
+            seg_df = seg_df[seg_df["Total_Children"] == 0]
+
+    if high_value_only:
+        seg_df = seg_df[seg_df["IsHighValue"]]
+
+    result: Dict[str, float] = {"n_customers": int(len(seg_df))}
+    for metric, col in MEAN_METRICS.items():
+        result[metric] = float(seg_df[col].mean(skipna=True))
+    result["pct_high_value_customers"] = float(seg_df["IsHighValue"].mean() * 100.0)
+    return result
+
+
+def verify_cube(df: pd.DataFrame, cube: Optional[SegmentCube] = None) -> List[str]:
+    """
+    Compare every cube cell with the pandas reference; returns the mismatches.
+
+    Values are compared as the tools report them (rounded to 2 decimals):
+    integer-valued columns give bit-identical means, while non-integral float
+    sums may differ from pandas' pairwise summation in the last ulp.
+    """
+    cube = cube or SegmentCube.build(df)
+    statuses = sorted(df["Marital_Status"].dropna().unique().tolist()) + ["unknown"]
+    mismatches = []
+
+    for status, kids, high_value_only in product([None] + statuses, [None, True, False], [False, True]):
+        expected = scan_segment_stats(df, status, kids, high_value_only)
+        actual = cube.lookup(status, kids, high_value_only).stats()
+        for name, value in expected.items():
+            value, other = round(value, 2), round(actual[name], 2)
+            same = (np.isnan(value) and np.isnan(other)) if isinstance(value, float) else False
+            if not same and value != other:
+                mismatches.append(f"{(status, kids, high_value_only)} {name}: {other!r} != {value!r}")
+
+    return mismatches
+
+
+if __name__ == "__main__":
+
+    from agno_app.data_load_and_clean import get_final_dataset
+
+    df = get_final_dataset()
+    mismatches = verify_cube(df)
+
+    if mismatches:
+        print("\n".join(mismatches))
+        raise SystemExit(1)
+    print("Segment cube matches pandas for every combination.")
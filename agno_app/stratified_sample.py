@@ -0,0 +1,217 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from agno_app.bitmap_index import INDEXED_COLUMNS, BitmapIndex
+from agno_app.segment_cube import MEAN_METRICS, dimension_codes
+
+'''
+Stratified samples for approximate segment statistics.
+
+Strata are Marital_Status x has children x high value, the dimensions the
+segment cube is built on. Every stratum gets rows in proportion to its size
+but at least `min_stratum_rows` (or all of its rows), so small segments are
+still represented. The sample is built once per dataset version (it is a
+dataset artifact) with a fixed seed, so repeated answers are stable.
+
+A segment is estimated from the sample rows matching its filter (evaluated
+on a bitmap index of the sample itself), each weighted by N_h / n_h:
+
+    count   N^  = sum_h N_h / n_h * (matching rows in h)
+    mean    R^  = sum_h N_h / n_h * sum(y over matching rows in h) / N^
+
+with variances from the usual stratified formula (finite population
+correction included; the ratio by linearization), and normal 95% intervals.
+Fully sampled strata contribute no variance, so a segment living entirely
+in small strata comes out exact.
+'''
+
+DEFAULT_SAMPLE_ROWS = 20_000
+MIN_STRATUM_ROWS = 200
+Z_95 = 1.959963984540054
+# Below this many matching sample rows the normal interval is not trusted
+MIN_DOMAIN_ROWS = 30
+
+# Columns kept in the sample: the metrics and everything a segment filter can use
+SAMPLE_COLUMNS = list(dict.fromkeys(list(MEAN_METRICS.values()) + INDEXED_COLUMNS))
+
+
+@dataclass
+class Estimate:
+    value: float
+    se: float
+
+    def interval(self, z: float = Z_95) -> Tuple[float, float]:
+        return self.value - z * self.se, self.value + z * self.se
+
+    def rel_error(self, z: float = Z_95) -> float:
+        """
+        Interval half-width relative to the estimate.
+        """
+        if self.se == 0:
+            return 0.0
+        if not self.value or math.isnan(self.value):
+            return math.inf
+        return z * self.se / abs(self.value)
+
+
+def _stratum_variance(strata: np.ndarray, z: np.ndarray, n_h: np.ndarray) -> np.ndarray:
+    # Sample variance (ddof=1) of z within each stratum, 0 for single-row strata
+    sums = np.bincount(strata, weights=z, minlength=len(n_h))
+    sums_sq = np.bincount(strata, weights=z * z, minlength=len(n_h))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (sums_sq - sums * sums / n_h) / (n_h - 1)
+    return np.where(n_h > 1, np.maximum(variance, 0.0), 0.0)
+
+
+class StratifiedSample:
+    """
+    A fixed stratified sample of one dataset version, with its estimators.
+    """
+
+    def __init__(self, sample: pd.DataFrame, strata: np.ndarray, population: np.ndarray, sizes: np.ndarray):
+        self.df = sample
+        self.strata = strata                    # stratum of every sample row
+        self.population = population            # N_h
+        self.sizes = sizes                      # n_h
+        self.n_population = int(population.sum())
+        self.index = BitmapIndex(sample)
+
+        # Per-row weight and per-stratum variance factor N_h^2 (1 - f_h) / n_h
+        self.weights = (population / sizes)[strata]
+        self._variance_factor = population.astype(float) ** 2 * (1.0 - sizes / population) / sizes
+
+        # Every stratum fully sampled: the "estimates" are the exact values
+        self.complete = bool((sizes == population).all())
+
+        # Exact scan cost on the full dataset, learned from timed exact answers
+        self.exact_ms_per_row: Optional[float] = None
+
+    @classmethod
+    def build(
+        cls,
+        df: pd.DataFrame,
+        sample_rows: int = DEFAULT_SAMPLE_ROWS,
+        min_stratum_rows: int = MIN_STRATUM_ROWS,
+        seed: int = 0,
+    ) -> "StratifiedSample":
+        status, _ = dimension_codes(df, "marital_status")
+        kids, _ = dimension_codes(df, "has_children")
+        high_value, _ = dimension_codes(df, "high_value")
+        _, row_strata, population = np.unique(status * 4 + kids * 2 + high_value, return_inverse=True, return_counts=True)
+
+        # Proportional allocation with a floor per stratum, never more than the stratum
+        target = min(sample_rows, len(df))
+        sizes = np.round(target * population / max(len(df), 1)).astype(np.int64)
+        sizes = np.minimum(np.maximum(sizes, np.minimum(min_stratum_rows, population)), population)
+
+        rng = np.random.default_rng(seed)
+        order = np.argsort(row_strata, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(population)])
+        positions = np.sort(np.concatenate([
+            rng.choice(order[bounds[h]:bounds[h + 1]], size=sizes[h], replace=False)
+            for h in range(len(population))
+        ]))
+
+        columns = [col for col in SAMPLE_COLUMNS if col in df.columns]
+        sample = df[columns].iloc[positions].reset_index(drop=True)
+        return cls(sample, row_strata[positions], population, sizes)
+
+    def _total(self, values: np.ndarray) -> Tuple[float, float]:
+        # Estimated population total of `values` (0 outside the segment) and its variance
+        total = float((self.weights * values).sum())
+        variance = float((self._variance_factor * _stratum_variance(self.strata, values, self.sizes)).sum())
+        return total, variance
+
+    def estimate(self, expr: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Estimates (with standard errors) of the segment statistics for a
+        bitmap filter expression; None is the whole dataset.
+        """
+        in_segment = np.unpackbits(self.index.evaluate(expr).bits, count=len(self.df)).astype(bool)
+        indicator = in_segment.astype(float)
+
+        count, count_var = self._total(indicator)
+        estimates: Dict[str, Estimate] = {"n_customers": Estimate(count, math.sqrt(count_var))}
+
+        targets = {metric: self.df[col].to_numpy(dtype=float) for metric, col in MEAN_METRICS.items()}
+        targets["pct_high_value_customers"] = self.df["IsHighValue"].to_numpy(dtype=float) * 100.0
+
+        for metric, values in targets.items():
+            # Means skip missing values, like the exact answers
+            valid = in_segment & ~np.isnan(values)
+            values = np.where(valid, values, 0.0)
+            denominator, _ = self._total(valid.astype(float))
+            if denominator <= 0:
+                estimates[metric] = Estimate(float("nan"), float("inf"))
+                continue
+            ratio = float((self.weights * values).sum()) / denominator
+            _, residual_var = self._total(np.where(valid, values - ratio, 0.0))
+            estimates[metric] = Estimate(ratio, math.sqrt(residual_var) / denominator)
+
+        return {"estimates": estimates, "sample_rows": int(in_segment.sum())}
+
+    # -------------------------------------------
+    # Exact scan cost
+    # -------------------------------------------
+
+    def predict_exact_ms(self) -> Optional[float]:
+        if self.exact_ms_per_row is None:
+            return None
+        return self.exact_ms_per_row * self.n_population
+
+    def observe_exact(self, started: float) -> None:
+        """
+        Record the duration of an exact answer started at `started` (perf_counter).
+        """
+        per_row = (time.perf_counter() - started) * 1000.0 / max(self.n_population, 1)
+        if self.exact_ms_per_row is None:
+            self.exact_ms_per_row = per_row
+        else:
+            self.exact_ms_per_row = 0.8 * self.exact_ms_per_row + 0.2 * per_row
+
+
+if __name__ == "__main__":
+
+    # Interval coverage over many independent samples of a synthetic frame
+    from agno_app.bitmap_index import column_filter
+
+    rng = np.random.default_rng(1)
+    n = 200_000
+    frame = pd.DataFrame({
+        "Marital_Status": rng.choice(["married", "single", "together", "widow"], n, p=[0.4, 0.3, 0.299, 0.001]),
+        "Education": rng.choice(["graduate", "phd", "basic"], n, p=[0.6, 0.3, 0.1]),
+        "Total_Children": rng.integers(0, 3, n),
+        "Income": rng.gamma(4.0, 13_000.0, n),
+        "TotalSpend": rng.gamma(1.2, 500.0, n),
+        "Recency": rng.integers(0, 100, n),
+        "CustomerTenureDays": rng.integers(0, 700, n).astype(float),
+    })
+    frame["IsHighValue"] = frame["TotalSpend"] >= frame["TotalSpend"].quantile(0.8)
+
+    segment = column_filter("Education", "phd")
+    exact = frame[frame["Education"] == "phd"]
+    truth = {"n_customers": len(exact), "avg_income": exact["Income"].mean(), "avg_total_spend": exact["TotalSpend"].mean()}
+
+    covered = {metric: 0 for metric in truth}
+    runs = 200
+    for seed in range(runs):
+        sample = StratifiedSample.build(frame, sample_rows=5_000, seed=seed)
+        estimates = sample.estimate(segment)["estimates"]
+        for metric, value in truth.items():
+            low, high = estimates[metric].interval()
+            covered[metric] += bool(low <= value <= high)
+
+    coverage = {metric: hits / runs for metric, hits in covered.items()}
+    print(f"95% interval coverage over {runs} samples: {coverage}")
+    assert all(0.9 <= rate <= 1.0 for rate in coverage.values()), coverage
+
+    # The widow strata are small: fully sampled, so their estimates are exact
+    widows = StratifiedSample.build(frame, sample_rows=5_000).estimate(column_filter("Marital_Status", "widow"))
+    assert widows["estimates"]["avg_income"].se == 0.0
+    print("Small strata answered exactly:", round(widows["estimates"]["avg_income"].value, 2),
+          round(frame.loc[frame["Marital_Status"] == "widow", "Income"].mean(), 2))
@@ -0,0 +1,222 @@
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from agno_app.config import settings
+
+'''
+Compact, paginated tool results.
+
+Every tool result ends up in the LLM context (and stays there for the
+follow-up turns), so list-shaped results are sent in a compact form:
+
+- columnar: column names once, then one value array per row, the layout
+  compare_segments already uses ({"columns": [...], "rows": [[...], ...]})
+- with TOOL_ROUND_DIGITS set, numbers rounded and whole floats written as ints
+- at most TOOL_PAGE_ROWS rows per call; the rest is kept in a small
+  in-process store and fetched with the returned `next_cursor`
+- summary_only: row count and per-column min / mean / max plus a cursor,
+  for when the model only needs the shape of a large result
+
+TOOL_OUTPUT=records keeps the previous one-dict-per-row output.
+'''
+
+COMPACT = "compact"
+RECORDS = "records"
+
+# Paginated results kept for fetch_rows (least recently used dropped first)
+MAX_STORED_RESULTS = 64
+
+
+def round_values(value: Any, digits: Optional[int] = None) -> Any:
+    """
+    Round every float in a (nested) result; whole floats become ints.
+    """
+    if digits is None:
+        digits = settings.tool_round_digits
+    if digits is None or digits < 0:
+        return value
+
+    if isinstance(value, float):
+        if value != value:                      # NaN
+            return None
+        value = round(value, digits)
+        return int(value) if value.is_integer() and abs(value) < 2 ** 53 else value
+    if isinstance(value, dict):
+        return {key: round_values(item, digits) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [round_values(item, digits) for item in value]
+    return value
+
+
+def to_columns(records: Sequence[Dict[str, Any]]) -> Tuple[List[str], List[List[Any]]]:
+    """
+    One-dict-per-row records -> (column names, row arrays).
+    """
+    if not records:
+        return [], []
+    columns = list(records[0])
+    return columns, [[record.get(col) for col in columns] for record in records]
+
+
+def summarize_columns(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> Dict[str, Dict[str, float]]:
+    """
+    min / mean / max of every numeric column (booleans and ids excluded).
+    """
+    summary: Dict[str, Dict[str, float]] = {}
+    for i, name in enumerate(columns):
+        if name.endswith("_id"):
+            continue
+        values = [
+            row[i] for row in rows
+            if isinstance(row[i], (int, float)) and not isinstance(row[i], bool) and row[i] == row[i]
+        ]
+        if values:
+            summary[name] = {"min": min(values), "mean": sum(values) / len(values), "max": max(values)}
+    return summary
+
+
+# -------------------------------------------
+# Result store and cursors
+# -------------------------------------------
+
+class ResultStore:
+    """
+    Bounded in-process store of full tool results, addressed by handle.
+    """
+
+    def __init__(self, max_entries: int = MAX_STORED_RESULTS):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[List[str], List[List[Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, columns: List[str], rows: List[List[Any]]) -> str:
+        handle = uuid.uuid4().hex[:10]
+        with self._lock:
+            self._entries[handle] = (columns, rows)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return handle
+
+    def get(self, handle: str) -> Optional[Tuple[List[str], List[List[Any]]]]:
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is not None:
+                self._entries.move_to_end(handle)
+            return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+RESULT_STORE = ResultStore()
+
+
+def encode_cursor(handle: str, offset: int) -> str:
+    return f"{handle}:{offset}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    handle, _, offset = str(cursor).strip().partition(":")
+    return handle, int(offset or 0)
+
+
+def _page(
+    columns: List[str],
+    rows: List[List[Any]],
+    offset: int,
+    page_rows: int,
+    handle: Optional[str],
+) -> Dict[str, Any]:
+    end = offset + page_rows
+    result: Dict[str, Any] = {"columns": columns, "rows": rows[offset:end]}
+    if handle is not None:
+        result["n_rows"] = len(rows)
+        result["offset"] = offset
+        result["next_cursor"] = encode_cursor(handle, end) if end < len(rows) else None
+    return result
+
+
+def format_table(
+    columns: List[str],
+    rows: List[List[Any]],
+    summary_only: bool = False,
+    page_rows: Optional[int] = None,
+    digits: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Compact form of a table result: the first page (with a cursor when there
+    are more rows), or the summary plus a cursor with `summary_only`.
+    """
+    rows = round_values(rows, digits)
+    page_rows = max(1, settings.tool_page_rows if page_rows is None else page_rows)
+
+    if summary_only:
+        handle = RESULT_STORE.put(columns, rows)
+        return {
+            "n_rows": len(rows),
+            "columns": columns,
+            "summary": round_values(summarize_columns(columns, rows), digits),
+            "cursor": encode_cursor(handle, 0),
+        }
+
+    handle = RESULT_STORE.put(columns, rows) if len(rows) > page_rows else None
+    return _page(columns, rows, 0, page_rows, handle)
+
+
+def fetch_page(cursor: str, page_rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    The page of a stored result starting at the cursor.
+    """
+    try:
+        handle, offset = decode_cursor(cursor)
+    except ValueError:
+        return {"error": f"Invalid cursor: {cursor!r}"}
+
+    entry = RESULT_STORE.get(handle)
+    if entry is None:
+        return {"error": "Unknown or expired cursor; call the original tool again."}
+
+    columns, rows = entry
+    page_rows = max(1, settings.tool_page_rows if page_rows is None else page_rows)
+    return _page(columns, rows, max(0, offset), page_rows, handle)
+
+
+def format_records(
+    key: str,
+    records: List[Dict[str, Any]],
+    summary_only: bool = False,
+    page_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Output of a tool whose result is `{key: [record, ...]}`, in the
+    configured TOOL_OUTPUT format.
+    """
+    if settings.tool_output == RECORDS:
+        return {key: records}
+    return format_table(*to_columns(records), summary_only=summary_only, page_rows=page_rows)
+
+
+if __name__ == "__main__":
+
+    records = [{"customer_id": i, "income": 1000.0 + i / 3, "total_spend": float(i * 10)} for i in range(60)]
+
+    first = format_records("customers", records, page_rows=25)
+    assert first["columns"] == ["customer_id", "income", "total_spend"]
+    assert len(first["rows"]) == 25 and first["n_rows"] == 60
+    assert first["rows"][1] == round_values([1, 1000.0 + 1 / 3, 10.0])
+    assert round_values([1000.0 + 1 / 3, 10.0, float("nan")], digits=2) == [1000.33, 10, None]
+
+    pages = [first]
+    while pages[-1]["next_cursor"]:
+        pages.append(fetch_page(pages[-1]["next_cursor"], page_rows=25))
+    assert [row[0] for page in pages for row in page["rows"]] == list(range(60))
+
+    summary = format_records("customers", records, summary_only=True)
+    assert summary["n_rows"] == 60 and "customer_id" not in summary["summary"]
+    assert fetch_page(summary["cursor"], page_rows=60)["rows"][-1][0] == 59
+    assert "error" in fetch_page("missing:0")
+
+    print(f"{len(str({'customers': records}))} chars as records, {len(str(first))} as the first compact page")
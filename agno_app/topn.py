@@ -0,0 +1,151 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+'''
+Top-N selection over the engineered dataset.
+
+Two strategies, both avoiding a full DataFrame sort per call:
+
+- Whole dataset: a sorted row order is computed once per (metric, direction)
+  and dataset version, so a top-N query is a slice of that order.
+- Within a segment: partial selection (np.argpartition) over the segment's
+  row positions, then only the N selected rows are sorted.
+
+Ties are broken by row position, and missing values always rank last
+(like DataFrame.sort_values). Output records are built from column arrays in
+bulk instead of iterating rows.
+'''
+
+# Rankable engineered column -> field name used in tool output
+RANKABLE_METRICS: Dict[str, str] = {
+    "TotalSpend": "total_spend",
+    "Income": "income",
+    "Recency": "recency_days",
+    "Total_Purchases": "total_purchases",
+    "CustomerTenureDays": "customer_tenure_days",
+    "MntWines": "mnt_wines",
+    "MntFruits": "mnt_fruits",
+    "MntMeatProducts": "mnt_meat_products",
+    "MntFishProducts": "mnt_fish_products",
+    "MntSweetProducts": "mnt_sweet_products",
+    "MntGoldProds": "mnt_gold_prods",
+    "NumWebPurchases": "num_web_purchases",
+    "NumCatalogPurchases": "num_catalog_purchases",
+    "NumStorePurchases": "num_store_purchases",
+    "NumDealsPurchases": "num_deals_purchases",
+}
+
+
+def resolve_metric(metric: str) -> str:
+    """
+    Map a column name or its output field name (case-insensitive) to the column.
+    """
+    wanted = metric.strip().lower()
+    for column, field in RANKABLE_METRICS.items():
+        if wanted in (column.lower(), field):
+            return column
+    raise ValueError(
+        f"Unknown metric '{metric}'. Choose one of: {', '.join(RANKABLE_METRICS)}"
+    )
+
+
+def _sort_keys(values: np.ndarray, ascending: bool) -> np.ndarray:
+    # Float keys so NaN sorts last in both directions (-NaN is still NaN)
+    keys = values.astype(np.float64, copy=False)
+    return keys if ascending else -keys
+
+
+class TopNEngine:
+    """
+    Top-N queries over one dataset version.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        # Kept so the returned positions always refer to this version's rows
+        self.df = df
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "TopNEngine":
+        return cls(df)
+
+    def sorted_order(self, column: str, ascending: bool = False) -> np.ndarray:
+        """
+        Full row order for a metric, computed once and reused.
+        """
+        key = (column, ascending)
+        order = self._orders.get(key)
+        if order is None:
+            with self._lock:
+                order = self._orders.get(key)
+                if order is None:
+                    keys = _sort_keys(self.df[column].to_numpy(), ascending)
+                    order = np.argsort(keys, kind="stable")
+                    self._orders[key] = order
+        return order
+
+    def top_positions(
+        self,
+        column: str,
+        n: int,
+        ascending: bool = False,
+        positions: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Row positions of the top `n` rows by `column`, best first.
+
+        `positions` restricts the ranking to a segment (ascending row positions).
+        """
+        if positions is None:
+            return self.sorted_order(column, ascending)[:n]
+
+        n = min(n, len(positions))
+        if n == 0:
+            return positions[:0]
+
+        keys = _sort_keys(self.df[column].to_numpy()[positions], ascending)
+
+        if n < len(keys):
+            candidates = np.argpartition(keys, n - 1)[:n]
+        else:
+            candidates = np.arange(len(keys))
+
+        # Sort only the selected rows: by key, then by row position for ties
+        chosen = positions[candidates]
+        return chosen[np.lexsort((chosen, keys[candidates]))]
+
+
+def build_customer_records(
+    df: pd.DataFrame,
+    positions: np.ndarray,
+    extra_columns: Optional[List[str]] = None,
+) -> List[Dict[str, float]]:
+    """
+    Customer records for the given rows, built from column arrays in bulk.
+    """
+    def column(name: str) -> np.ndarray:
+        return df[name].to_numpy()[positions]
+
+    tenure = column("CustomerTenureDays").astype(np.float64)
+
+    fields: Dict[str, list] = {
+        "customer_id": column("ID").astype(np.int64).tolist(),
+        "income": column("Income").astype(np.float64).tolist(),
+        "total_spend": column("TotalSpend").astype(np.float64).tolist(),
+        "total_children": column("Total_Children").astype(np.int64).tolist(),
+        "recency_days": column("Recency").astype(np.float64).tolist(),
+        "customer_tenure_days": [None if np.isnan(v) else v for v in tenure.tolist()],
+    }
+
+    for name in extra_columns or []:
+        field = RANKABLE_METRICS.get(name, name)
+        if field not in fields:
+            values = column(name).astype(np.float64)
+            fields[field] = [None if np.isnan(v) else v for v in values.tolist()]
+
+    names = list(fields)
+    return [dict(zip(names, row)) for row in zip(*fields.values())]
@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import tempfile
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+from benchmarks.synthetic_data import SIZES, ensure_dataset
+from benchmarks.run_benchmarks import DEFAULT_DATA_DIR, RESULTS_DIR, _metadata
+
+'''
+Exact vs approximate answers of global_stats / segment_stats.
+
+For each query, against a synthetic dataset, reports the warm latency of the
+exact answer and of the sample estimate (max_latency_ms=0 forces the
+estimate), the estimate's actual relative error per metric, its claimed 95%
+bound and whether every interval contains the exact value.
+
+    python -m benchmarks.approximate_queries --size 1m
+'''
+
+QUERIES: List[Dict[str, Any]] = [
+    {},
+    {"education": "PhD"},
+    {"education": "Graduate", "marital_status": "Married"},
+    {"education": "Basic", "responded": True},
+    {"accepted_campaigns": [1, 2]},
+    {"complained": True},
+]
+
+METRICS = ["n_customers", "avg_income", "avg_total_spend", "avg_recency_days", "avg_customer_tenure_days", "pct_high_value_customers"]
+
+
+def _median_ms(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def measure_queries(path: str, repeat: int) -> List[Dict[str, Any]]:
+    from agno_app import data_interface
+    from agno_app import data_load_and_clean as dlc
+    from tools.data_tools import GLOBAL_STATS_KEYS, _global_stats_impl, _segment_stats_impl
+
+    data_interface.set_dataset_source(data_interface.LocalFileSource(path))
+    dlc.invalidate()
+
+    results = []
+    for filters in QUERIES:
+        if filters:
+            exact = partial(_segment_stats_impl, **filters)
+            approx = partial(_segment_stats_impl, **filters, max_latency_ms=0)
+            keys: Dict[str, str] = {}
+        else:
+            exact = _global_stats_impl
+            approx = partial(_global_stats_impl, max_latency_ms=0)
+            keys = GLOBAL_STATS_KEYS
+
+        exact_result, approx_result = exact(), approx()     # first calls build the indexes and sample
+        entry: Dict[str, Any] = {
+            "filters": filters,
+            "exact_ms": _median_ms(exact, repeat),
+            "approximate_ms": _median_ms(approx, repeat),
+            "mode": approx_result["mode"],
+        }
+        if approx_result["mode"] == "approximate":
+            errors, covered = {}, True
+            for metric in METRICS:
+                key = keys.get(metric, metric)
+                truth, estimate = exact_result[key], approx_result[key]
+                errors[metric] = round(abs(estimate - truth) / abs(truth), 5) if truth else 0.0
+                low, high = approx_result["intervals"][key]
+                # Rounding to 2 decimals can push the truth just outside a zero-width interval
+                covered &= low - 0.01 <= truth <= high + 0.01
+            entry.update(
+                actual_rel_error=errors,
+                claimed_max_rel_error=approx_result["max_rel_error"],
+                intervals_cover_exact=covered,
+                sample_rows=approx_result["sample_rows"],
+            )
+        results.append(entry)
+        print(
+            f"  {json.dumps(filters):<55} exact {entry['exact_ms']:>8} ms  approx {entry['approximate_ms']:>8} ms  "
+            f"max error {max(entry.get('actual_rel_error', {0: 0}).values()):.2%} "
+            f"(bound {entry.get('claimed_max_rel_error', 0):.2%})"
+        )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Exact vs approximate segment statistics")
+    parser.add_argument("--size", default="1m", choices=list(SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    path = ensure_dataset(args.size, args.data_dir, seed=args.seed)
+    print(f"[{args.size}] exact vs approximate answers on {path}")
+
+    report: Dict[str, Any] = {"meta": {**_metadata(), "size": args.size}, "queries": measure_queries(path, args.repeat)}
+
+    output = args.output or os.path.join(RESULTS_DIR, f"approximate-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+
+    import shutil
+
+    # Same isolation as run_benchmarks: a throwaway feature store
+    store_dir = tempfile.mkdtemp(prefix="bench-feature-store-")
+    os.environ["FEATURE_STORE_DIR"] = store_dir
+    os.environ.setdefault("KAGGLE_FALLBACK", "false")
+    try:
+        exit_code = main()
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+    sys.exit(exit_code)
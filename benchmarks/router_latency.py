@@ -0,0 +1,137 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from benchmarks.synthetic_data import SIZES, ensure_dataset
+from benchmarks.run_benchmarks import DEFAULT_DATA_DIR, RESULTS_DIR, _metadata
+
+'''
+Hit rate and latency of the intent router (tools/intent_router.py).
+
+Runs the router's example queries against a synthetic dataset and reports:
+
+- the hit rate (share of queries answered without the model) and whether
+  every query routed to the expected tool call
+- parse time and end-to-end routed latency (parse + tool), warm, per query
+- for comparison, the latency of real agent runs, read from an
+  INSTRUMENTATION trace file (TRACE_PATH) when one is given
+
+    python -m benchmarks.router_latency --size 2k
+    python -m benchmarks.router_latency --traces data/traces.jsonl
+'''
+
+
+def agent_run_latency(trace_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Median / p90 duration of the agent runs recorded in a trace file.
+    """
+    durations = []
+    with open(trace_path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("type") == "run" and record.get("agent") == "Data Agent":
+                durations.append(record["duration_ms"])
+    if not durations:
+        return None
+    durations.sort()
+    return {
+        "runs": len(durations),
+        "median_ms": round(statistics.median(durations), 2),
+        "p90_ms": round(durations[int(0.9 * (len(durations) - 1))], 2),
+    }
+
+
+def measure_router(path: str, repeat: int) -> Dict[str, Any]:
+    from agno_app import data_interface
+    from agno_app import data_load_and_clean as dlc
+    from tools.intent_router import EXAMPLE_QUERIES, execute, parse_intent
+
+    data_interface.set_dataset_source(data_interface.LocalFileSource(path))
+    dlc.invalidate()
+
+    queries = []
+    for query, expected in EXAMPLE_QUERIES:
+        call = parse_intent(query)
+        entry: Dict[str, Any] = {"query": query, "routed_to": call.tool if call else None, "correct": call == expected}
+
+        parse_times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse_intent(query)
+            parse_times.append(time.perf_counter() - start)
+        entry["parse_ms"] = round(statistics.median(parse_times) * 1000, 4)
+
+        if call is not None:
+            execute(call)                       # first call builds the indexes it needs
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                execute(parse_intent(query))
+                times.append(time.perf_counter() - start)
+            entry["routed_ms"] = round(statistics.median(times) * 1000, 4)
+
+        queries.append(entry)
+        print(f"  {query[:60]:<60} {str(entry['routed_to']):<24} {entry.get('routed_ms', '-')!s:>9} ms")
+
+    routed = [q for q in queries if q["routed_to"]]
+    return {
+        "queries": queries,
+        "hit_rate": round(len(routed) / len(queries), 4),
+        "all_correct": all(q["correct"] for q in queries),
+        "median_routed_ms": round(statistics.median(q["routed_ms"] for q in routed), 4) if routed else None,
+        "median_parse_ms": round(statistics.median(q["parse_ms"] for q in queries), 4),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Intent router hit rate and latency")
+    parser.add_argument("--size", default="2k", choices=list(SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--traces", default=None, help="INSTRUMENTATION trace file with real agent runs")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    path = ensure_dataset(args.size, args.data_dir, seed=args.seed)
+    print(f"[{args.size}] intent router on {path}")
+
+    report: Dict[str, Any] = {"meta": {**_metadata(), "size": args.size}, "router": measure_router(path, args.repeat)}
+    router = report["router"]
+    print(
+        f"\nHit rate {router['hit_rate']:.0%} ({'all' if router['all_correct'] else 'NOT all'} as expected), "
+        f"median routed latency {router['median_routed_ms']} ms, parse {router['median_parse_ms']} ms"
+    )
+
+    if args.traces:
+        report["agent"] = agent_run_latency(args.traces)
+        if report["agent"]:
+            print(f"Agent runs in {args.traces}: median {report['agent']['median_ms']} ms over {report['agent']['runs']} runs")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"router-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    return 0 if router["all_correct"] else 1
+
+
+if __name__ == "__main__":
+
+    import shutil
+
+    # Same isolation as run_benchmarks: a throwaway feature store
+    store_dir = tempfile.mkdtemp(prefix="bench-feature-store-")
+    os.environ["FEATURE_STORE_DIR"] = store_dir
+    os.environ.setdefault("KAGGLE_FALLBACK", "false")
+    try:
+        exit_code = main()
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+    sys.exit(exit_code)
@@ -0,0 +1,297 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.synthetic_data import SIZES, ensure_dataset
+
+'''
+Offline benchmark suite for the data pipeline and the Data Agent tools.
+
+For every requested size a synthetic marketing_campaign.csv is generated
+(once, under benchmarks/data/) and the following are measured:
+
+- load_raw_marketing_data, clean_data, feature_engineering
+- the cached dataset build (get_final_dataset on a cold process) and a
+  reload from the feature store
+- every `_*_impl` function in tools/data_tools.py, first call (which builds
+  the indexes it needs) and warm calls
+
+Wall times are taken without tracing; peak memory comes from a separate
+tracemalloc run (Python and numpy allocations, not Arrow buffers). Results
+are written as JSON under benchmarks/results/, and `--compare` prints the
+slowdown against an earlier result file.
+
+    python -m benchmarks.run_benchmarks --sizes 2k 100k
+    python -m benchmarks.run_benchmarks --sizes 1m --compare benchmarks/results/<old>.json
+'''
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_DIR = os.path.join(BENCH_DIR, "data")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Tool cases: impl name -> keyword arguments of each case. Impl functions not
+# listed here are still benchmarked, with their defaults.
+TOOL_CASES: Dict[str, List[Dict[str, Any]]] = {
+    "_global_stats_impl": [{}],
+    "_segment_stats_impl": [
+        {},
+        {"marital_status": "married", "has_children": True, "high_value_only": True},
+        {"education": "phd", "responded": True},
+    ],
+    "_compare_segments_impl": [
+        {"group_by": ["marital_status", "has_children"]},
+        {"segments": [{"marital_status": "single"}, {"marital_status": "married", "has_children": True}]},
+    ],
+    "_top_customers_impl": [
+        {"metric": "TotalSpend", "n": 10},
+        {"metric": "Income", "n": 25, "marital_status": "married"},
+    ],
+    "_top_customers_by_spend_impl": [{"n": 10}],
+    "_percentiles_impl": [
+        {},
+        {"metric": "Income", "percentiles": [10, 50, 90], "top_pct": 5},
+        {"metric": "MntWines", "bottom_pct": 10},
+    ],
+    "_percentile_rank_impl": [
+        {"metric": "Income", "value": 60000},
+        {"metric": "TotalSpend", "customer_id": 1000},
+    ],
+    "_histogram_impl": [
+        {},
+        {"metric": "Income", "bins": 50, "min_value": 20000, "max_value": 120000},
+    ],
+    # Synthetic IDs are 0 .. n_rows - 1 (benchmarks/synthetic_data.py): -1 is missing
+    "_customer_profiles_impl": [{"customer_ids": [0, 1, 2, 1000, 2000, -1]}],
+}
+
+
+def measure(
+    func: Callable[..., Any],
+    setup: Optional[Callable[[], Any]] = None,
+    repeat: int = 3,
+    profile_memory: bool = True,
+) -> Dict[str, Any]:
+    """
+    Time `func(setup())` `repeat` times, then trace its peak memory once.
+
+    `setup` runs before every call and is not timed (e.g. copying an input
+    the function modifies in place).
+    """
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg) if setup else func()
+        times.append(time.perf_counter() - start)
+
+    result: Dict[str, Any] = {
+        "repeat": repeat,
+        "seconds_min": round(min(times), 6),
+        "seconds_median": round(statistics.median(times), 6),
+    }
+
+    if profile_memory:
+        arg = setup() if setup else None
+        tracemalloc.start()
+        try:
+            func(arg) if setup else func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result["peak_mb"] = round(peak / 1024 / 1024, 3)
+
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metadata() -> Dict[str, Any]:
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pa.__version__,
+    }
+
+
+def benchmark_pipeline(path: str, repeat: int, profile_memory: bool) -> List[Dict[str, Any]]:
+    from agno_app import data_interface
+    from agno_app import data_load_and_clean as dlc
+
+    results = []
+
+    def record(name: str, stats: Dict[str, Any]) -> None:
+        results.append({"group": "pipeline", "name": name, "case": {}, **stats})
+        print(f"  {name:<40} {stats['seconds_median']:>10.4f}s  peak {stats.get('peak_mb', '-')} MB")
+
+    raw = dlc.load_raw_marketing_data(path)
+    cleaned = dlc.clean_data(raw.copy())
+
+    record("load_raw_marketing_data", measure(lambda: dlc.load_raw_marketing_data(path), None, repeat, profile_memory))
+    # Both steps modify their input, so each call gets a fresh copy
+    record("clean_data", measure(dlc.clean_data, lambda: raw.copy(), repeat, profile_memory))
+    record("feature_engineering", measure(dlc.feature_engineering, lambda: cleaned.copy(), repeat, profile_memory))
+
+    data_interface.set_dataset_source(data_interface.LocalFileSource(path))
+
+    def cold_build(_store_dir: str) -> None:
+        dlc.invalidate()
+        dlc.get_final_dataset()
+
+    # An empty feature store for every build, then reloads from it
+    record("get_final_dataset (build)", measure(cold_build, _clear_feature_store, repeat, profile_memory))
+    record("get_final_dataset (feature store)", measure(
+        lambda: (dlc.invalidate(), dlc.get_final_dataset()), None, repeat, profile_memory
+    ))
+
+    return results
+
+
+def _clear_feature_store() -> str:
+    import shutil
+    from agno_app.config import settings
+
+    shutil.rmtree(settings.feature_store_dir, ignore_errors=True)
+    return settings.feature_store_dir
+
+
+def benchmark_tools(path: str, repeat: int, profile_memory: bool) -> List[Dict[str, Any]]:
+    from agno_app import data_interface
+    from agno_app import data_load_and_clean as dlc
+    from tools import data_tools
+
+    data_interface.set_dataset_source(data_interface.LocalFileSource(path))
+    dlc.invalidate()
+    dlc.get_final_dataset()
+
+    impls = sorted(
+        name for name, value in vars(data_tools).items()
+        if name.startswith("_") and name.endswith("_impl") and callable(value)
+    )
+
+    def fresh_dataset() -> None:
+        # Reloaded from the feature store, so cached indexes start empty
+        dlc.invalidate()
+        dlc.get_final_dataset()
+
+    results = []
+    for name in impls:
+        func = getattr(data_tools, name)
+        for case in TOOL_CASES.get(name, [{}]):
+            first = measure(lambda _: func(**case), fresh_dataset, repeat, profile_memory)
+            warm = measure(lambda: func(**case), None, max(repeat, 5), profile_memory)
+
+            for label, stats in (("first_call", first), ("warm", warm)):
+                results.append({"group": "tools", "name": f"{name} ({label})", "case": case, **stats})
+            print(f"  {name:<32} {json.dumps(case)[:60]:<60} first {first['seconds_median']:.5f}s  warm {warm['seconds_median']:.6f}s")
+
+    return results
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 1.2) -> List[str]:
+    """
+    Lines describing every measurement that got slower than `threshold` x.
+    """
+    def key(entry: Dict[str, Any]) -> str:
+        return json.dumps([entry["size"], entry["name"], entry["case"]], sort_keys=True)
+
+    before = {key(entry): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in current["results"]:
+        old = before.get(key(entry))
+        if old is None or not old["seconds_median"]:
+            continue
+        ratio = entry["seconds_median"] / old["seconds_median"]
+        if ratio > threshold:
+            regressions.append(
+                f"{entry['size']:>5} {entry['name']} {json.dumps(entry['case'])}: "
+                f"{old['seconds_median']:.5f}s -> {entry['seconds_median']:.5f}s ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the data pipeline and tools on synthetic data")
+    parser.add_argument("--sizes", nargs="+", default=["2k", "100k"], choices=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc runs")
+    parser.add_argument("--skip-tools", action="store_true")
+    parser.add_argument("--compare", default=None, help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    report: Dict[str, Any] = {"meta": _metadata(), "results": []}
+    report["meta"]["repeat"] = args.repeat
+    profile_memory = not args.no_memory
+
+    for size in args.sizes:
+        path = ensure_dataset(size, args.data_dir, seed=args.seed)
+        print(f"\n[{size}] {SIZES[size]} rows - {path}")
+
+        entries = benchmark_pipeline(path, args.repeat, profile_memory)
+        if not args.skip_tools:
+            entries += benchmark_tools(path, args.repeat, profile_memory)
+        for entry in entries:
+            report["results"].append({"size": size, "rows": SIZES[size], **entry})
+
+    output = args.output or os.path.join(
+        RESULTS_DIR,
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{report['meta']['git_commit'] or 'unknown'}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare_results(json.load(f), report, args.threshold)
+        print(f"\n{len(regressions)} measurement(s) slower than {args.threshold}x the baseline")
+        for line in regressions:
+            print(f"  {line}")
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    import shutil
+
+    # Keep the project's own feature store untouched; must be set before
+    # agno_app.config is imported
+    store_dir = tempfile.mkdtemp(prefix="bench-feature-store-")
+    os.environ["FEATURE_STORE_DIR"] = store_dir
+    os.environ.setdefault("KAGGLE_FALLBACK", "false")
+    try:
+        exit_code = main()
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+    sys.exit(exit_code)
@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from benchmarks.synthetic_data import SIZES, ensure_dataset
+from benchmarks.run_benchmarks import DEFAULT_DATA_DIR, RESULTS_DIR, TOOL_CASES, _metadata
+
+'''
+Load test of the tool service (service.py) as the worker count grows.
+
+For each worker count the service is started on a synthetic dataset, and
+client processes send the benchmark tool cases (TOOL_CASES, round-robin)
+back to back for a fixed duration. Reported per worker count:
+
+- throughput (requests / second) and p50 / p99 latency, errors
+- memory of each worker (RSS, PSS and the resident part of the mapped
+  dataset artifact), from its /health endpoint: PSS splits the shared
+  pages between the workers, so it stays flat where one copy per worker
+  would grow with the dataset
+
+    python -m benchmarks.service_load --size 100k --workers 1 2 4
+'''
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tool name and arguments of every request case
+REQUEST_MIX: List[Tuple[str, Dict[str, Any]]] = [
+    (impl[1:-len("_impl")], kwargs)
+    for impl, cases in TOOL_CASES.items()
+    for kwargs in cases
+]
+
+
+def wait_ready(base_url: str, timeout_s: float = 300.0) -> None:
+    deadline = time.perf_counter() + timeout_s
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=5).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"Service at {base_url} not ready after {timeout_s}s")
+
+
+def worker_health(base_url: str, n_workers: int, attempts: int = 200) -> Dict[int, Dict[str, Any]]:
+    """
+    /health of each worker, keyed by pid (new connections land on any worker).
+    """
+    seen: Dict[int, Dict[str, Any]] = {}
+    for _ in range(attempts):
+        health = requests.get(f"{base_url}/health", headers={"Connection": "close"}, timeout=5).json()
+        seen[health["pid"]] = health
+        if len(seen) >= n_workers:
+            break
+    return seen
+
+
+def client_loop(base_url: str, duration_s: float, offset: int) -> Dict[str, Any]:
+    """
+    One client process: requests back to back on a keep-alive session.
+    """
+    session = requests.Session()
+    latencies, errors = [], 0
+    i = offset
+    deadline = time.perf_counter() + duration_s
+    while time.perf_counter() < deadline:
+        name, kwargs = REQUEST_MIX[i % len(REQUEST_MIX)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            ok = session.post(f"{base_url}/tools/{name}", json=kwargs, timeout=60).ok
+        except requests.RequestException:
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors += 1
+    return {"latencies": latencies, "errors": errors}
+
+
+def run_load(base_url: str, clients: int, duration_s: float) -> Dict[str, Any]:
+    with ProcessPoolExecutor(max_workers=clients) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(client_loop, [base_url] * clients, [duration_s] * clients, range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies = np.array([t for result in results for t in result["latencies"]]) * 1000
+    return {
+        "requests": int(latencies.size),
+        "errors": sum(result["errors"] for result in results),
+        "throughput_rps": round(latencies.size / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2) if latencies.size else None,
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2) if latencies.size else None,
+    }
+
+
+def measure(path: str, workers: int, port: int, clients: int, duration_s: float, store_dir: str) -> Dict[str, Any]:
+    env = {**os.environ, "DATA_PATH": path, "FEATURE_STORE_DIR": store_dir, "KAGGLE_FALLBACK": "false"}
+    proc = subprocess.Popen(
+        [sys.executable, "service.py", "--workers", str(workers), "--port", str(port)],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        start = time.perf_counter()
+        wait_ready(base_url)
+        ready_s = time.perf_counter() - start
+
+        # Let every worker finish its startup before the timed run
+        run_load(base_url, clients, min(2.0, duration_s))
+        load = run_load(base_url, clients, duration_s)
+        health = worker_health(base_url, workers)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    return {
+        "workers": workers,
+        "clients": clients,
+        "ready_s": round(ready_s, 2),
+        **load,
+        "worker_memory_mb": [entry["memory"] for entry in health.values()],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tool service throughput and latency vs worker count")
+    parser.add_argument("--size", default="100k", choices=list(SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8, help="Client processes sending requests")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    path = ensure_dataset(args.size, args.data_dir, seed=args.seed)
+    print(f"[{args.size}] tool service on {path} ({os.cpu_count()} CPUs, {args.clients} clients)")
+
+    report: Dict[str, Any] = {"meta": {**_metadata(), "size": args.size}, "runs": []}
+    # One feature store for all runs: the first one builds the artifact
+    store_dir = tempfile.mkdtemp(prefix="bench-feature-store-")
+    try:
+        for workers in args.workers:
+            run = measure(path, workers, args.port, args.clients, args.duration, store_dir)
+            report["runs"].append(run)
+            pss = sum(memory["pss_mb"] or 0 for memory in run["worker_memory_mb"])
+            print(
+                f"  {workers} worker(s): {run['throughput_rps']:>8.1f} req/s  p50 {run['p50_ms']:>7} ms  "
+                f"p99 {run['p99_ms']:>7} ms  errors {run['errors']}  workers' PSS {pss:.0f} MB"
+            )
+    finally:
+        import shutil
+
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"service-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from benchmarks.run_benchmarks import RESULTS_DIR, _metadata
+
+'''
+Startup time of the agent entry points.
+
+- Import-time profile (`python -X importtime`) of each entry module, in a
+  fresh interpreter: total time and the slowest imports (cumulative).
+- Time to menu: from launching agents/data_agent_with_user_input.py to its
+  first "Enter your query" prompt.
+- For reference, the import time of everything the agent needs to answer
+  (agno, the Groq client, tools.data_tools with pandas / numpy / pyarrow),
+  which the entry points now defer until the first query.
+
+    python -m benchmarks.startup_time
+'''
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_MODULES = ["agents.data_agent_with_user_input", "agents.data_agent", "main"]
+DEFERRED_MODULES = ["agno.agent", "agno.models.groq", "tools.data_tools"]
+MENU_SCRIPT = os.path.join("agents", "data_agent_with_user_input.py")
+MENU_PROMPT = "Enter your query"
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """
+    `-X importtime` lines -> [{"module", "self_ms", "cumulative_ms", "depth"}].
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return entries
+
+
+def import_profile(modules: List[str], top: int = 15) -> Dict[str, Any]:
+    code = "; ".join(f"import {module}" for module in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    entries = parse_importtime(proc.stderr)
+    roots = [entry for entry in entries if entry["depth"] == 0]
+
+    return {
+        "modules": modules,
+        "total_ms": round(sum(entry["cumulative_ms"] for entry in roots), 1),
+        "n_modules": len(entries),
+        "slowest": [
+            {**entry, "self_ms": round(entry["self_ms"], 2), "cumulative_ms": round(entry["cumulative_ms"], 2)}
+            for entry in sorted(entries, key=lambda e: e["cumulative_ms"], reverse=True)[:top]
+        ],
+    }
+
+
+def time_to_menu(repeat: int = 5) -> Dict[str, Any]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-u", MENU_SCRIPT],
+            cwd=PROJECT_ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        output = b""
+        while MENU_PROMPT.encode() not in output:
+            chunk = proc.stdout.read1(4096)
+            if not chunk:
+                break
+            output += chunk
+        times.append(time.perf_counter() - start)
+        proc.communicate(b"q\n", timeout=30)
+
+    return {
+        "repeat": repeat,
+        "seconds_min": round(min(times), 4),
+        "seconds_median": round(statistics.median(times), 4),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Startup time of the agent entry points")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports kept per profile")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    # A first run warms the bytecode cache, so the profiles do not include compilation
+    import_profile(ENTRY_MODULES + DEFERRED_MODULES)
+
+    report: Dict[str, Any] = {"meta": _metadata(), "imports": {}, "deferred": None, "time_to_menu": None}
+
+    for module in ENTRY_MODULES:
+        profile = import_profile([module], args.top)
+        report["imports"][module] = profile
+        print(f"  import {module:<40} {profile['total_ms']:>8.1f} ms ({profile['n_modules']} modules)")
+
+    report["deferred"] = import_profile(DEFERRED_MODULES, args.top)
+    print(f"  deferred until the first query       {report['deferred']['total_ms']:>8.1f} ms ({report['deferred']['n_modules']} modules)")
+
+    report["time_to_menu"] = time_to_menu(args.repeat)
+    print(f"  time to menu ({MENU_SCRIPT})  {report['time_to_menu']['seconds_median'] * 1000:>8.1f} ms")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import os
+import argparse
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+'''
+Synthetic marketing_campaign.csv files of any size, for offline benchmarks.
+
+The generator reproduces the Kaggle file's schema (same columns, same order,
+tab-separated) and its rough distributions, messy parts included:
+
+- Marital_Status with the rare "Alone" / "Absurd" / "YOLO" labels
+- ~1% missing Income and a few extreme incomes
+- day-first Dt_Customer strings ("%d-%m-%Y") over two years
+- spends skewed to the right and correlated with income
+- purchase counts with a long tail, so the 0.99 clip actually bites
+
+Rows are generated in chunks, so even the 10M-row file never has to fit in
+memory. The same (rows, seed) always gives the same file.
+'''
+
+# Benchmark sizes (2240 is the size of the real file)
+SIZES: Dict[str, int] = {
+    "2k": 2_240,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+COLUMNS = [
+    "ID", "Year_Birth", "Education", "Marital_Status", "Income", "Kidhome", "Teenhome",
+    "Dt_Customer", "Recency", "MntWines", "MntFruits", "MntMeatProducts", "MntFishProducts",
+    "MntSweetProducts", "MntGoldProds", "NumDealsPurchases", "AcceptedCmp3", "AcceptedCmp4",
+    "AcceptedCmp5", "AcceptedCmp1", "AcceptedCmp2", "Complain", "Z_CostContact", "Z_Revenue",
+    "Response", "NumWebPurchases", "NumCatalogPurchases", "NumStorePurchases", "NumWebVisitsMonth",
+]
+
+# Value frequencies of the real file
+MARITAL_STATUS_FREQ = {
+    "Married": 864, "Together": 580, "Single": 480, "Divorced": 232,
+    "Widow": 77, "Alone": 3, "Absurd": 2, "YOLO": 2,
+}
+EDUCATION_FREQ = {"Graduation": 1127, "PhD": 486, "Master": 370, "2n Cycle": 203, "Basic": 54}
+
+# Mean spend of an average-income customer, per product column
+SPEND_MEANS = {
+    "MntWines": 304, "MntFruits": 26, "MntMeatProducts": 167,
+    "MntFishProducts": 38, "MntSweetProducts": 27, "MntGoldProds": 44,
+}
+# Acceptance rates of the campaign flags
+CAMPAIGN_RATES = {
+    "AcceptedCmp3": 0.073, "AcceptedCmp4": 0.075, "AcceptedCmp5": 0.073,
+    "AcceptedCmp1": 0.064, "AcceptedCmp2": 0.013, "Complain": 0.009, "Response": 0.149,
+}
+
+FIRST_CUSTOMER_DATE = pd.Timestamp("2012-07-30")
+CUSTOMER_DAYS = 700
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def _choice(rng: np.random.Generator, freq: Dict[str, int], n: int) -> np.ndarray:
+    labels = np.array(list(freq))
+    p = np.array(list(freq.values()), dtype=np.float64)
+    return labels[rng.choice(len(labels), n, p=p / p.sum())]
+
+
+def generate_chunk(n_rows: int, rng: np.random.Generator, first_id: int = 0) -> pd.DataFrame:
+    """
+    `n_rows` synthetic raw rows with IDs first_id .. first_id + n_rows - 1 (shuffled).
+    """
+    n = n_rows
+    data: Dict[str, np.ndarray] = {}
+
+    data["ID"] = first_id + rng.permutation(n)
+    # A handful of impossible birth years, like the real file
+    data["Year_Birth"] = np.where(rng.random(n) < 0.0015, rng.integers(1893, 1901, n), rng.integers(1940, 1997, n))
+    data["Education"] = _choice(rng, EDUCATION_FREQ, n)
+    data["Marital_Status"] = _choice(rng, MARITAL_STATUS_FREQ, n)
+
+    income = rng.lognormal(np.log(48_000), 0.45, n).clip(1_730, 160_000).round()
+    income = np.where(rng.random(n) < 0.0005, 666_666.0, income)
+    data["Income"] = np.where(rng.random(n) < 0.0107, np.nan, income)
+
+    data["Kidhome"] = rng.choice(3, n, p=[0.577, 0.401, 0.022])
+    data["Teenhome"] = rng.choice(3, n, p=[0.517, 0.460, 0.023])
+
+    days = rng.integers(0, CUSTOMER_DAYS, n)
+    data["Dt_Customer"] = (FIRST_CUSTOMER_DATE + pd.to_timedelta(days, unit="D")).strftime("%d-%m-%Y").to_numpy()
+    data["Recency"] = rng.integers(0, 100, n)
+
+    # Spend grows with income and drops with children at home
+    scale = np.nan_to_num(income / 52_000.0, nan=1.0) ** 1.6 / (1 + 0.6 * data["Kidhome"])
+    for col, mean in SPEND_MEANS.items():
+        data[col] = np.minimum(rng.exponential(mean, n) * scale, mean * 12).astype(np.int64)
+
+    data["NumDealsPurchases"] = rng.poisson(2.3, n)
+    for col, rate in CAMPAIGN_RATES.items():
+        data[col] = (rng.random(n) < rate).astype(np.int64)
+    data["Z_CostContact"] = np.full(n, 3)
+    data["Z_Revenue"] = np.full(n, 11)
+
+    # Poisson counts plus a rare long tail (the real maxima are 27 and 28)
+    data["NumWebPurchases"] = rng.poisson(4.1, n) + np.where(rng.random(n) < 0.002, rng.integers(10, 24, n), 0)
+    data["NumCatalogPurchases"] = rng.poisson(2.7, n) + np.where(rng.random(n) < 0.002, rng.integers(10, 26, n), 0)
+    data["NumStorePurchases"] = rng.poisson(5.8, n)
+    data["NumWebVisitsMonth"] = rng.poisson(5.3, n)
+
+    return pd.DataFrame({col: data[col] for col in COLUMNS})
+
+
+def generate_marketing_campaign(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    A synthetic raw frame, as load_raw_marketing_data() would return it.
+    """
+    return generate_chunk(n_rows, np.random.default_rng(seed))
+
+
+def write_marketing_campaign(
+    n_rows: int,
+    path: str,
+    seed: int = 0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> str:
+    """
+    Write a synthetic tab-separated file, chunk by chunk. Returns the path.
+    """
+    rng = np.random.default_rng(seed)
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    written = 0
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        while written < n_rows:
+            n = min(chunk_rows, n_rows - written)
+            generate_chunk(n, rng, first_id=written).to_csv(f, sep="\t", index=False, header=written == 0)
+            written += n
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def dataset_path(size: str, data_dir: str, seed: int = 0) -> str:
+    return os.path.join(data_dir, f"marketing_campaign_{size}_seed{seed}.csv")
+
+
+def ensure_dataset(size: str, data_dir: str, seed: int = 0) -> str:
+    """
+    Path of the synthetic file for a named size, generating it on first use.
+    """
+    path = dataset_path(size, data_dir, seed)
+    if not os.path.exists(path):
+        write_marketing_campaign(SIZES[size], path, seed=seed)
+    return path
+
+
+def parse_size(value: str) -> int:
+    """
+    "100k" / "1m" / "2240" -> number of rows.
+    """
+    value = value.strip().lower()
+    if value in SIZES:
+        return SIZES[value]
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if value.endswith(suffix):
+            return int(float(value[:-1]) * factor)
+    return int(value)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Write a synthetic marketing_campaign.csv")
+    parser.add_argument("--rows", default="2k", help="2k, 100k, 1m, 10m or a row count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Output path (default: benchmarks/data/...)")
+    args = parser.parse_args()
+
+    n_rows = parse_size(args.rows)
+    out: Optional[str] = args.out or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "data", f"marketing_campaign_{args.rows}_seed{args.seed}.csv"
+    )
+    print(f"Writing {n_rows} rows to {write_marketing_campaign(n_rows, out, seed=args.seed)}")
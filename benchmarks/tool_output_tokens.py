@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.synthetic_data import SIZES, ensure_dataset
+from benchmarks.run_benchmarks import DEFAULT_DATA_DIR, RESULTS_DIR, _metadata
+
+'''
+Prompt tokens of tool results, before and after the compact output format.
+
+For each case the tool result is rendered the way agno puts it in the
+model context (str() of the returned value) in three forms:
+
+- records:  one dict per row, the previous output (TOOL_OUTPUT=records)
+- compact:  columnar, rounded, first page only (the default)
+- summary:  summary_only=true (row count, min/mean/max per column, cursor)
+
+Tokens are counted with agno's counter: tiktoken when it is installed,
+otherwise its ~4 characters per token estimate (the "tokenizer" field of
+the result says which).
+
+    python -m benchmarks.tool_output_tokens --size 2k
+'''
+
+MODEL_ID = "gpt-4o"
+
+
+def _cases() -> List[Tuple[str, Callable[..., Any], Optional[Callable[..., Any]], Dict[str, Any]]]:
+    # (label, impl returning the previous output, compact output function, kwargs).
+    # No output function: the tool returns a flat dict, unchanged by the format.
+    from tools import data_tools as t
+
+    return [
+        ("global_stats", t._global_stats_impl, None, {}),
+        ("top_customers_by_spend n=10", t._top_customers_by_spend_impl, t._top_customers_by_spend_output, {"n": 10}),
+        ("top_customers_by_spend n=100", t._top_customers_by_spend_impl, t._top_customers_by_spend_output, {"n": 100}),
+        ("top_customers Income n=50 married", t._top_customers_impl, t._top_customers_output,
+         {"metric": "Income", "n": 50, "marital_status": "married"}),
+        ("compare_segments marital x education", t._compare_segments_impl, t._compare_segments_output,
+         {"group_by": ["marital_status", "education"]}),
+        ("compare_segments 3 segments", t._compare_segments_impl, t._compare_segments_output,
+         {"segments": [{"marital_status": "single"}, {"marital_status": "married"}, {"high_value_only": True}]}),
+    ]
+
+
+def _tokenizer_name() -> str:
+    try:
+        import tiktoken  # noqa: F401
+        return "tiktoken"
+    except ImportError:
+        return "estimate (4 chars per token)"
+
+
+def measure_tokens(path: str) -> List[Dict[str, Any]]:
+    from agno.utils.tokens import count_text_tokens
+    from agno_app import data_interface
+    from agno_app import data_load_and_clean as dlc
+
+    data_interface.set_dataset_source(data_interface.LocalFileSource(path))
+    dlc.invalidate()
+
+    def tokens(value: Any) -> int:
+        return count_text_tokens(str(value), MODEL_ID)
+
+    results = []
+    for label, before, after, kwargs in _cases():
+        previous = tokens(before(**kwargs))
+        entry: Dict[str, Any] = {
+            "case": label,
+            "records": previous,
+            "compact": tokens(after(**kwargs)) if after else previous,
+        }
+        if after:
+            entry["summary"] = tokens(after(summary_only=True, **kwargs))
+        entry["saving_pct"] = round(100.0 * (1 - entry["compact"] / entry["records"]), 1) if entry["records"] else 0.0
+        results.append(entry)
+        print(
+            f"  {label:<40} records {entry['records']:>6}  compact {entry['compact']:>6}"
+            f"  summary {entry.get('summary', '-'):>6}  ({entry['saving_pct']:+.1f}%)"
+        )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prompt tokens of tool results, records vs compact")
+    parser.add_argument("--size", default="2k", choices=list(SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    path = ensure_dataset(args.size, args.data_dir, seed=args.seed)
+    print(f"[{args.size}] tokens per tool result ({_tokenizer_name()})")
+
+    report = {"meta": {**_metadata(), "size": args.size, "tokenizer": _tokenizer_name()}, "results": measure_tokens(path)}
+    output = args.output or os.path.join(RESULTS_DIR, f"tool-output-tokens-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+
+    import shutil
+
+    # Same isolation as run_benchmarks: a throwaway feature store
+    store_dir = tempfile.mkdtemp(prefix="bench-feature-store-")
+    os.environ["FEATURE_STORE_DIR"] = store_dir
+    os.environ.setdefault("KAGGLE_FALLBACK", "false")
+    try:
+        exit_code = main()
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+    sys.exit(exit_code)
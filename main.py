@@ -0,0 +1,69 @@
+import os
+import json
+import argparse
+
+from dotenv import load_dotenv
+
+from orchestrator import Orchestrator, format_timeline
+
+'''
+CLI entry point: one question in, a Markdown report out.
+
+    python main.py "Who are my high-value customers?"
+    python main.py "Compare married and single customers" --sub-query "..." --sub-query "..."
+    python main.py            # interactive
+
+After each report the per-stage timeline and the critical path are printed
+(--json prints the timing summary as JSON instead).
+'''
+
+# To load environment variables from env file
+load_dotenv()
+
+
+def create_model():
+    from agno.models.groq import Groq
+
+    return Groq(
+        api_key=os.getenv("GROQ_API_KEY"),
+        id=os.getenv("GROQ_MODEL_ID"),
+        temperature=0.1,
+    )
+
+
+def answer(orchestrator: Orchestrator, query: str, sub_queries=None, as_json: bool = False) -> None:
+    result = orchestrator.run(query, sub_queries)
+
+    print("\n" + result.report)
+    if not result.report_from_agent:
+        print("(Report assembled from the stage outputs: the Report Agent did not finish.)")
+
+    print()
+    if as_json:
+        print(json.dumps(result.run.summary(), indent=2))
+    else:
+        print(format_timeline(result.run))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Customer analysis report from a question")
+    parser.add_argument("query", nargs="?", help="Question (interactive when omitted)")
+    parser.add_argument("--sub-query", action="append", default=None,
+                        help="Data Agent sub-query, repeatable (default: the question itself)")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-stage timeout in seconds")
+    parser.add_argument("--concurrency", type=int, default=None, help="Concurrent stages of each kind")
+    parser.add_argument("--json", action="store_true", help="Print the timing summary as JSON")
+    args = parser.parse_args()
+
+    orchestrator = Orchestrator(create_model(), timeout_s=args.timeout, concurrency=args.concurrency)
+
+    if args.query:
+        answer(orchestrator, args.query, args.sub_query, args.json)
+    else:
+        while True:
+            query = input("\nEnter your question (or 'quit' to exit): ").strip()
+            if query.lower() in ("quit", "exit", "q"):
+                break
+            if query:
+                answer(orchestrator, query, as_json=args.json)
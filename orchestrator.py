@@ -0,0 +1,426 @@
+import sys
+import json
+import time
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Project root = folder of this file
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from agno_app.config import settings
+from agno_app.instrumentation import span
+
+'''
+Orchestrator: runs the Data -> Insight -> Strategy -> Report agents as a DAG.
+
+A user question is split into independent sub-queries (the question itself
+plus context queries such as the overall stats). Each sub-query is a branch:
+
+    data_i -> insight_i -> strategy_i ─┐
+    data_j -> insight_j -> strategy_j ─┼─> report
+    ...                                ┘
+
+Branches run concurrently, and a branch moves on as soon as its own input is
+ready: the Insight Agent works on the first statistics while the Data Agent
+is still answering the other sub-queries, and so on down the chain. The
+report starts as soon as the last branch is done, and uses whatever branches
+succeeded.
+
+Every stage has a timeout (ORCHESTRATOR_TIMEOUT_S) and every kind of stage a
+concurrency limit (ORCHESTRATOR_CONCURRENCY), so one slow call cannot hold
+the whole request and a fan-out cannot flood the model provider. Each run
+reports the per-stage timeline and its critical path.
+'''
+
+# Context queries answered next to the user's question, so the report can
+# compare a segment against the whole customer base
+CONTEXT_QUERIES: Tuple[str, ...] = ("Return overall stats for all customers as JSON.",)
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+STATUS_SKIPPED = "skipped"
+
+
+# -------------------------------------------
+# DAG executor
+# -------------------------------------------
+
+@dataclass
+class Stage:
+    """
+    One node of the DAG. `run` receives the values of its dependencies, by name.
+    """
+    name: str
+    kind: str                                   # concurrency pool, e.g. "data" or "report"
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]
+    deps: Tuple[str, ...] = ()
+    timeout_s: Optional[float] = None
+    allow_partial: bool = False                 # run with the deps that succeeded
+
+
+@dataclass
+class StageResult:
+    name: str
+    kind: str
+    deps: Tuple[str, ...]
+    status: str = STATUS_SKIPPED
+    value: Any = None
+    error: Optional[str] = None
+    ready: float = 0.0                          # seconds from the start of the run
+    start: float = 0.0                          # after the concurrency slot was acquired
+    end: float = 0.0
+
+    @property
+    def wait_s(self) -> float:
+        return self.start - self.ready
+
+    @property
+    def duration_s(self) -> float:
+        return self.end - self.start
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+
+@dataclass
+class DAGRun:
+    results: Dict[str, StageResult]
+    wall_s: float
+
+    def critical_path(self) -> List[StageResult]:
+        """
+        The chain of stages that decided the end time: starting from the
+        stage that finished last, follow the dependency that was ready last.
+        """
+        if not self.results:
+            return []
+        current = max(self.results.values(), key=lambda r: r.end)
+        path = [current]
+        while current.deps:
+            current = max((self.results[d] for d in current.deps), key=lambda r: r.end)
+            path.append(current)
+        return path[::-1]
+
+    def summary(self) -> Dict[str, Any]:
+        path = self.critical_path()
+        return {
+            "wall_s": round(self.wall_s, 3),
+            "critical_path": [r.name for r in path],
+            "critical_path_s": round(path[-1].end if path else 0.0, 3),
+            # What the same stages would take one after the other
+            "serial_s": round(sum(r.duration_s for r in self.results.values()), 3),
+            "stages": {
+                r.name: {
+                    "status": r.status,
+                    "wait_s": round(r.wait_s, 3),
+                    "duration_s": round(r.duration_s, 3),
+                    "end_s": round(r.end, 3),
+                    **({"error": r.error} if r.error else {}),
+                }
+                for r in self.results.values()
+            },
+        }
+
+
+def format_timeline(run: DAGRun) -> str:
+    """
+    Per-stage timeline plus the critical path, for console output.
+    """
+    lines = [f"{'stage':<14} {'status':<8} {'start':>7} {'wait':>7} {'time':>7}"]
+    for r in sorted(run.results.values(), key=lambda r: (r.start, r.name)):
+        lines.append(f"{r.name:<14} {r.status:<8} {r.start:>6.2f}s {r.wait_s:>6.2f}s {r.duration_s:>6.2f}s")
+
+    s = run.summary()
+    path = " -> ".join(
+        f"{r.name} ({r.duration_s:.2f}s)" for r in run.critical_path()
+    )
+    lines.append(f"Critical path: {path} = {s['critical_path_s']:.2f}s")
+    lines.append(f"Wall time {s['wall_s']:.2f}s, stages one after the other would take {s['serial_s']:.2f}s")
+    return "\n".join(lines)
+
+
+def _topological_order(stages: Sequence[Stage]) -> List[Stage]:
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        missing = [d for d in stage.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"Stage {stage.name} depends on unknown stage(s): {missing}")
+
+    order: List[Stage] = []
+    state: Dict[str, int] = {}                  # 1: visiting, 2: done
+
+    def visit(stage: Stage) -> None:
+        if state.get(stage.name) == 2:
+            return
+        if state.get(stage.name) == 1:
+            raise ValueError(f"Dependency cycle through stage {stage.name}")
+        state[stage.name] = 1
+        for dep in stage.deps:
+            visit(by_name[dep])
+        state[stage.name] = 2
+        order.append(stage)
+
+    for stage in stages:
+        visit(stage)
+    return order
+
+
+class DAGExecutor:
+    """
+    Run stages as soon as their dependencies are done.
+
+    - `limits`: max concurrent stages per kind (default_limit for the others)
+    - `default_timeout_s`: for stages without their own timeout (None: no limit)
+
+    A stage whose dependency failed is skipped, unless it allows partial
+    input. Stage errors never propagate; they are recorded in the results.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, int]] = None,
+        default_limit: int = 4,
+        default_timeout_s: Optional[float] = None,
+    ):
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.default_timeout_s = default_timeout_s
+
+    async def run(self, stages: Sequence[Stage]) -> DAGRun:
+        order = _topological_order(stages)
+        semaphores = {
+            kind: asyncio.Semaphore(max(1, self.limits.get(kind, self.default_limit)))
+            for kind in {stage.kind for stage in order}
+        }
+        t0 = time.perf_counter()
+        tasks: Dict[str, "asyncio.Task[StageResult]"] = {}
+
+        async def run_stage(stage: Stage) -> StageResult:
+            result = StageResult(stage.name, stage.kind, stage.deps)
+            deps = await asyncio.gather(*(tasks[d] for d in stage.deps))
+            result.ready = result.start = result.end = time.perf_counter() - t0
+
+            failed = [d.name for d in deps if not d.ok]
+            if failed and (not stage.allow_partial or len(failed) == len(deps)):
+                result.error = f"dependency failed: {', '.join(failed)}"
+                return result
+
+            inputs = {d.name: d.value for d in deps if d.ok}
+            timeout = stage.timeout_s if stage.timeout_s is not None else self.default_timeout_s
+            async with semaphores[stage.kind]:
+                result.start = time.perf_counter() - t0
+                try:
+                    with span(f"stage.{stage.kind}", kind="stage"):
+                        result.value = await asyncio.wait_for(stage.run(inputs), timeout)
+                    result.status = STATUS_OK
+                except asyncio.TimeoutError:
+                    result.status = STATUS_TIMEOUT
+                    result.error = f"timed out after {timeout}s"
+                except Exception as exc:
+                    result.status = STATUS_ERROR
+                    result.error = f"{type(exc).__name__}: {exc}"
+                finally:
+                    result.end = time.perf_counter() - t0
+            return result
+
+        # Dependencies first, so every task can await the ones it needs
+        for stage in order:
+            tasks[stage.name] = asyncio.create_task(run_stage(stage))
+        results = await asyncio.gather(*tasks.values())
+
+        return DAGRun(
+            results={r.name: r for r in results},
+            wall_s=time.perf_counter() - t0,
+        )
+
+
+# -------------------------------------------
+# Agent pipeline
+# -------------------------------------------
+
+@dataclass
+class OrchestratorResult:
+    query: str
+    sub_queries: List[str]
+    report: str
+    run: DAGRun
+    report_from_agent: bool = True              # False: assembled without the Report Agent
+    branches: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+def plan_sub_queries(query: str, sub_queries: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    The user's question (or the given sub-queries) plus the context queries, without duplicates.
+    """
+    planned = list(sub_queries) if sub_queries else [query]
+    for context in CONTEXT_QUERIES:
+        if context not in planned:
+            planned.append(context)
+    return [q.strip() for q in planned if q and q.strip()]
+
+
+def assemble_report(query: str, sub_queries: Sequence[str], run: DAGRun) -> str:
+    """
+    Markdown report built from the stage outputs alone, used when the
+    Report Agent failed or timed out.
+    """
+    lines = [f"# Customer analysis: {query}", ""]
+    for i, sub_query in enumerate(sub_queries):
+        lines += [f"## {sub_query}", ""]
+        for title, name in (("Statistics", f"data_{i}"), ("Insights", f"insight_{i}"), ("Recommended actions", f"strategy_{i}")):
+            result = run.results.get(name)
+            if result is not None and result.ok:
+                body = f"```json\n{result.value}\n```" if title == "Statistics" else str(result.value)
+                lines += [f"### {title}", "", body, ""]
+            elif result is not None:
+                lines += [f"### {title}", "", f"_Not available ({result.status})._", ""]
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def _content(response: Any) -> str:
+    return str(response.content or "").strip()
+
+
+class Orchestrator:
+    """
+    Data -> Insight -> Strategy -> Report, as a concurrent DAG.
+
+    `model` is used by every agent unless a per-agent model is given
+    (e.g. a small fast model for the Data Agent's tool calls).
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        data_model: Any = None,
+        report_model: Any = None,
+        timeout_s: Optional[float] = None,
+        concurrency: Optional[int] = None,
+    ):
+        # Imported here: the agents pull in agno models and the data tools
+        from agents.data_agent import create_data_agent
+        from agents.insight_agent import create_insight_agent
+        from agents.report_agent import create_report_agent
+        from agents.strategic_agent import create_strategy_agent
+
+        self._create_data_agent = lambda: create_data_agent(data_model or model, async_mode=True)
+        self._create_insight_agent = lambda: create_insight_agent(model)
+        self._create_strategy_agent = lambda: create_strategy_agent(model)
+        self._create_report_agent = lambda: create_report_agent(report_model or model)
+
+        timeout_s = settings.orchestrator_timeout_s if timeout_s is None else timeout_s
+        concurrency = settings.orchestrator_concurrency if concurrency is None else concurrency
+        self.executor = DAGExecutor(
+            # One report per request; the branch stages share `concurrency` slots per kind
+            limits={"report": 1},
+            default_limit=concurrency,
+            default_timeout_s=timeout_s or None,
+        )
+
+    # Stages. A fresh agent per call: agno agents keep per-run state, and
+    # concurrent runs must not share it.
+
+    async def _data(self, sub_query: str) -> str:
+        response = await self._create_data_agent().arun(sub_query, stream=False)
+        if not response.tools:
+            # Same rule as the Data Agent's own checks: no tool call, no numbers
+            raise RuntimeError("Data Agent did not use any tools")
+        return _content(response)
+
+    async def _insight(self, sub_query: str, stats: str) -> str:
+        prompt = f"Question: {sub_query}\nStatistics:\n{stats}"
+        return _content(await self._create_insight_agent().arun(prompt, stream=False))
+
+    async def _strategy(self, insights: str) -> str:
+        return _content(await self._create_strategy_agent().arun(f"Insights:\n{insights}", stream=False))
+
+    async def _report(self, query: str, sub_queries: Sequence[str], inputs: Dict[str, Any]) -> str:
+        parts = [f"User question: {query}"]
+        for i, sub_query in enumerate(sub_queries):
+            parts.append(f"\n## Sub-question: {sub_query}")
+            for title, name in (("Statistics", f"data_{i}"), ("Insights", f"insight_{i}"), ("Strategies", f"strategy_{i}")):
+                parts.append(f"{title}:\n{inputs.get(name, '(missing)')}")
+        return _content(await self._create_report_agent().arun("\n".join(parts), stream=False))
+
+    def build_stages(self, query: str, sub_queries: Sequence[str]) -> List[Stage]:
+        stages: List[Stage] = []
+        for i, sub_query in enumerate(sub_queries):
+            data, insight, strategy = f"data_{i}", f"insight_{i}", f"strategy_{i}"
+            stages += [
+                Stage(data, "data", lambda _, q=sub_query: self._data(q)),
+                Stage(insight, "insight", lambda inputs, q=sub_query, d=data: self._insight(q, inputs[d]), deps=(data,)),
+                Stage(strategy, "strategy", lambda inputs, s=insight: self._strategy(inputs[s]), deps=(insight,)),
+            ]
+
+        stages.append(Stage(
+            "report",
+            "report",
+            lambda inputs: self._report(query, sub_queries, inputs),
+            deps=tuple(stage.name for stage in stages),
+            allow_partial=True,
+        ))
+        return stages
+
+    async def arun(self, query: str, sub_queries: Optional[Sequence[str]] = None) -> OrchestratorResult:
+        planned = plan_sub_queries(query, sub_queries)
+        with span("orchestrator.run", kind="orchestrator", n_sub_queries=len(planned)):
+            run = await self.executor.run(self.build_stages(query, planned))
+
+        report_stage = run.results["report"]
+        if report_stage.ok and report_stage.value:
+            report, from_agent = report_stage.value, True
+        else:
+            report, from_agent = assemble_report(query, planned, run), False
+
+        branches = {
+            sub_query: {
+                kind: run.results[f"{kind}_{i}"].value for kind in ("data", "insight", "strategy")
+            }
+            for i, sub_query in enumerate(planned)
+        }
+        return OrchestratorResult(query, planned, report, run, from_agent, branches)
+
+    def run(self, query: str, sub_queries: Optional[Sequence[str]] = None) -> OrchestratorResult:
+        return asyncio.run(self.arun(query, sub_queries))
+
+
+if __name__ == "__main__":
+
+    # Offline check of the executor with sleeping stages (no model needed):
+    # two branches of different lengths, one stage that times out
+    async def sleep(seconds: float, value: Any = None) -> Any:
+        await asyncio.sleep(seconds)
+        return value
+
+    stages = [
+        Stage("data_0", "data", lambda _: sleep(0.20, "{}")),
+        Stage("data_1", "data", lambda _: sleep(0.05, "{}")),
+        Stage("insight_0", "insight", lambda _: sleep(0.10), deps=("data_0",)),
+        Stage("insight_1", "insight", lambda _: sleep(0.10), deps=("data_1",)),
+        Stage("strategy_0", "strategy", lambda _: sleep(0.10), deps=("insight_0",)),
+        Stage("strategy_1", "strategy", lambda _: sleep(1.00), deps=("insight_1",), timeout_s=0.1),
+        Stage("report", "report", lambda inputs: sleep(0.05, sorted(inputs)), deps=(
+            "data_0", "data_1", "insight_0", "insight_1", "strategy_0", "strategy_1"), allow_partial=True),
+    ]
+    run = asyncio.run(DAGExecutor(default_limit=2).run(stages))
+    print(format_timeline(run))
+
+    summary = run.summary()
+    assert summary["critical_path"] == ["data_0", "insight_0", "strategy_0", "report"], summary
+    assert run.results["strategy_1"].status == STATUS_TIMEOUT
+    assert run.results["report"].ok and "strategy_1" not in run.results["report"].value
+    # insight_1 started before data_0 was done: branches are pipelined
+    assert run.results["insight_1"].start < run.results["data_0"].end
+    assert summary["wall_s"] < summary["serial_s"]
+    print(json.dumps(summary, indent=2))
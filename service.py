@@ -0,0 +1,158 @@
+import os
+import argparse
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi import Body, FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+
+from agno_app.data_interface import list_dataset_ids
+from agno_app.data_load_and_clean import (
+    get_dataset_version,
+    get_final_dataset,
+    invalidate,
+    publish_dataset,
+    registry_report,
+)
+from agno_app.prewarm import prewarm_dataset
+from tools import data_tools
+
+'''
+HTTP service exposing the Data Agent tools, for several worker processes.
+
+    python service.py --workers 4 --port 8000
+
+    GET  /health              worker pid, dataset version, memory
+    GET  /tools               tool names
+    GET  /datasets            dataset ids, resident datasets and registry counters
+    POST /tools/<name>        JSON body = tool arguments, e.g.
+                              {"marital_status": "married", "has_children": true}
+                              (add "dataset_id" for another dataset)
+
+Before the workers start, the parent process builds (or finds) the
+engineered dataset in the feature store and passes the artifact folder to
+them as SHARED_DATASET_DIR. Each worker memory-maps that Arrow file instead
+of loading and cleaning the CSV itself, so there is one resident copy of
+the columns in the OS page cache, whatever the number of workers. Indexes
+derived from the frame (segment cube, bitmaps, top-N order) are still built
+per worker, at startup.
+
+Results are the full tool results (the `_impl` functions), not the
+paginated LLM form: fetch_rows cursors live in one worker's memory and
+could not be followed across workers.
+'''
+
+# To load environment variables from env file
+load_dotenv()
+
+TOOLS: Dict[str, Callable[..., Any]] = {
+    "global_stats": data_tools._global_stats_impl,
+    "segment_stats": data_tools._segment_stats_impl,
+    "compare_segments": data_tools._compare_segments_impl,
+    "top_customers": data_tools._top_customers_impl,
+    "top_customers_by_spend": data_tools._top_customers_by_spend_impl,
+    "percentiles": data_tools._percentiles_impl,
+    "percentile_rank": data_tools._percentile_rank_impl,
+    "histogram": data_tools._histogram_impl,
+    "customer_profiles": data_tools._customer_profiles_impl,
+    "list_datasets": data_tools._list_datasets_impl,
+}
+
+
+def process_memory() -> Dict[str, Optional[float]]:
+    """
+    Resident memory of this process in MB (Linux only): total RSS, PSS (shared
+    pages split between the processes mapping them) and the RSS of the mapped
+    dataset artifact.
+    """
+    memory: Dict[str, Optional[float]] = {"rss_mb": None, "pss_mb": None, "dataset_mapped_mb": None}
+    try:
+        with open("/proc/self/smaps", "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return memory
+
+    rss_kb = pss_kb = mapped_kb = 0
+    in_dataset = False
+    for line in lines:
+        fields = line.split()
+        if not fields[0].endswith(":"):
+            # Mapping header: "<range> <perms> <offset> <dev> <inode> [path]"
+            in_dataset = fields[-1].endswith(".arrow")
+        elif fields[0] == "Rss:":
+            rss_kb += int(fields[1])
+            if in_dataset:
+                mapped_kb += int(fields[1])
+        elif fields[0] == "Pss:":
+            pss_kb += int(fields[1])
+
+    memory.update(rss_mb=round(rss_kb / 1024, 1), pss_mb=round(pss_kb / 1024, 1), dataset_mapped_mb=round(mapped_kb / 1024, 1))
+    return memory
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Attach the dataset and build the indexes before taking requests
+    prewarm_dataset()
+    yield
+
+
+app = FastAPI(title="Customer data tools", lifespan=lifespan)
+
+
+@app.get("/health")
+def health() -> Dict[str, Any]:
+    return {
+        "pid": os.getpid(),
+        "dataset_version": get_dataset_version(),
+        "n_rows": int(len(get_final_dataset())),
+        "shared_dataset_dir": os.getenv("SHARED_DATASET_DIR"),
+        "memory": process_memory(),
+    }
+
+
+@app.get("/tools")
+def list_tools() -> Dict[str, Any]:
+    return {"tools": sorted(TOOLS)}
+
+
+@app.get("/datasets")
+def datasets() -> Dict[str, Any]:
+    return {"dataset_ids": list_dataset_ids(), "registry": registry_report()}
+
+
+# Plain (not async) handler: FastAPI runs it on its thread pool
+@app.post("/tools/{name}")
+def call_tool(name: str, arguments: Optional[Dict[str, Any]] = Body(default=None)) -> JSONResponse:
+    func = TOOLS.get(name)
+    if func is None:
+        raise HTTPException(status_code=404, detail=f"Unknown tool: {name}")
+    try:
+        result = func(**(arguments or {}))
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    # Tool results are plain JSON types: skip FastAPI's encoder
+    return JSONResponse({"tool": name, "result": result})
+
+
+if __name__ == "__main__":
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="HTTP service for the Data Agent tools")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    folder = publish_dataset()
+    os.environ["SHARED_DATASET_DIR"] = folder
+    # Workers (with a single worker, this process too) map the published
+    # artifact: drop the copy built here
+    invalidate()
+    print(f"Dataset artifact: {folder}")
+    print(f"Serving {len(TOOLS)} tools on http://{args.host}:{args.port} with {args.workers} worker(s)")
+
+    uvicorn.run("service:app", host=args.host, port=args.port, workers=args.workers, log_level=args.log_level)
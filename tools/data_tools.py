@@ -1,11 +1,30 @@
-from typing import Dict, Optional, List
+import math
+import time
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, List, Union
+
+import numpy as np
+from pydantic import BaseModel
 
 # Turns your Python functions into Agno tools that an agent can call
 from agno.tools import tool
 
-from agno_app.data_load_and_clean import get_final_dataset
+from agno_app.config import settings
+from agno_app.instrumentation import traced
+from agno_app.data_interface import list_dataset_ids
+from agno_app.data_load_and_clean import get_final_dataset, get_dataset_artifact, registry_report
+from agno_app.bitmap_index import BitmapIndex, all_of, column_filter
+from agno_app.segment_cube import SegmentCube, SegmentPartials, group_partials
+from agno_app.stratified_sample import MIN_DOMAIN_ROWS, StratifiedSample
+from agno_app.distribution_index import MAX_HISTOGRAM_BINS, ColumnDistribution, DistributionIndex
+from agno_app.customer_index import CustomerIndex, build_customer_profiles
+from agno_app.topn import TopNEngine, build_customer_records, resolve_metric
+from agno_app.tool_output import RECORDS, fetch_page, format_records, format_table
 
-import pandas as pd
 
 # Tool implementations
 '''
@@ -14,13 +33,30 @@ because it would not be easy to test these functions directly otherwise.
 
 We are using this function only using a wrapper function decorated with @tool
 '''
-def _global_stats_impl() -> Dict[str, float]:
+def _global_stats_impl(
+    dataset_id: Optional[str] = None,
+    max_rel_error: Optional[float] = None,
+    max_latency_ms: Optional[float] = None,
+) -> Dict[str, float]:
     """
     Compute overall dataset-level statistics.
 
-    Returns JSON-serializable numeric values only.
+    Returns JSON-serializable numeric values only. May be answered from the
+    dataset's stratified sample (see "Approximate answers" below).
     """
-    df = get_final_dataset()
+    if _approx_requested(max_rel_error, max_latency_ms):
+        return _approximate_or_exact(
+            lambda: _global_stats_exact(dataset_id),
+            None,
+            GLOBAL_STATS_KEYS,
+            dataset_id,
+            max_rel_error,
+            max_latency_ms,
+        )
+    return _global_stats_exact(dataset_id)
+
+def _global_stats_exact(dataset_id: Optional[str] = None) -> Dict[str, float]:
+    df = get_final_dataset(dataset_id)
 
     n_customers = int(len(df))
     avg_income = float(df["Income"].mean())
@@ -39,48 +75,228 @@ def _global_stats_impl() -> Dict[str, float]:
         "pct_high_value_customers": round(high_value_pct, 2),
     }
 
+# Added to the description of every data tool
+DATASET_NOTE = (
+    " Pass dataset_id (see list_datasets) to query another dataset, e.g. a regional or monthly "
+    "snapshot; omit it for the default dataset."
+)
+
+# -------------------------------------------
+# Approximate answers
+# -------------------------------------------
+'''
+With APPROX_QUERIES=true, or when a call passes max_rel_error or
+max_latency_ms, global_stats and segment_stats may answer from the
+stratified sample of the dataset version (agno_app/stratified_sample.py)
+and say which kind of answer they gave ("mode"):
+
+- segments the segment cube covers are always exact: a lookup is cheaper
+  than any estimate
+- with a latency target, the exact answer is used when its predicted scan
+  time (learned from earlier exact answers) fits; otherwise the estimate
+  is returned, even if it misses the error target
+- without one, the estimate is returned when every 95% interval is within
+  the error target (default APPROX_MAX_REL_ERROR), the exact answer otherwise
+'''
+APPROX_NOTE = (
+    " On large datasets, pass max_rel_error (e.g. 0.05 for +/-5%) and/or max_latency_ms to allow "
+    "an approximate answer from a sample: the result then has 'mode' ('exact' or 'approximate') "
+    "and, when approximate, 95% confidence intervals."
+)
+
+# Estimate name -> result key, where the exact result names it differently
+GLOBAL_STATS_KEYS = {"avg_income": "avg_income ($)", "avg_total_spend": "avg_total_spend ($)"}
+SEGMENT_STATS_KEYS: Dict[str, str] = {}
+
+def _approx_requested(max_rel_error: Optional[float], max_latency_ms: Optional[float]) -> bool:
+    return settings.approx_queries or max_rel_error is not None or max_latency_ms is not None
+
+def _build_sample(df: Any) -> StratifiedSample:
+    return StratifiedSample.build(df, sample_rows=settings.approx_sample_rows)
+
+def _exact_answer(exact: Callable[[], Dict[str, float]], sample: StratifiedSample) -> Dict[str, Any]:
+    started = time.perf_counter()
+    result = exact()
+    sample.observe_exact(started)
+    return {**result, "mode": "exact"}
+
+def _approximate_or_exact(
+    exact: Callable[[], Dict[str, float]],
+    expr: Optional[Dict[str, Any]],
+    keys: Dict[str, str],
+    dataset_id: Optional[str],
+    max_rel_error: Optional[float],
+    max_latency_ms: Optional[float],
+) -> Dict[str, Any]:
+    """
+    Exact or sample-based answer for the rows selected by `expr`.
+    """
+    sample = get_dataset_artifact("stratified_sample", _build_sample, dataset_id)
+    if sample.complete:
+        return {**exact(), "mode": "exact"}
+
+    predicted_ms = sample.predict_exact_ms()
+    if max_latency_ms is not None and predicted_ms is not None and predicted_ms <= max_latency_ms:
+        return _exact_answer(exact, sample)
+
+    approx = sample.estimate(expr)
+    if approx["sample_rows"] == 0:
+        # Nothing to estimate from
+        return _exact_answer(exact, sample)
+
+    target = settings.approx_max_rel_error if max_rel_error is None else max_rel_error
+    estimates = approx["estimates"]
+    rel_error = max(estimate.rel_error() for estimate in estimates.values())
+    target_met = rel_error <= target and approx["sample_rows"] >= MIN_DOMAIN_ROWS
+    if not target_met and max_latency_ms is None:
+        return _exact_answer(exact, sample)
+
+    result: Dict[str, Any] = {}
+    intervals: Dict[str, List[float]] = {}
+    for name, estimate in estimates.items():
+        key = keys.get(name, name)
+        low, high = estimate.interval()
+        if name == "n_customers":
+            result[key] = int(round(estimate.value))
+            intervals[key] = [int(math.floor(low)), int(math.ceil(high))]
+        else:
+            result[key] = round(estimate.value, 2)
+            intervals[key] = [round(low, 2), round(high, 2)]
+
+    return {
+        **result,
+        "mode": "approximate",
+        "confidence": 0.95,
+        "intervals": intervals,
+        "max_rel_error": round(rel_error, 4),
+        "error_target_met": target_met,
+        "sample_rows": approx["sample_rows"],
+    }
+
 # This tells Agno that this function is a tool
 @tool(
     name="global_stats",
-    description="Return overall statistics for the full customer base and high-value customers.",
+    description=(
+        "Return overall statistics for the full customer base and high-value customers."
+        + DATASET_NOTE
+        + APPROX_NOTE
+    ),
     show_result=False,
     stop_after_tool_call=False,
 )
 
 # A wrapper function
-def global_stats() -> Dict[str, float]:
+@traced("global_stats", kind="tool")
+def global_stats(
+    dataset_id: Optional[str] = None,
+    max_rel_error: Optional[float] = None,
+    max_latency_ms: Optional[float] = None,
+) -> Dict[str, float]:
     # Thin wrapper – Agno will use this
-    return _global_stats_impl()
+    return _global_stats_impl(dataset_id=dataset_id, max_rel_error=max_rel_error, max_latency_ms=max_latency_ms)
 
 # -------------------------------------------
 
-def _segment_stats_impl(
+def _segment_filter_expr(
     marital_status: Optional[str] = None,
     has_children: Optional[bool] = None,
     high_value_only: bool = False,
-) -> Dict[str, float]:
+    education: Optional[str] = None,
+    accepted_campaigns: Optional[List[int]] = None,
+    complained: Optional[bool] = None,
+    responded: Optional[bool] = None,
+) -> Optional[Dict[str, Any]]:
     """
-    Compute stats for a filtered customer segment.
+    Translate segment tool arguments into a bitmap index filter expression.
     """
-    df = get_final_dataset()
-
-    seg_df = df
+    parts: List[Optional[Dict[str, Any]]] = []
 
     if marital_status:
-        marital_status = marital_status.strip().lower()
-        seg_df = seg_df[seg_df["Marital_Status"] == marital_status]
+        parts.append(column_filter("Marital_Status", marital_status))
 
-    # TO process null and false values differently
     if has_children is not None:
-        if has_children: # => Not null and true
-            seg_df = seg_df[seg_df["Total_Children"] > 0]
-        else:            # => Not null and false
-            seg_df = seg_df[seg_df["Total_Children"] == 0]
+        no_children = column_filter("Total_Children", 0)
+        parts.append({"not": no_children} if has_children else no_children)
 
     if high_value_only:
-        seg_df = seg_df[seg_df["IsHighValue"]]
+        parts.append(column_filter("IsHighValue", True))
+
+    if education:
+        parts.append(column_filter("Education", education))
+
+    # Accepted at least one of the listed campaigns (1-5)
+    if accepted_campaigns:
+        if any(int(c) not in range(1, 6) for c in accepted_campaigns):
+            raise ValueError("accepted_campaigns must be among 1-5")
+        parts.append({"or": [column_filter(f"AcceptedCmp{int(c)}", 1) for c in accepted_campaigns]})
+
+    if complained is not None:
+        parts.append(column_filter("Complain", 1 if complained else 0))
+
+    if responded is not None:
+        parts.append(column_filter("Response", 1 if responded else 0))
+
+    return all_of(*parts)
+
+SEGMENT_FILTER_KEYS = (
+    "marital_status",
+    "has_children",
+    "high_value_only",
+    "education",
+    "accepted_campaigns",
+    "complained",
+    "responded",
+)
+
+def _served_by_cube(
+    education: Optional[str] = None,
+    accepted_campaigns: Optional[List[int]] = None,
+    complained: Optional[bool] = None,
+    responded: Optional[bool] = None,
+) -> bool:
+    return not (education or accepted_campaigns or complained is not None or responded is not None)
+
+def _segment_partials(
+    marital_status: Optional[str] = None,
+    has_children: Optional[bool] = None,
+    high_value_only: bool = False,
+    education: Optional[str] = None,
+    accepted_campaigns: Optional[List[int]] = None,
+    complained: Optional[bool] = None,
+    responded: Optional[bool] = None,
+    dataset_id: Optional[str] = None,
+) -> SegmentPartials:
+    """
+    Filters on the three classic dimensions only are served from the segment
+    cube (a dictionary lookup). Any other filter is evaluated on the bitmap
+    index and aggregated over the selected row positions, without copying
+    the frame.
+    """
+    if not _served_by_cube(education, accepted_campaigns, complained, responded):
+        index = get_dataset_artifact("bitmap_index", BitmapIndex.build, dataset_id)
+        selection = index.evaluate(
+            _segment_filter_expr(
+                marital_status=marital_status,
+                has_children=has_children,
+                high_value_only=high_value_only,
+                education=education,
+                accepted_campaigns=accepted_campaigns,
+                complained=complained,
+                responded=responded,
+            )
+        )
+        return SegmentPartials.from_positions(index.df, selection.positions())
+
+    cube = get_dataset_artifact("segment_cube", SegmentCube.build, dataset_id)
+    return cube.lookup(
+        marital_status=marital_status,
+        has_children=has_children,
+        high_value_only=high_value_only,
+    )
 
-    n_customers = int(len(seg_df))
+def _segment_result(partials: SegmentPartials) -> Dict[str, float]:
+    stats = partials.stats()
+    n_customers = int(stats["n_customers"])
 
     if n_customers == 0:
         return {
@@ -92,27 +308,80 @@ def _segment_stats_impl(
             "pct_high_value_customers": 0.0,
         }
 
-    avg_income = float(seg_df["Income"].mean())
-    avg_total_spend = float(seg_df["TotalSpend"].mean())
-    avg_recency = float(seg_df["Recency"].mean())
-    avg_tenure_days = float(seg_df["CustomerTenureDays"].mean(skipna=True))
-    high_value_pct = float(seg_df["IsHighValue"].mean() * 100.0)
-
     return {
         "n_customers": n_customers,
-        "avg_income": round(avg_income, 2),
-        "avg_total_spend": round(avg_total_spend, 2),
-        "avg_recency_days": round(avg_recency, 2),
-        "avg_customer_tenure_days": round(avg_tenure_days, 2),
-        "pct_high_value_customers": round(high_value_pct, 2),
+        "avg_income": round(stats["avg_income"], 2),
+        "avg_total_spend": round(stats["avg_total_spend"], 2),
+        "avg_recency_days": round(stats["avg_recency_days"], 2),
+        "avg_customer_tenure_days": round(stats["avg_customer_tenure_days"], 2),
+        "pct_high_value_customers": round(stats["pct_high_value_customers"], 2),
     }
 
+def _segment_stats_impl(
+    marital_status: Optional[str] = None,
+    has_children: Optional[bool] = None,
+    high_value_only: bool = False,
+    education: Optional[str] = None,
+    accepted_campaigns: Optional[List[int]] = None,
+    complained: Optional[bool] = None,
+    responded: Optional[bool] = None,
+    dataset_id: Optional[str] = None,
+    max_rel_error: Optional[float] = None,
+    max_latency_ms: Optional[float] = None,
+) -> Dict[str, float]:
+    """
+    Compute stats for a filtered customer segment.
+    """
+    filters = dict(
+        marital_status=marital_status,
+        has_children=has_children,
+        high_value_only=high_value_only,
+        education=education,
+        accepted_campaigns=accepted_campaigns,
+        complained=complained,
+        responded=responded,
+    )
+    if _approx_requested(max_rel_error, max_latency_ms):
+        def exact() -> Dict[str, float]:
+            return _segment_result(_segment_partials(**filters, dataset_id=dataset_id))
+
+        if _served_by_cube(education, accepted_campaigns, complained, responded):
+            # A cube lookup: exact and cheaper than any estimate
+            return {**exact(), "mode": "exact"}
+        return _approximate_or_exact(
+            exact,
+            _segment_filter_expr(**filters),
+            SEGMENT_STATS_KEYS,
+            dataset_id,
+            max_rel_error,
+            max_latency_ms,
+        )
+
+    return _segment_result(
+        _segment_partials(
+            marital_status=marital_status,
+            has_children=has_children,
+            high_value_only=high_value_only,
+            education=education,
+            accepted_campaigns=accepted_campaigns,
+            complained=complained,
+            responded=responded,
+            dataset_id=dataset_id,
+        )
+    )
+
 @tool(
     name="segment_stats",
     description=(
         "Return statistics for a customer segment. "
         "Supports filters on marital_status (e.g. 'married', 'single', 'together'), "
-        "has_children (true/false), and high_value_only (true/false)."
+        "has_children (true/false), high_value_only (true/false), "
+        "education ('graduate', 'phd', 'master', 'undergraduate', 'basic'), "
+        "accepted_campaigns (list of campaign numbers 1-5; accepted any of them), "
+        "complained (true/false) and responded (accepted the last campaign, true/false). "
+        "All filters are combined with AND."
+        + DATASET_NOTE
+        + APPROX_NOTE
     ),
 
     # If show_result=True, the agent prints this raw JSON in the chat before reasoning.
@@ -144,15 +413,30 @@ def _segment_stats_impl(
     stop_after_tool_call=False,
 )
 
+@traced("segment_stats", kind="tool")
 def segment_stats(
     marital_status: Optional[str] = None,
     has_children: Optional[bool] = None,
     high_value_only: bool = False,
+    education: Optional[str] = None,
+    accepted_campaigns: Optional[List[int]] = None,
+    complained: Optional[bool] = None,
+    responded: Optional[bool] = None,
+    dataset_id: Optional[str] = None,
+    max_rel_error: Optional[float] = None,
+    max_latency_ms: Optional[float] = None,
 ) -> Dict[str, float]:
     return _segment_stats_impl(
         marital_status=marital_status,
         has_children=has_children,
         high_value_only=high_value_only,
+        education=education,
+        accepted_campaigns=accepted_campaigns,
+        complained=complained,
+        responded=responded,
+        dataset_id=dataset_id,
+        max_rel_error=max_rel_error,
+        max_latency_ms=max_latency_ms,
     )
 
 
@@ -161,48 +445,937 @@ def segment_stats(
 
 # -------------------------------------------
 
-def _top_customers_by_spend_impl(n: int = 10) -> Dict[str, List[Dict[str, float]]]:
+SEGMENT_RESULT_COLUMNS = [
+    "n_customers",
+    "avg_income",
+    "avg_total_spend",
+    "avg_recency_days",
+    "avg_customer_tenure_days",
+    "pct_high_value_customers",
+]
+
+class SegmentSpec(BaseModel):
+    """
+    One segment for compare_segments (same filters as segment_stats).
     """
-    Return top N customers ranked by TotalSpend.
 
-    Returns a list of customer records with key fields.
+    label: Optional[str] = None
+    marital_status: Optional[str] = None
+    has_children: Optional[bool] = None
+    high_value_only: bool = False
+    education: Optional[str] = None
+    accepted_campaigns: Optional[List[int]] = None
+    complained: Optional[bool] = None
+    responded: Optional[bool] = None
+
+def _spec_dict(spec: Union[SegmentSpec, Dict[str, Any], None]) -> Dict[str, Any]:
+    if spec is None:
+        return {}
+    if isinstance(spec, BaseModel):
+        return spec.model_dump(exclude_none=True)
+    return dict(spec)
+
+def _segment_label(spec: Dict[str, Any]) -> str:
+    parts = [
+        f"{key}={spec[key]}"
+        for key in SEGMENT_FILTER_KEYS
+        if spec.get(key) not in (None, [], "") and not (key == "high_value_only" and not spec[key])
+    ]
+    return ", ".join(parts) if parts else "all customers"
+
+def _compare_segments_impl(
+    segments: Optional[List[Dict[str, Any]]] = None,
+    group_by: Optional[List[str]] = None,
+    where: Optional[Dict[str, Any]] = None,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Compute segment_stats for many segments in one call.
+
+    Either pass `segments` (a list of segment_stats filter dicts, each with an
+    optional "label"), or `group_by` dimensions (marital_status, education,
+    has_children, high_value) optionally restricted by a `where` filter dict.
+    Group-by results come from a single vectorized pass over the rows.
+
+    Returns one compact table: column names once, then one row per segment.
+    """
+    rows: List[List[Any]] = []
+
+    if group_by:
+        dims = [dim.strip().lower() for dim in group_by]
+
+        # The index keeps the frame it was built on, so rows and positions match
+        index = get_dataset_artifact("bitmap_index", BitmapIndex.build, dataset_id)
+        where = {key: value for key, value in (where or {}).items() if key in SEGMENT_FILTER_KEYS}
+        expr = _segment_filter_expr(**where)
+        positions = index.evaluate(expr).positions() if expr is not None else None
+
+        for key, partials in group_partials(index.df, dims, positions, codes_for=index.group_codes):
+            result = _segment_result(partials)
+            rows.append(list(key) + [result[col] for col in SEGMENT_RESULT_COLUMNS])
+
+        return {"columns": dims + SEGMENT_RESULT_COLUMNS, "rows": rows}
+
+    for spec in segments or []:
+        filters = {key: value for key, value in spec.items() if key in SEGMENT_FILTER_KEYS}
+        result = _segment_result(_segment_partials(**filters, dataset_id=dataset_id))
+        rows.append([spec.get("label") or _segment_label(filters)] + [result[col] for col in SEGMENT_RESULT_COLUMNS])
+
+    return {"columns": ["segment"] + SEGMENT_RESULT_COLUMNS, "rows": rows}
+
+# Added to the description of the tools returning tables
+TABLE_OUTPUT_NOTE = (
+    " The result is a table: 'columns' once, then 'rows'. When it has more rows than one page, "
+    "call fetch_rows with its 'next_cursor' for the next page (only if you need them). "
+    "Set summary_only=true to get the row count and min/mean/max of each column instead of the rows."
+)
+
+def _compare_segments_output(summary_only: bool = False, **kwargs: Any) -> Dict[str, Any]:
+    result = _compare_segments_impl(**kwargs)
+    if settings.tool_output == RECORDS:
+        return result
+    return format_table(result["columns"], result["rows"], summary_only=summary_only)
+
+@tool(
+    name="compare_segments",
+    description=(
+        "Return statistics for several customer segments in ONE call, as a table. "
+        "Use it instead of calling segment_stats repeatedly. Either pass 'segments': a list "
+        "of segment filters (same fields as segment_stats, plus an optional 'label'), "
+        "or 'group_by': a list of dimensions among marital_status, education, has_children, "
+        "high_value, optionally restricted by 'where' (segment filters)."
+        + TABLE_OUTPUT_NOTE
+        + DATASET_NOTE
+    ),
+    show_result=False,
+    stop_after_tool_call=False,
+)
+
+@traced("compare_segments", kind="tool")
+def compare_segments(
+    segments: Optional[List[SegmentSpec]] = None,
+    group_by: Optional[List[str]] = None,
+    where: Optional[SegmentSpec] = None,
+    summary_only: bool = False,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return _compare_segments_output(
+        summary_only=summary_only,
+        segments=[_spec_dict(spec) for spec in segments] if segments else None,
+        group_by=group_by,
+        where=_spec_dict(where),
+        dataset_id=dataset_id,
+    )
+
+# -------------------------------------------
+
+def _top_customers_impl(
+    metric: str = "TotalSpend",
+    n: int = 10,
+    ascending: bool = False,
+    marital_status: Optional[str] = None,
+    has_children: Optional[bool] = None,
+    high_value_only: bool = False,
+    education: Optional[str] = None,
+    accepted_campaigns: Optional[List[int]] = None,
+    complained: Optional[bool] = None,
+    responded: Optional[bool] = None,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, List[Dict[str, float]]]:
+    """
+    Return top N customers ranked by any rankable metric, optionally within a segment.
+
+    Uses the per-version top-N engine (pre-sorted order for the whole
+    dataset, partial selection inside a segment) instead of sorting the frame.
     """
-    df = get_final_dataset()
+    column = resolve_metric(metric)
+    n = max(1, int(n))
 
-    n = max(1, min(int(n), 100))  # clamp to [1,100]
+    engine = get_dataset_artifact("topn_engine", TopNEngine.build, dataset_id)
 
-    top_df = (
-        df.sort_values("TotalSpend", ascending=False)
-        .head(n)
-        .copy()
+    expr = _segment_filter_expr(
+        marital_status=marital_status,
+        has_children=has_children,
+        high_value_only=high_value_only,
+        education=education,
+        accepted_campaigns=accepted_campaigns,
+        complained=complained,
+        responded=responded,
     )
+    positions = None
+    if expr is not None:
+        index = get_dataset_artifact("bitmap_index", BitmapIndex.build, dataset_id)
+        positions = index.evaluate(expr).positions()
 
-    records: List[Dict[str, float]] = []
+    top = engine.top_positions(column, n, ascending=ascending, positions=positions)
 
-    for _, row in top_df.iterrows():
-        records.append(
-            {
-                "customer_id": int(row["ID"]),
-                "income": float(row["Income"]),
-                "total_spend": float(row["TotalSpend"]),
-                "total_children": int(row["Total_Children"]),
-                "recency_days": float(row["Recency"]),
-                "customer_tenure_days": (
-                    float(row["CustomerTenureDays"])
-                    if not pd.isna(row["CustomerTenureDays"])
-                    else None
-                ),
-            }
-        )
+    return {"customers": build_customer_records(engine.df, top, extra_columns=[column])}
+
+def _top_customers_output(summary_only: bool = False, **kwargs: Any) -> Dict[str, Any]:
+    return format_records("customers", _top_customers_impl(**kwargs)["customers"], summary_only=summary_only)
+
+@tool(
+    name="top_customers",
+    description=(
+        "Return the top N customers ranked by a metric: TotalSpend, Income, Recency, "
+        "Total_Purchases, CustomerTenureDays, any Mnt* spend column or Num*Purchases column. "
+        "Set ascending=true for the lowest values (e.g. most recent customers by Recency). "
+        "Accepts the same segment filters as segment_stats."
+        + TABLE_OUTPUT_NOTE
+        + DATASET_NOTE
+    ),
+    show_result=False,
+    stop_after_tool_call=False)
+
+@traced("top_customers", kind="tool")
+def top_customers(
+    metric: str = "TotalSpend",
+    n: int = 10,
+    ascending: bool = False,
+    marital_status: Optional[str] = None,
+    has_children: Optional[bool] = None,
+    high_value_only: bool = False,
+    education: Optional[str] = None,
+    accepted_campaigns: Optional[List[int]] = None,
+    complained: Optional[bool] = None,
+    responded: Optional[bool] = None,
+    summary_only: bool = False,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return _top_customers_output(
+        summary_only=summary_only,
+        metric=metric,
+        n=n,
+        ascending=ascending,
+        marital_status=marital_status,
+        has_children=has_children,
+        high_value_only=high_value_only,
+        education=education,
+        accepted_campaigns=accepted_campaigns,
+        complained=complained,
+        responded=responded,
+        dataset_id=dataset_id,
+    )
+
+# -------------------------------------------
+
+def _top_customers_by_spend_impl(n: int = 10, dataset_id: Optional[str] = None) -> Dict[str, List[Dict[str, float]]]:
+    """
+    Return top N customers ranked by TotalSpend.
+
+    Returns a list of customer records with key fields.
+    """
+    return _top_customers_impl(metric="TotalSpend", n=n, dataset_id=dataset_id)
 
-    return {"customers": records}
+def _top_customers_by_spend_output(n: int = 10, summary_only: bool = False, dataset_id: Optional[str] = None) -> Dict[str, Any]:
+    records = _top_customers_by_spend_impl(n=n, dataset_id=dataset_id)["customers"]
+    return format_records("customers", records, summary_only=summary_only)
 
 @tool(
     name="top_customers_by_spend",
-    description="Return the top N customers sorted by TotalSpend.",
+    description="Return the top N customers sorted by TotalSpend." + TABLE_OUTPUT_NOTE + DATASET_NOTE,
     show_result=False,
     stop_after_tool_call=False)
 
+@traced("top_customers_by_spend", kind="tool")
 def top_customers_by_spend(
-    n: int = 10) -> Dict[str, List[Dict[str, float]]]:
-    return _top_customers_by_spend_impl(n=n)
+    n: int = 10,
+    summary_only: bool = False,
+    dataset_id: Optional[str] = None) -> Dict[str, Any]:
+    return _top_customers_by_spend_output(n=n, summary_only=summary_only, dataset_id=dataset_id)
+
+# -------------------------------------------
+# Distribution tools
+# -------------------------------------------
+'''
+Percentiles, ranks and histograms of one metric, served from the dataset's
+distribution index (agno_app/distribution_index.py): sorted values built
+once per version, so a call is a few binary searches instead of a sort.
+'''
+DEFAULT_PERCENTILES = [1, 5, 10, 25, 50, 75, 90, 95, 99]
+
+def _distribution(metric: str, dataset_id: Optional[str]) -> ColumnDistribution:
+    index = get_dataset_artifact("distribution_index", DistributionIndex.build, dataset_id)
+    return index.column(metric)
+
+def _share_summary(distribution: ColumnDistribution, pct: float, top: bool) -> Dict[str, float]:
+    if not 0 < pct <= 100:
+        raise ValueError(f"Percentages must be in (0, 100], got {pct}")
+    values = distribution.tail(pct / 100.0, top=top)
+    total = float(values.sum(dtype=np.float64))
+    return {
+        "n_customers": int(len(values)),
+        "min": round(float(values[0]), 2),
+        "mean": round(total / len(values), 2),
+        "max": round(float(values[-1]), 2),
+        "pct_of_total": round(100.0 * total / distribution.total, 2) if distribution.total else 0.0,
+    }
+
+def _percentiles_impl(
+    metric: str = "TotalSpend",
+    percentiles: Optional[List[float]] = None,
+    top_pct: Optional[float] = None,
+    bottom_pct: Optional[float] = None,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Values of a metric at the given percentiles (0-100), and a summary of its
+    top / bottom share of customers when top_pct / bottom_pct is given.
+    """
+    column = resolve_metric(metric)
+    distribution = _distribution(column, dataset_id)
+    percentiles = DEFAULT_PERCENTILES if percentiles is None else percentiles
+    if any(not 0 <= p <= 100 for p in percentiles):
+        raise ValueError(f"Percentiles must be between 0 and 100, got {percentiles}")
+
+    result: Dict[str, Any] = {
+        "metric": column,
+        "n_customers": distribution.n,
+        "n_missing": distribution.n_missing,
+    }
+    if distribution.n == 0:
+        return result
+
+    result["mean"] = round(distribution.total / distribution.n, 2)
+    result["percentiles"] = {f"p{p:g}": round(distribution.quantile(p / 100.0), 2) for p in percentiles}
+    if column == "TotalSpend":
+        result["high_value_threshold"] = round(distribution.quantile(settings.high_value_quantile), 2)
+    if top_pct is not None:
+        result[f"top_{top_pct:g}_pct"] = _share_summary(distribution, top_pct, top=True)
+    if bottom_pct is not None:
+        result[f"bottom_{bottom_pct:g}_pct"] = _share_summary(distribution, bottom_pct, top=False)
+    return result
+
+def _customer_value(column: str, customer_id: int, dataset_id: Optional[str]) -> float:
+    index = get_dataset_artifact("customer_index", CustomerIndex.build, dataset_id)
+    positions, _ = index.lookup([int(customer_id)])
+    if len(positions) == 0:
+        raise ValueError(f"No customer with ID {customer_id}")
+    return float(index.df[column].to_numpy()[positions[0]])
+
+def _percentile_rank_impl(
+    metric: str = "TotalSpend",
+    value: Optional[float] = None,
+    customer_id: Optional[int] = None,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Where a value, or a customer's own value, falls in the distribution of a metric.
+
+    percentile counts ties as half below; rank 1 is the highest value.
+    """
+    if (value is None) == (customer_id is None):
+        raise ValueError("Pass either value or customer_id")
+
+    column = resolve_metric(metric)
+    distribution = _distribution(column, dataset_id)
+
+    result: Dict[str, Any] = {"metric": column}
+    if customer_id is not None:
+        result["customer_id"] = int(customer_id)
+        value = _customer_value(column, customer_id, dataset_id)
+    if math.isnan(value) or distribution.n == 0:
+        return {**result, "value": None, "percentile": None}
+
+    below, equal, above = distribution.rank(value)
+    n = distribution.n
+    return {
+        **result,
+        "value": round(float(value), 2),
+        "percentile": round(100.0 * (below + 0.5 * equal) / n, 2),
+        "pct_below": round(100.0 * below / n, 2),
+        "pct_above": round(100.0 * above / n, 2),
+        "rank": above + 1,
+        "n_customers": n,
+    }
+
+def _histogram_impl(
+    metric: str = "TotalSpend",
+    bins: Optional[int] = None,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Equal-width histogram of a metric, as a table with one row per bin.
+
+    Without arguments it is the precomputed HISTOGRAM_BINS-bin histogram
+    over the full range of the metric.
+    """
+    column = resolve_metric(metric)
+    distribution = _distribution(column, dataset_id)
+    if bins is not None:
+        bins = min(MAX_HISTOGRAM_BINS, max(1, int(bins)))
+
+    if min_value is not None and max_value is not None and min_value > max_value:
+        raise ValueError(f"min_value ({min_value}) must not be above max_value ({max_value})")
+    # An open end of the range is the metric's own min / max
+    if distribution.n:
+        low = float(distribution.values[0]) if min_value is None else float(min_value)
+        high = float(distribution.values[-1]) if max_value is None else float(max_value)
+        if low > high:
+            raise ValueError(
+                f"Empty histogram range {low} - {high}: {column} spans "
+                f"{distribution.values[0]} - {distribution.values[-1]}"
+            )
+
+    edges, counts = distribution.histogram(bins, min_value, max_value)
+    n = distribution.n
+    rows = [
+        [float(edges[i]), float(edges[i + 1]), int(count), 100.0 * int(count) / n]
+        for i, count in enumerate(counts)
+    ]
+    return {
+        "metric": column,
+        "n_customers": n,
+        "n_missing": distribution.n_missing,
+        "n_outside_range": n - int(counts.sum()),
+        "columns": ["bin_start", "bin_end", "n_customers", "pct_customers"],
+        "rows": rows,
+    }
+
+def _histogram_output(summary_only: bool = False, **kwargs: Any) -> Dict[str, Any]:
+    result = _histogram_impl(**kwargs)
+    if settings.tool_output == RECORDS:
+        return result
+    table = format_table(result.pop("columns"), result.pop("rows"), summary_only=summary_only)
+    return {**result, **table}
+
+DISTRIBUTION_METRICS_NOTE = (
+    " metric: TotalSpend, Income, Recency, Total_Purchases, CustomerTenureDays, any Mnt* spend "
+    "column or Num*Purchases column."
+)
+
+@tool(
+    name="percentiles",
+    description=(
+        "Return the values of a metric at percentiles (0-100; default 1, 5, 10, 25, 50, 75, 90, 95, 99) "
+        "over all customers, plus the high-value threshold for TotalSpend. Set top_pct (e.g. 5) or "
+        "bottom_pct to also summarize that share of customers (count, min, mean, max, share of the total)."
+        + DISTRIBUTION_METRICS_NOTE
+        + DATASET_NOTE
+    ),
+    show_result=False,
+    stop_after_tool_call=False)
+
+@traced("percentiles", kind="tool")
+def percentiles(
+    metric: str = "TotalSpend",
+    percentiles: Optional[List[float]] = None,
+    top_pct: Optional[float] = None,
+    bottom_pct: Optional[float] = None,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return _percentiles_impl(
+        metric=metric,
+        percentiles=percentiles,
+        top_pct=top_pct,
+        bottom_pct=bottom_pct,
+        dataset_id=dataset_id,
+    )
+
+@tool(
+    name="percentile_rank",
+    description=(
+        "Return the percentile and rank (1 = highest) of a value, or of a customer (customer_id), "
+        "for a metric over all customers. Pass either value or customer_id."
+        + DISTRIBUTION_METRICS_NOTE
+        + DATASET_NOTE
+    ),
+    show_result=False,
+    stop_after_tool_call=False)
+
+@traced("percentile_rank", kind="tool")
+def percentile_rank(
+    metric: str = "TotalSpend",
+    value: Optional[float] = None,
+    customer_id: Optional[int] = None,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return _percentile_rank_impl(metric=metric, value=value, customer_id=customer_id, dataset_id=dataset_id)
+
+@tool(
+    name="histogram",
+    description=(
+        "Return the distribution of a metric as an equal-width histogram table "
+        "(bin_start, bin_end, n_customers, pct_customers). Optional: bins (default 20, max 100), "
+        "min_value / max_value to zoom into a range."
+        + DISTRIBUTION_METRICS_NOTE
+        + TABLE_OUTPUT_NOTE
+        + DATASET_NOTE
+    ),
+    show_result=False,
+    stop_after_tool_call=False)
+
+@traced("histogram", kind="tool")
+def histogram(
+    metric: str = "TotalSpend",
+    bins: Optional[int] = None,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    summary_only: bool = False,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return _histogram_output(
+        summary_only=summary_only,
+        metric=metric,
+        bins=bins,
+        min_value=min_value,
+        max_value=max_value,
+        dataset_id=dataset_id,
+    )
+
+# -------------------------------------------
+
+def _customer_profiles_impl(customer_ids: List[int], dataset_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Full engineered records of a batch of customers, looked up by ID.
+
+    Profiles come back in the order the IDs were given (repeats dropped);
+    IDs that are not in the dataset are listed under missing_ids.
+    """
+    try:
+        wanted = list(dict.fromkeys(int(customer_id) for customer_id in customer_ids))
+    except (TypeError, ValueError):
+        raise ValueError(f"customer_ids must be a list of integer IDs, got {customer_ids!r}")
+    if not wanted:
+        raise ValueError("Pass at least one customer ID")
+
+    index = get_dataset_artifact("customer_index", CustomerIndex.build, dataset_id)
+    positions, found = index.lookup(wanted)
+    return {
+        "customers": build_customer_profiles(index.df, positions),
+        "missing_ids": [customer_id for customer_id, hit in zip(wanted, found.tolist()) if not hit],
+    }
+
+def _customer_profiles_output(summary_only: bool = False, **kwargs: Any) -> Dict[str, Any]:
+    result = _customer_profiles_impl(**kwargs)
+    table = format_records("customers", result["customers"], summary_only=summary_only)
+    return {**table, "missing_ids": result["missing_ids"]}
+
+@tool(
+    name="customer_profiles",
+    description=(
+        "Return the full profiles of specific customers by ID, several at once (e.g. the IDs from a "
+        "top_customers answer): demographics, income, spend per product, high-value flag, purchases "
+        "and share per channel, campaign acceptances, complaints. IDs not found are listed in 'missing_ids'."
+        + TABLE_OUTPUT_NOTE
+        + DATASET_NOTE
+    ),
+    show_result=False,
+    stop_after_tool_call=False)
+
+@traced("customer_profiles", kind="tool")
+def customer_profiles(
+    customer_ids: List[int],
+    summary_only: bool = False,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return _customer_profiles_output(summary_only=summary_only, customer_ids=customer_ids, dataset_id=dataset_id)
+
+# -------------------------------------------
+
+@tool(
+    name="fetch_rows",
+    description=(
+        "Return the next page of a table returned by another tool. Pass the 'next_cursor' "
+        "(or, after summary_only=true, the 'cursor') value it returned."
+    ),
+    show_result=False,
+    stop_after_tool_call=False)
+
+@traced("fetch_rows", kind="tool")
+def fetch_rows(cursor: str) -> Dict[str, Any]:
+    return fetch_page(cursor)
+
+# -------------------------------------------
+
+def _list_datasets_impl() -> Dict[str, Any]:
+    """
+    Dataset ids the tools accept, and whether each one is loaded in memory.
+    """
+    loaded = {entry["dataset_id"] for entry in registry_report()["datasets"]}
+    return {
+        "datasets": [
+            {"dataset_id": dataset_id, "loaded": dataset_id in loaded}
+            for dataset_id in list_dataset_ids()
+        ]
+    }
+
+@tool(
+    name="list_datasets",
+    description=(
+        "List the dataset ids the data tools accept as dataset_id (\"default\" plus regional "
+        "or monthly snapshots). Call it only when the user asks about a specific dataset."
+    ),
+    show_result=False,
+    stop_after_tool_call=False)
+
+@traced("list_datasets", kind="tool")
+def list_datasets() -> Dict[str, Any]:
+    return _list_datasets_impl()
+
+# -------------------------------------------
+# Async variants
+# -------------------------------------------
+'''
+Same tools (same names, descriptions and results) as coroutines. The pandas /
+numpy work runs on a bounded thread pool, so when the model emits several
+tool calls in one turn, agent.arun() executes them concurrently and the
+event loop hosting the agent is never blocked.
+'''
+_TOOL_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_TOOL_EXECUTOR_LOCK = threading.Lock()
+
+def _get_tool_executor() -> ThreadPoolExecutor:
+    global _TOOL_EXECUTOR
+
+    if _TOOL_EXECUTOR is None:
+        with _TOOL_EXECUTOR_LOCK:
+            if _TOOL_EXECUTOR is None:
+                _TOOL_EXECUTOR = ThreadPoolExecutor(
+                    max_workers=max(1, settings.tool_workers),
+                    thread_name_prefix="data-tool",
+                )
+    return _TOOL_EXECUTOR
+
+async def _run_in_tool_pool(func: Callable[..., Any], **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    # Carry the caller's context over, so spans opened in the pool (e.g. a
+    # dataset build) are attributed to the right agent run
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_get_tool_executor(), context.run, functools.partial(func, **kwargs))
+
+@tool(
+    name="global_stats",
+    description=global_stats.description,
+    show_result=False,
+    stop_after_tool_call=False,
+)
+
+@traced("global_stats", kind="tool")
+async def global_stats_async(
+    dataset_id: Optional[str] = None,
+    max_rel_error: Optional[float] = None,
+    max_latency_ms: Optional[float] = None,
+) -> Dict[str, float]:
+    return await _run_in_tool_pool(
+        _global_stats_impl,
+        dataset_id=dataset_id,
+        max_rel_error=max_rel_error,
+        max_latency_ms=max_latency_ms,
+    )
+
+@tool(
+    name="segment_stats",
+    description=segment_stats.description,
+    show_result=False,
+    stop_after_tool_call=False,
+)
+
+@traced("segment_stats", kind="tool")
+async def segment_stats_async(
+    marital_status: Optional[str] = None,
+    has_children: Optional[bool] = None,
+    high_value_only: bool = False,
+    education: Optional[str] = None,
+    accepted_campaigns: Optional[List[int]] = None,
+    complained: Optional[bool] = None,
+    responded: Optional[bool] = None,
+    dataset_id: Optional[str] = None,
+    max_rel_error: Optional[float] = None,
+    max_latency_ms: Optional[float] = None,
+) -> Dict[str, float]:
+    return await _run_in_tool_pool(
+        _segment_stats_impl,
+        marital_status=marital_status,
+        has_children=has_children,
+        high_value_only=high_value_only,
+        education=education,
+        accepted_campaigns=accepted_campaigns,
+        complained=complained,
+        responded=responded,
+        dataset_id=dataset_id,
+        max_rel_error=max_rel_error,
+        max_latency_ms=max_latency_ms,
+    )
+
+@tool(
+    name="compare_segments",
+    description=compare_segments.description,
+    show_result=False,
+    stop_after_tool_call=False,
+)
+
+@traced("compare_segments", kind="tool")
+async def compare_segments_async(
+    segments: Optional[List[SegmentSpec]] = None,
+    group_by: Optional[List[str]] = None,
+    where: Optional[SegmentSpec] = None,
+    summary_only: bool = False,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return await _run_in_tool_pool(
+        _compare_segments_output,
+        summary_only=summary_only,
+        segments=[_spec_dict(spec) for spec in segments] if segments else None,
+        group_by=group_by,
+        where=_spec_dict(where),
+        dataset_id=dataset_id,
+    )
+
+@tool(
+    name="top_customers",
+    description=top_customers.description,
+    show_result=False,
+    stop_after_tool_call=False,
+)
+
+@traced("top_customers", kind="tool")
+async def top_customers_async(
+    metric: str = "TotalSpend",
+    n: int = 10,
+    ascending: bool = False,
+    marital_status: Optional[str] = None,
+    has_children: Optional[bool] = None,
+    high_value_only: bool = False,
+    education: Optional[str] = None,
+    accepted_campaigns: Optional[List[int]] = None,
+    complained: Optional[bool] = None,
+    responded: Optional[bool] = None,
+    summary_only: bool = False,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return await _run_in_tool_pool(
+        _top_customers_output,
+        summary_only=summary_only,
+        metric=metric,
+        n=n,
+        ascending=ascending,
+        marital_status=marital_status,
+        has_children=has_children,
+        high_value_only=high_value_only,
+        education=education,
+        accepted_campaigns=accepted_campaigns,
+        complained=complained,
+        responded=responded,
+        dataset_id=dataset_id,
+    )
+
+@tool(
+    name="top_customers_by_spend",
+    description=top_customers_by_spend.description,
+    show_result=False,
+    stop_after_tool_call=False,
+)
+
+@traced("top_customers_by_spend", kind="tool")
+async def top_customers_by_spend_async(
+    n: int = 10,
+    summary_only: bool = False,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return await _run_in_tool_pool(_top_customers_by_spend_output, n=n, summary_only=summary_only, dataset_id=dataset_id)
+
+@tool(
+    name="percentiles",
+    description=percentiles.description,
+    show_result=False,
+    stop_after_tool_call=False,
+)
+
+@traced("percentiles", kind="tool")
+async def percentiles_async(
+    metric: str = "TotalSpend",
+    percentiles: Optional[List[float]] = None,
+    top_pct: Optional[float] = None,
+    bottom_pct: Optional[float] = None,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return await _run_in_tool_pool(
+        _percentiles_impl,
+        metric=metric,
+        percentiles=percentiles,
+        top_pct=top_pct,
+        bottom_pct=bottom_pct,
+        dataset_id=dataset_id,
+    )
+
+@tool(
+    name="percentile_rank",
+    description=percentile_rank.description,
+    show_result=False,
+    stop_after_tool_call=False,
+)
+
+@traced("percentile_rank", kind="tool")
+async def percentile_rank_async(
+    metric: str = "TotalSpend",
+    value: Optional[float] = None,
+    customer_id: Optional[int] = None,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return await _run_in_tool_pool(
+        _percentile_rank_impl,
+        metric=metric,
+        value=value,
+        customer_id=customer_id,
+        dataset_id=dataset_id,
+    )
+
+@tool(
+    name="histogram",
+    description=histogram.description,
+    show_result=False,
+    stop_after_tool_call=False,
+)
+
+@traced("histogram", kind="tool")
+async def histogram_async(
+    metric: str = "TotalSpend",
+    bins: Optional[int] = None,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    summary_only: bool = False,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return await _run_in_tool_pool(
+        _histogram_output,
+        summary_only=summary_only,
+        metric=metric,
+        bins=bins,
+        min_value=min_value,
+        max_value=max_value,
+        dataset_id=dataset_id,
+    )
+
+@tool(
+    name="customer_profiles",
+    description=customer_profiles.description,
+    show_result=False,
+    stop_after_tool_call=False,
+)
+
+@traced("customer_profiles", kind="tool")
+async def customer_profiles_async(
+    customer_ids: List[int],
+    summary_only: bool = False,
+    dataset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return await _run_in_tool_pool(
+        _customer_profiles_output,
+        summary_only=summary_only,
+        customer_ids=customer_ids,
+        dataset_id=dataset_id,
+    )
+
+@tool(
+    name="fetch_rows",
+    description=fetch_rows.description,
+    show_result=False,
+    stop_after_tool_call=False,
+)
+
+@traced("fetch_rows", kind="tool")
+async def fetch_rows_async(cursor: str) -> Dict[str, Any]:
+    # A slice of a stored result: no need for the thread pool
+    return fetch_page(cursor)
+
+@tool(
+    name="list_datasets",
+    description=list_datasets.description,
+    show_result=False,
+    stop_after_tool_call=False,
+)
+
+@traced("list_datasets", kind="tool")
+async def list_datasets_async() -> Dict[str, Any]:
+    # Directory listing and registry lookup: no need for the thread pool
+    return _list_datasets_impl()
+
+# -------------------------------------------
+
+async def _timed_call(func: Callable[..., Any], **kwargs: Any) -> Dict[str, float]:
+    span: Dict[str, float] = {}
+
+    # Timed in the worker thread, so waiting in the pool's queue is not running
+    def timed(**call_kwargs: Any) -> None:
+        span["start"] = time.perf_counter()
+        try:
+            func(**call_kwargs)
+        finally:
+            span["end"] = time.perf_counter()
+
+    await _run_in_tool_pool(timed, **kwargs)
+    return span
+
+def _peak_in_flight(spans: List[Dict[str, float]]) -> int:
+    # Sweep over start (+1) / end (-1) events; an end sorts before a start at the same time
+    events = sorted([(s["start"], 1) for s in spans] + [(s["end"], -1) for s in spans])
+    peak = running = 0
+    for _, step in events:
+        running += step
+        peak = max(peak, running)
+    return peak
+
+async def _measure_tool_overlap(n_calls: int = 8) -> Dict[str, float]:
+    """
+    Run the same batch of tool calls sequentially and concurrently.
+
+    Returns both wall-clock times, the number of concurrent calls that ran
+    at the same time as another one, and the peak number running at once
+    (times taken in the worker threads).
+    """
+    # Warm up the dataset and its indexes so only the tool work is measured
+    await _run_in_tool_pool(_global_stats_impl)
+    ids = get_final_dataset()["ID"].tolist()[:2_000]
+
+    # Indexed group-bys take about a millisecond, less than the GIL switch
+    # interval, so bulk profile lookups (tens of ms) give the calls the
+    # length they need to overlap
+    calls = [
+        (_compare_segments_impl, {"group_by": ["marital_status", "education", "has_children"], "where": {"responded": i % 2 == 0}})
+        if i % 2 else
+        (_customer_profiles_impl, {"customer_ids": ids[i:] + ids[:i]})
+        for i in range(n_calls)
+    ]
+    for func, kwargs in calls[:2]:
+        await _run_in_tool_pool(func, **kwargs)
+
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    for func, kwargs in calls:
+        await _timed_call(func, **kwargs)
+    sequential = loop.time() - start
+
+    start = loop.time()
+    spans = await asyncio.gather(*(_timed_call(func, **kwargs) for func, kwargs in calls))
+    concurrent = loop.time() - start
+
+    overlapping = sum(
+        1 for i, a in enumerate(spans)
+        if any(j != i and b["start"] < a["end"] and a["start"] < b["end"] for j, b in enumerate(spans))
+    )
+
+    return {
+        "n_calls": n_calls,
+        "tool_workers": settings.tool_workers,
+        "sequential_s": round(sequential, 4),
+        "concurrent_s": round(concurrent, 4),
+        "overlapping_calls": overlapping,
+        "peak_in_flight": _peak_in_flight(spans),
+    }
+
+if __name__ == "__main__":
+
+    # Wall-clock overlap check for the async tools (python -m tools.data_tools)
+    result = asyncio.run(_measure_tool_overlap())
+    print(result)
+
+    # One worker must run the calls strictly one after another; more must run some at once
+    expected = min(2, max(1, settings.tool_workers))
+    if settings.tool_workers <= 1 and result["peak_in_flight"] != 1:
+        raise SystemExit("Calls overlapped on a single tool worker: the timing is wrong")
+    if result["peak_in_flight"] < expected:
+        raise SystemExit("Async tool calls did not run concurrently")
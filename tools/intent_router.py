@@ -0,0 +1,314 @@
+import re
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+'''
+Local intent router in front of the Data Agent.
+
+Well-formed requests that map to exactly one tool call ("overall stats",
+"top 20 customers by spend", "married high-value customers with kids") are
+parsed with a few regular expressions and answered by calling the tool
+implementation directly: no model round trips. The parser is deliberately
+strict: every word of the query must be either part of a recognized phrase
+or a filler word ("show", "stats", "customers", ...), otherwise, or when two
+phrases conflict, the query goes to the agent unchanged.
+
+The router keeps routed / fallback counts and latencies, so the hit rate
+and the time saved can be reported (INTENT_ROUTER=true in the CLI).
+'''
+
+MARITAL_WORDS = {
+    "married": "married",
+    "single": "single",
+    "singles": "single",
+    "together": "together",
+    "cohabiting": "together",
+    "divorced": "divorced",
+    "widow": "widow",
+    "widows": "widow",
+    "widowed": "widow",
+}
+EDUCATION_WORDS = {
+    "phd": "phd",
+    "phds": "phd",
+    "doctorate": "phd",
+    "master": "master",
+    "masters": "master",
+    "graduate": "graduate",
+    "graduates": "graduate",
+    "undergraduate": "undergraduate",
+    "undergraduates": "undergraduate",
+}
+
+# Words that carry no meaning of their own in a well-formed request
+FILLER_WORDS = {
+    "a", "about", "all", "among", "an", "and", "are", "as", "customer", "customers", "data",
+    "dataset", "display", "fetch", "for", "get", "give", "in", "is", "json", "list", "me",
+    "metrics", "numbers", "of", "on", "overview", "people", "please", "return", "segment",
+    "show", "stat", "statistics", "stats", "summary", "tell", "that", "the", "their", "what",
+    "who", "with",
+}
+STATS_WORDS = {"stat", "stats", "statistics", "summary", "overview", "metrics", "numbers"}
+SPEND_WORDS = {"spend", "spending", "spenders", "spent"}
+
+# (pattern, feature, value); negative phrases first, so "with no kids" is
+# not read as "with kids"
+PHRASES: List[Tuple[str, str, Any]] = [
+    (r"\b(?:without|with no|have no|having no|no)\s+(?:kids|children|child)\b", "has_children", False),
+    (r"\bchildless\b", "has_children", False),
+    (r"\b(?:with|have|having|has)\s+(?:kids|children|a child|child)\b", "has_children", True),
+    (r"\bparents\b", "has_children", True),
+    (r"\bhigh[\s_-]*value\b", "high_value_only", True),
+    (r"\bbasic\s+education\b", "education", "basic"),
+    (r"\b(?:overall|global|whole dataset|entire customer base|full customer base|all customers|every customer)\b", "all", True),
+    (r"\b(?:by|based on|ranked by|sorted by)\s+(?:their\s+)?(?:total\s+)?(?:spend|spending|spent)\b", "metric", "TotalSpend"),
+    (r"\b(?:by|based on|ranked by|sorted by)\s+(?:their\s+)?income\b", "metric", "Income"),
+]
+TOP_PATTERN = re.compile(r"\btop\s+(\d{1,4})\b")
+MAX_TOP_N = 1000
+
+
+@dataclass
+class RoutedCall:
+    tool: str                                   # tool name the agent would have called
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+def _normalize(query: str) -> str:
+    text = query.lower().replace("’", "'")
+    text = re.sub(r"[^a-z0-9\s_-]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def parse_intent(query: str) -> Optional[RoutedCall]:
+    """
+    The single tool call a query maps to, or None when it is not confidently
+    one of the simple forms.
+    """
+    text = _normalize(query)
+    if not text:
+        return None
+
+    features: Dict[str, Any] = {}
+
+    def set_feature(name: str, value: Any) -> bool:
+        # Two phrases that disagree (e.g. "with kids" and "without kids")
+        if name in features and features[name] != value:
+            return False
+        features[name] = value
+        return True
+
+    top = TOP_PATTERN.findall(text)
+    if len(top) > 1:
+        return None
+    if top:
+        features["n"] = int(top[0])
+        text = TOP_PATTERN.sub(" ", text)
+
+    for pattern, name, value in PHRASES:
+        if re.search(pattern, text):
+            if not set_feature(name, value):
+                return None
+            text = re.sub(pattern, " ", text)
+
+    stats_word = False
+    for word in text.split():
+        if word in MARITAL_WORDS:
+            ok = set_feature("marital_status", MARITAL_WORDS[word])
+        elif word in EDUCATION_WORDS:
+            ok = set_feature("education", EDUCATION_WORDS[word])
+        elif word in SPEND_WORDS:
+            ok = set_feature("metric", "TotalSpend")
+        elif word in FILLER_WORDS:
+            stats_word = stats_word or word in STATS_WORDS
+            ok = True
+        else:
+            ok = False                          # an unknown word: not a simple request
+        if not ok:
+            return None
+
+    filters = {
+        key: features[key]
+        for key in ("marital_status", "has_children", "high_value_only", "education")
+        if key in features
+    }
+
+    if "n" in features:
+        n = features["n"]
+        if not 1 <= n <= MAX_TOP_N or features.get("all") and filters:
+            return None
+        metric = features.get("metric", "TotalSpend")
+        if metric == "TotalSpend" and not filters:
+            return RoutedCall("top_customers_by_spend", {"n": n})
+        return RoutedCall("top_customers", {"metric": metric, "n": n, **filters})
+
+    # A ranking metric without "top N", or "overall" together with filters
+    if "metric" in features or (features.get("all") and filters):
+        return None
+    if filters:
+        return RoutedCall("segment_stats", filters)
+    if features.get("all") or stats_word:
+        return RoutedCall("global_stats")
+    return None
+
+
+def execute(call: RoutedCall) -> Dict[str, Any]:
+    """
+    Run the tool implementation behind a routed call.
+    """
+    # Imported here: the tools pull in the dataset layer
+    from tools import data_tools
+
+    if call.tool == "global_stats":
+        return data_tools._global_stats_impl()
+    if call.tool == "segment_stats":
+        return data_tools._segment_stats_impl(**call.kwargs)
+    if call.tool == "top_customers_by_spend":
+        return data_tools._top_customers_by_spend_impl(**call.kwargs)
+    if call.tool == "top_customers":
+        return data_tools._top_customers_impl(**call.kwargs)
+    raise ValueError(f"Unknown routed tool: {call.tool}")
+
+
+# -------------------------------------------
+# Agent wrapper
+# -------------------------------------------
+
+@dataclass
+class RoutedToolCall:
+    tool_name: str
+    tool_args: Dict[str, Any]
+
+
+@dataclass
+class RoutedResponse:
+    """
+    What the CLI reads from an agent response, for a locally answered query.
+    """
+    content: str
+    tools: List[RoutedToolCall]
+    routed: bool = True
+
+
+class RoutedAgent:
+    """
+    Wrap an agent (or a CachedAgent) so simple queries skip the model.
+
+    Everything the router does not parse is passed to the wrapped agent.
+    Other attributes are forwarded to it.
+    """
+
+    def __init__(self, agent: Any):
+        self.agent = agent
+        self.routed = 0
+        self.fallbacks = 0
+        self.routed_s = 0.0
+        self.fallback_s = 0.0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.agent, name)
+
+    def route(self, query: str) -> Optional[RoutedResponse]:
+        start = time.perf_counter()
+        call = parse_intent(query)
+        if call is None:
+            return None
+
+        from agno_app.instrumentation import span
+
+        with span(f"router.{call.tool}", kind="tool", **call.kwargs):
+            result = execute(call)
+        self.routed += 1
+        self.routed_s += time.perf_counter() - start
+        return RoutedResponse(json.dumps(result), [RoutedToolCall(call.tool, call.kwargs)])
+
+    def run(self, query: str, **kwargs: Any) -> Any:
+        routed = self.route(query)
+        if routed is not None:
+            return routed
+
+        start = time.perf_counter()
+        response = self.agent.run(query, **kwargs)
+        self.fallbacks += 1
+        self.fallback_s += time.perf_counter() - start
+        return response
+
+    async def arun(self, query: str, **kwargs: Any) -> Any:
+        routed = self.route(query)
+        if routed is not None:
+            return routed
+
+        start = time.perf_counter()
+        response = await self.agent.arun(query, **kwargs)
+        self.fallbacks += 1
+        self.fallback_s += time.perf_counter() - start
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.routed + self.fallbacks
+        avg_routed = self.routed_s / self.routed if self.routed else None
+        avg_agent = self.fallback_s / self.fallbacks if self.fallbacks else None
+        return {
+            "queries": total,
+            "routed": self.routed,
+            "fallbacks": self.fallbacks,
+            "hit_rate": round(self.routed / total, 4) if total else 0.0,
+            "avg_routed_ms": None if avg_routed is None else round(avg_routed * 1000, 2),
+            "avg_agent_ms": None if avg_agent is None else round(avg_agent * 1000, 2),
+        }
+
+
+# Sample queries and the call each should route to (None: goes to the agent)
+EXAMPLE_QUERIES: List[Tuple[str, Optional[RoutedCall]]] = [
+    ("overall stats", RoutedCall("global_stats")),
+    ("Return overall stats for all customers as JSON.", RoutedCall("global_stats")),
+    ("Show me the global statistics", RoutedCall("global_stats")),
+    ("stats", RoutedCall("global_stats")),
+    ("top 20 customers by spend", RoutedCall("top_customers_by_spend", {"n": 20})),
+    ("Get stats for top 20 customers based on their total spend.", RoutedCall("top_customers_by_spend", {"n": 20})),
+    ("top 5 spenders", RoutedCall("top_customers_by_spend", {"n": 5})),
+    ("top 10 customers", RoutedCall("top_customers_by_spend", {"n": 10})),
+    ("top 10 customers by income", RoutedCall("top_customers", {"metric": "Income", "n": 10})),
+    ("Show top 5 high-value customers with kids",
+     RoutedCall("top_customers", {"metric": "TotalSpend", "n": 5, "has_children": True, "high_value_only": True})),
+    ("married high-value customers with kids",
+     RoutedCall("segment_stats", {"marital_status": "married", "has_children": True, "high_value_only": True})),
+    ("Get stats (as JSON) for married customers who have children and are high-value.",
+     RoutedCall("segment_stats", {"marital_status": "married", "has_children": True, "high_value_only": True})),
+    ("single customers without kids", RoutedCall("segment_stats", {"marital_status": "single", "has_children": False})),
+    ("divorced customers with no children", RoutedCall("segment_stats", {"marital_status": "divorced", "has_children": False})),
+    ("stats for PhD customers", RoutedCall("segment_stats", {"education": "phd"})),
+    ("widowed parents", RoutedCall("segment_stats", {"marital_status": "widow", "has_children": True})),
+    ("customers with basic education", RoutedCall("segment_stats", {"education": "basic"})),
+    # Not simple: the agent answers these
+    ("compare married and single customers", None),
+    ("married or single customers", None),
+    ("married and single customers", None),
+    ("customers with kids and without kids", None),
+    ("what is the median income of married customers?", None),
+    ("which channel performs best for high-value customers?", None),
+    ("customers by income", None),
+    ("overall stats for married customers", None),
+    ("top 5 and top 10 customers", None),
+    ("recommend a strategy for families", None),
+    ("basic stats", None),
+    ("hello", None),
+]
+
+
+if __name__ == "__main__":
+
+    failures = [
+        (query, expected, parse_intent(query))
+        for query, expected in EXAMPLE_QUERIES
+        if parse_intent(query) != expected
+    ]
+    for query, expected, got in failures:
+        print(f"{query!r}: expected {expected}, got {got}")
+    if failures:
+        raise SystemExit(f"{len(failures)} routing mismatch(es)")
+
+    routed = sum(expected is not None for _, expected in EXAMPLE_QUERIES)
+    print(f"All {len(EXAMPLE_QUERIES)} example queries parsed as expected ({routed} routed)")